@@ -7,19 +7,35 @@
 from .api import (
     Sap_system,
     Parameter,
+    LazyPassword,
     Obj_structure,
 
     query_system,
+    count_system,
     add,
     delete,
     update,
+    upsert,
+    stream_systems,
+    query_passwords,
+    update_passwords,
+    landscape_file,
+    save_landscape_file,
+    sync_landscape,
 
     query_param,
+    param_fields,
     add_param,
     delete_param,
     update_param,
+    upsert_params,
+    stream_params,
+
+    cache_info,
+    cache_clear,
 
     start_sap_db,
+    start_sap_daemon,
     stop_sap_db,
 )
 
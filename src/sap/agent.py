@@ -0,0 +1,198 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+"""
+Background agent clearing clipboard and screen on schedule, so commands do not wait for it.
+
+One agent per config folder and terminal: it shares the terminal of the command that started it (screen is cleared
+there). Requests of the same action are coalesced: one timer per action, set to the latest requested time.
+Agent exits when there is nothing to clear. Module is run as script by schedule() and uses only standard library.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from pathlib import Path
+
+AGENT_FILE_PREFIX = 'sap_agent_'
+
+if sys.platform == 'win32':
+    # Ctrl+C in the terminal does not stop the agent. Console is shared: screen of the terminal is cleared
+    AGENT_FLAGS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    AGENT_FLAGS = {'start_new_session': True}
+
+
+def terminal_id() -> str:
+    """ Terminal of the process: console window on Windows, tty name on other systems """
+    if sys.platform == 'win32':
+        import ctypes
+
+        return str(ctypes.windll.kernel32.GetConsoleWindow())
+    try:
+        return os.ttyname(sys.stdout.fileno())
+    except (OSError, ValueError, AttributeError):
+        return ''
+
+
+def agent_file_path(config_path: Path) -> Path:
+    """ File with address and key of the agent of the config folder and terminal """
+    digest = hashlib.sha1(f"{Path(config_path).resolve()}|{terminal_id()}".encode()).hexdigest()[:16]
+    return Path(config_path) / f"{AGENT_FILE_PREFIX}{digest}.json"
+
+
+def agent_address(info_path: Path) -> str:
+    """
+    Named pipe for Windows, unix domain socket for others. Address is unique: agent that is finishing
+    does not remove socket of the agent started after it
+    """
+    token = secrets.token_hex(4)
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\sap-agent-{info_path.stem[len(AGENT_FILE_PREFIX):]}-{token}'
+    return str(info_path.with_name(f"{info_path.stem}-{token}.sock"))
+
+
+def clear_clipboard():
+    if sys.platform == 'win32':
+        import ctypes
+
+        if ctypes.windll.user32.OpenClipboard(None):
+            try:
+                ctypes.windll.user32.EmptyClipboard()
+            finally:
+                ctypes.windll.user32.CloseClipboard()
+    else:
+        import pyperclip
+
+        pyperclip.copy('')
+
+
+def clear_screen():
+    if sys.platform == 'win32':
+        os.system('cls')
+    elif sys.stdout is not None and sys.stdout.isatty():
+        # Screen and scroll back buffer
+        sys.stdout.write('\033[H\033[2J\033[3J')
+        sys.stdout.flush()
+
+
+ACTIONS = {'clipboard': clear_clipboard, 'screen': clear_screen}
+
+
+class ClearAgent:
+    """ Timers of actions. Requests are accepted by thread, actions are done by the thread calling run() """
+
+    def __init__(self, info_path: Path, actions=None):
+        self.info_path = Path(info_path)
+        self.address = agent_address(self.info_path)
+        self.authkey = secrets.token_bytes(32)
+        self.actions = actions if actions else ACTIONS
+        self.deadlines = {}  # {action: time.monotonic() of the action}
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def schedule(self, action, seconds) -> bool:
+        """ Do the action in seconds. Earlier pending time of the action is replaced by later one """
+        if action not in self.actions:
+            raise ValueError(f"Unknown action: {action}")
+        with self.condition:
+            if self.closed:
+                return False
+            deadline = time.monotonic() + max(seconds, 0)
+            self.deadlines[action] = max(self.deadlines.get(action, deadline), deadline)
+            self.condition.notify()
+        return True
+
+    def run(self):
+        """ Do actions on time, return when there is nothing to do """
+        with self.condition:
+            while self.deadlines:
+                now = time.monotonic()
+                for action in [action for action, deadline in self.deadlines.items() if deadline <= now]:
+                    del self.deadlines[action]
+                    try:
+                        self.actions[action]()
+                    except Exception:  # pylint: disable=broad-except
+                        pass  # Nobody to report to: clearing of other actions goes on
+                if self.deadlines:
+                    self.condition.wait(min(self.deadlines.values()) - now)
+            self.closed = True
+
+    def serve(self, requests=()):
+        """ Accept requests of commands until all actions are done """
+        for request in requests:
+            self.schedule(*request)
+
+        listener = Listener(self.address, authkey=self.authkey)
+        fd = os.open(self.info_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump({'address': self.address, 'authkey': self.authkey.hex(), 'pid': os.getpid()}, file)
+        threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+        try:
+            self.run()
+        finally:
+            self._release()
+            listener.close()
+
+    def _release(self):
+        """ Remove info file if it is still of this agent: agent started after this one replaces it """
+        try:
+            with open(self.info_path, encoding='utf-8') as file:
+                owner = json.load(file).get('authkey')
+        except (OSError, ValueError, AttributeError):
+            return
+        if owner == self.authkey.hex():
+            self.info_path.unlink(missing_ok=True)
+
+    def _accept(self, listener):
+        while True:
+            try:
+                with listener.accept() as conn:
+                    command, *args = conn.recv()
+                    conn.send(command == 'schedule' and self.schedule(*args))
+            except (OSError, EOFError, ValueError, TypeError, AuthenticationError):
+                if self.closed:
+                    return
+
+
+def _send(info_path: Path, request) -> bool:
+    """ Send request to running agent. False if agent is not running or is finishing """
+    try:
+        with open(info_path, encoding='utf-8') as file:
+            info = json.load(file)
+        with Client(info['address'], authkey=bytes.fromhex(info['authkey'])) as conn:
+            conn.send(request)
+            return conn.recv() is True
+    except (OSError, EOFError, ValueError, KeyError, AuthenticationError):
+        return False
+
+
+def schedule(config_path: Path, action: str, seconds: int, python=None):
+    """
+    Ask agent of the terminal to do the action ('clipboard' or 'screen') in seconds. Agent is started if needed
+    :raise OSError: agent can not be started
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+    info_path = agent_file_path(config_path)
+    if info_path.exists() and _send(info_path, ('schedule', action, seconds)):
+        return
+
+    # Output of the agent is the terminal of the command: screen is cleared there
+    agent = subprocess.Popen([python if python else sys.executable, __file__], stdin=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, close_fds=True, **AGENT_FLAGS)
+    with agent.stdin as stream:
+        stream.write(json.dumps({'info_path': str(info_path), 'requests': [[action, seconds]]}).encode())
+
+
+if __name__ == "__main__":
+    request = json.loads(sys.stdin.read())
+    ClearAgent(Path(request['info_path'])).serve(request['requests'])
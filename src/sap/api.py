@@ -4,9 +4,10 @@
 
 """ sap's module API """
 
-from collections import namedtuple
+import threading
+from collections import namedtuple, OrderedDict
 import click
-from sap.exceptions import DatabaseDoesNotExists
+from sap.exceptions import DatabaseDoesNotExists, DatabaseOutdated
 
 Sap_system = namedtuple('SAP', ['system', 'client', 'user', 'password', 'language', 'customer', 'description', 'url',
                                 'autotype', 'only_web'])
@@ -16,7 +17,104 @@ Parameter = namedtuple('parameters', ['transaction', 'parameter'])
 Parameter.__new__.__defaults__ = (None, None)
 
 
-def query_system(sap_system: Sap_system):
+class LazyPassword:
+    """
+    Encrypted password of a queried SAP system. It is decrypted on first access, so only selected system
+    pays for RSA decryption. Use str() to get the password.
+    """
+
+    __slots__ = ('encrypted', '_decrypt', '_value')
+
+    def __init__(self, encrypted, decrypt):
+        self.encrypted = encrypted
+        self._decrypt = decrypt
+        self._value = None
+
+    def __str__(self):
+        if self._value is None:
+            # System added by 'sap landscape-sync' has no password
+            self._value = self._decrypt(self.encrypted) if self.encrypted else ''
+        return self._value
+
+    @staticmethod
+    def decrypt_all(passwords, decrypt_many):
+        """
+        Decrypt not yet decrypted passwords with one call
+        :param passwords: list of LazyPassword
+        :param decrypt_many: function to decrypt list of encrypted passwords, see Crypto.decrypt_many
+        """
+        pending = [item for item in passwords
+                   if isinstance(item, LazyPassword) and item._value is None and item.encrypted]
+        if pending:
+            for item, value in zip(pending, decrypt_many([item.encrypted for item in pending])):
+                item._value = value
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+    # Password is compared as text, so hash is taken of the text too: equal objects have equal hashes
+    def __eq__(self, other):
+        return str(self) == (str(other) if isinstance(other, LazyPassword) else other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'size', 'maxsize'])
+
+
+class QueryCache:
+    """
+    Results of queries made through API functions: LRU cache checked against version of database data.
+    Any write through API functions clears it. Result is taken from cache only if database data version
+    is the same as when result was queried, so changes made by other processes are seen by the next query.
+    Cache keeps rows as they are stored: passwords stay encrypted
+    """
+
+    def __init__(self, maxsize: int, version):
+        """
+        :param maxsize: number of cached results
+        :param version: function returning current version of database data. None - version is not known,
+            result is not cached
+        """
+        self.maxsize = maxsize
+        self.version = version
+        self.hits = self.misses = 0
+        self._results = OrderedDict()  # {key: (data version, result)}
+        self._lock = threading.Lock()
+
+    def get(self, key, query):
+        """ Cached result for the key or result of query() """
+        version = self.version()
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and version is not None and cached[0] == version:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return list(cached[1])
+            self.misses += 1
+
+        result = query()
+        if self.maxsize > 0 and version is not None:
+            with self._lock:
+                self._results[key] = (version, list(result))
+                self._results.move_to_end(key)
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self._results), self.maxsize)
+
+
+def query_system(sap_system: Sap_system, after: tuple = None, limit: int = None):
     """ Запуск указанной SAP системы \n Обязательные параметры: 1. система, 2. мандант (не обязательно)  """
 
     # if not isinstance(sap_system, Sap_system):
@@ -35,7 +133,13 @@ def query_system(sap_system: Sap_system):
     #     raise UninitializedDatabase()
 
     # noinspection PyUnresolvedReferences
-    return _sapdb.query_system(sap_system)
+    return _cache.get(('query_system', tuple(sap_system), after, limit),
+                      lambda: _sapdb.query_system(sap_system, after, limit))
+
+
+def count_system(sap_system: Sap_system):
+    # noinspection PyUnresolvedReferences
+    return _cache.get(('count_system', tuple(sap_system)), lambda: [_sapdb.count_system(sap_system)])[0]
 
 
 def add(sap_system: Sap_system):
@@ -55,6 +159,7 @@ def add(sap_system: Sap_system):
     #     raise UninitializedDatabase()
 
     # noinspection PyUnresolvedReferences
+    _cache.clear()
     return _sapdb.add(sap_system)
 
 
@@ -69,6 +174,7 @@ def update(sap_system: Sap_system):
     # if not isinstance(sap_system.user, str):
     #     raise ValueError('sap.user must be str')
 
+    _cache.clear()
     return _sapdb.update(sap_system)
 
 
@@ -83,61 +189,166 @@ def delete(sap_system: Sap_system):
     # if not isinstance(sap_system.user, str):
     #     raise ValueError('sap.user must be str')
 
+    _cache.clear()
     return _sapdb.delete(sap_system)
 
 
+# noinspection PyUnresolvedReferences
+def query_passwords(after=None, limit=500):
+    return _sapdb.query_passwords(after, limit)
+
+
+# noinspection PyUnresolvedReferences
+def stream_systems(batch=500):
+    return _sapdb.stream_systems(batch)
+
+
+# noinspection PyUnresolvedReferences
+def upsert(sap_systems):
+    _cache.clear()
+    return _sapdb.upsert(sap_systems)
+
+
+# noinspection PyUnresolvedReferences
+def landscape_file():
+    return _sapdb.landscape_file()
+
+
+# noinspection PyUnresolvedReferences
+def save_landscape_file(state):
+    return _sapdb.save_landscape_file(state)
+
+
+# noinspection PyUnresolvedReferences
+def sync_landscape(entries, client, user, language, state):
+    _cache.clear()
+    return _sapdb.sync_landscape(entries, client, user, language, state)
+
+
+# noinspection PyUnresolvedReferences
+def update_passwords(records):
+    _cache.clear()
+    return _sapdb.update_passwords(records)
+
+
 # noinspection PyUnresolvedReferences
 def query_param(parameter: Parameter):
-    return _sapdb.query_param(parameter)
+    return _cache.get(('query_param', tuple(parameter)), lambda: _sapdb.query_param(parameter))
+
+
+# noinspection PyUnresolvedReferences
+def param_fields(transaction: str) -> list:
+    """
+    Screen fields of the transaction for 'sap run -t -p'. Exact match: 'VA01' does not find 'VA01N'.
+    Parsed fields are cached with query results. Empty list if transaction has no parameters
+    """
+    def query():
+        parameter = _sapdb.get_param(str(transaction).upper())
+        return [item.strip() for item in parameter.split(',')] if parameter else []
+
+    return _cache.get(('param_fields', str(transaction).upper()), query)
 
 
 # noinspection PyUnresolvedReferences
 def add_param(parameter: Parameter):
+    _cache.clear()
     return _sapdb.add_param(parameter)
 
 
 # noinspection PyUnresolvedReferences
 def delete_param(parameter: Parameter):
+    _cache.clear()
     return _sapdb.delete_param(parameter)
 
 
 # noinspection PyUnresolvedReferences
 def update_param(parameter: Parameter):
+    _cache.clear()
     return _sapdb.update_param(parameter)
 
 
+# noinspection PyUnresolvedReferences
+def stream_params(batch=500):
+    return _sapdb.stream_params(batch)
+
+
+# noinspection PyUnresolvedReferences
+def upsert_params(parameters):
+    _cache.clear()
+    return _sapdb.upsert_params(parameters)
+
+
 _sapdb = None
 
 
-def start_sap_db(db_path, db_type):
-    """Connect API functions to a db."""
+def cache_info() -> CacheInfo:
+    """ Statistics of query results cache: hits, misses, size, maxsize """
+    return _cache.info()
+
+
+def cache_clear():
+    """ Clear query results cache. Statistics are kept """
+    _cache.clear()
+
+
+def start_sap_db(db_path, db_type, pragmas=None, read_only=False, immutable=False):
+    """
+    Connect API functions to a db. pragmas: SQLite PRAGMA values, see SQLITE_PROFILES.
+    read_only: SQLite database is opened in read only mode, immutable: without locks (database on read only share)
+    """
     # if not isinstance(db_path, string_types):
     #     raise TypeError('db_path must be a string')
     global _sapdb
     import sap.database
+    _cache.clear()
     try:
-        _sapdb = sap.database.start_sap_db(db_path, db_type)
+        _sapdb = sap.database.start_sap_db(db_path, db_type, pragmas, read_only, immutable)
         _sapdb.make_session()
-    except DatabaseDoesNotExists as err:
+    except (DatabaseDoesNotExists, DatabaseOutdated) as err:
         click.echo(f"{err.message}")
         raise click.Abort
+    return _sapdb
+
+
+def start_sap_daemon(client):
+    """Connect API functions to a running daemon (see sap.daemon). Only query functions are served by daemon"""
+    global _sapdb
+    _cache.clear()
+    _sapdb = client
 
 
 # noinspection PyUnresolvedReferences
 def stop_sap_db():
+    _cache.clear()
     _sapdb.stop_sap_db()
 
 
 class Obj_structure:
     def __init__(self):
         self.config = None
-        self.crypto = None
+        self._crypto = None
         self.database = None
+        self.daemon = None
+
+    @property
+    def crypto(self):
+        """ Encryption of the keys from config. Created on first use: cryptography is heavy import """
+        if self._crypto is None and self.config is not None:
+            from sap.crypto import Crypto
+
+            self._crypto = Crypto(self.config.public_key_path, self.config.private_key_path)
+        return self._crypto
+
+    @crypto.setter
+    def crypto(self, crypto):
+        self._crypto = crypto
 
 
 # File names
 PUBLIC_KEY_NAME = 'public_key.txt'
 PRIVATE_KEY_NAME = 'private_key.txt'
+DATA_KEY_NAME = 'data_key.txt'
+KEY_ROTATION_NAME = 'key_rotation.json'
 CONFIG_NAME = 'sap_config.ini'
 DATABASE_NAME = 'database.db'
 COMMAND_LINE_NAME = 'sapshcut.exe'
@@ -145,3 +356,28 @@ SAPLOGON_NAME = 'saplogon.exe'
 DEBUG_FILE_NAME = "DEBUG.TXT"
 SAPLOGON_INI = 'SAPUILandscape.xml'
 TEXT_FILE_NAME = 'text_file.txt'
+DAEMON_FILE_NAME = 'sap_daemon.json'
+CONFIG_CACHE_NAME = 'sap_config.cache'
+LAUNCH_STATUS_NAME = 'sap_launch.jsonl'
+
+# SQLite performance profiles: PRAGMA values set on every database connection. {profile: {pragma: value}}
+SQLITE_PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+SQLITE_PROFILES = {
+    # SQLite defaults: rollback journal synced on every commit, no memory mapped reads
+    'compatible': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'mmap_size': 0, 'cache_size': -2000,
+                   'temp_store': 'DEFAULT'},
+    # Write-ahead log: commit appends to log without waiting for disk sync, reads use memory mapped file
+    'balanced': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'mmap_size': 64 * 1024 * 1024, 'cache_size': -8000,
+                 'temp_store': 'MEMORY'},
+    # No disk sync at all: last transactions can be lost on power failure
+    'fast': {'journal_mode': 'WAL', 'synchronous': 'OFF', 'mmap_size': 256 * 1024 * 1024, 'cache_size': -32000,
+             'temp_store': 'MEMORY'},
+}
+SQLITE_PROFILE = 'balanced'  # Profile of new config files
+SQLITE_PROFILE_LEGACY = 'compatible'  # Profile of config files without 'db_profile' value
+
+# Query results cache of API functions: number of cached queries
+QUERY_CACHE_SIZE = 128
+
+# noinspection PyUnresolvedReferences
+_cache = QueryCache(QUERY_CACHE_SIZE, lambda: _sapdb.data_version())
@@ -0,0 +1,190 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+"""
+Autotype engine of web logins: '{USER}{TAB}{PASS}{ENTER}' is typed into the active window.
+
+Sequence is compiled once into a program of steps (compile_sequence is cached). Waits ({DELAY n} and waiting for web
+site to load) poll readiness check and end as soon as it passes, n seconds is the maximum. Without readiness check
+wait lasts n seconds. Keyboard and screen are reached through input backend: replace it by set_backend() in tests.
+"""
+
+import functools
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+ITEMS = ('USER', 'PASS', 'LANG', 'DELAY', 'ENTER', 'TAB', 'SPACE', 'SYSTEM', 'CLIENT')
+TOKEN = re.compile(fr"{{({'|'.join(ITEMS)})(?: *(\d*))?}}")
+
+# Items typed as text: item -> field of Sap_system. Language entered with command has priority
+FIELDS = {'USER': 'user', 'PASS': 'password', 'LANG': 'language', 'SYSTEM': 'system', 'CLIENT': 'client'}
+
+# Seconds between readiness checks
+POLL_INTERVAL = 0.2
+
+# Step of autotype program:
+# 'write' - value is field name of Sap_system, 'press' - value is (key, presses), 'wait' - value is maximum seconds
+Step = namedtuple('Step', ['action', 'value'])
+
+
+@functools.lru_cache(maxsize=256)
+def compile_sequence(sequence: str) -> tuple:
+    """
+    Compile autotype sequence into tuple of steps
+    :raise ValueError: text that is not an autotype item. Argument of exception is the wrong text
+    """
+    wrong = TOKEN.sub('', sequence)
+    if wrong:
+        raise ValueError(wrong)
+
+    steps = []
+    for item, number in TOKEN.findall(sequence):
+        if item in FIELDS:
+            steps.append(Step('write', FIELDS[item]))
+        elif item == 'DELAY':
+            steps.append(Step('wait', int(number) if number else 0))
+        else:  # ENTER, TAB, SPACE. Number is count of presses
+            steps.append(Step('press', (item.lower(), int(number) if number else 1)))
+    return tuple(steps)
+
+
+class InputBackend(ABC):
+    """ Keyboard and screen of autotype. Replace default backend by set_backend() """
+
+    @abstractmethod
+    def write(self, text: str):
+        """ Type the text """
+
+    @abstractmethod
+    def press(self, key: str, presses=1):
+        """ Press the key """
+
+    @abstractmethod
+    def hotkey(self, *keys):
+        """ Press the keys together """
+
+    def window_title(self) -> str:
+        """ Title of the active window, empty string if it is not known """
+        return ''
+
+    @abstractmethod
+    def pixel(self, x: int, y: int) -> tuple:
+        """ Color of the screen point: (red, green, blue) """
+
+
+class PyautoguiBackend(InputBackend):
+    """ Real keyboard and screen """
+
+    def __init__(self):
+        import pyautogui  # Heavy import. Only autotype needs it
+
+        self.pyautogui = pyautogui
+
+    def write(self, text: str):
+        self.pyautogui.write(text)
+
+    def press(self, key: str, presses=1):
+        self.pyautogui.press(key, presses=presses)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def window_title(self) -> str:
+        # Available on Windows only
+        get_title = getattr(self.pyautogui, 'getActiveWindowTitle', None)
+        return (get_title() or '') if get_title else ''
+
+    def pixel(self, x: int, y: int) -> tuple:
+        return tuple(self.pyautogui.pixel(x, y))[:3]
+
+
+def parse_readiness(spec: str):
+    """
+    Readiness check in text form:
+    'title:<regular expression>' - title of the active window matches the expression (case is ignored),
+    'pixel:<x>,<y>,<RRGGBB>' - screen point has the color
+    :return: (kind, arguments)
+    :raise ValueError: wrong check
+    """
+    kind, _, argument = spec.partition(':')
+    kind = kind.strip().lower()
+    if kind == 'title' and argument:
+        try:
+            return kind, re.compile(argument, re.IGNORECASE)
+        except re.error as err:
+            raise ValueError(f"Wrong regular expression {argument!r}: {err}") from None
+    if kind == 'pixel':
+        match = re.fullmatch(r' *(\d+) *, *(\d+) *, *#?([0-9a-fA-F]{6}) *', argument)
+        if match:
+            color = match.group(3)
+            return kind, (int(match.group(1)), int(match.group(2)),
+                          tuple(int(color[index:index + 2], 16) for index in (0, 2, 4)))
+    raise ValueError(f"Wrong readiness check {spec!r}. Use 'title:<regular expression>' or 'pixel:<x>,<y>,<RRGGBB>'")
+
+
+def readiness(spec: str, backend: InputBackend = None):
+    """ Readiness check as function without arguments returning True when window is ready. None - no check """
+    if not spec:
+        return None
+    backend = backend if backend else get_backend()
+    kind, argument = parse_readiness(spec)
+    if kind == 'title':
+        return lambda: bool(argument.search(backend.window_title()))
+    x, y, color = argument
+    return lambda: backend.pixel(x, y) == color
+
+
+def wait_until(ready, timeout, interval=POLL_INTERVAL) -> bool:
+    """
+    Wait until ready() returns True, but not longer than timeout seconds. Without check wait lasts timeout seconds
+    :return: False if window was not ready in time
+    """
+    if ready is None:
+        time.sleep(timeout)
+        return True
+    finish = time.monotonic() + timeout
+    while not ready():
+        left = finish - time.monotonic()
+        if left <= 0:
+            return False
+        time.sleep(min(interval, left))
+    return True
+
+
+def execute(program, fields: dict, backend: InputBackend = None, ready=None, wait=wait_until):
+    """
+    Run compiled autotype program
+    :param program: steps of compile_sequence()
+    :param fields: values of 'write' steps: {'user': ..., 'password': ...}
+    :param backend: input backend. Default: backend of the process
+    :param ready: readiness check used by 'wait' steps
+    :param wait: function waiting for readiness: wait(ready, timeout)
+    """
+    backend = backend if backend else get_backend()
+    for step in program:
+        if step.action == 'write':
+            backend.write(str(fields[step.value]))
+        elif step.action == 'press':
+            backend.press(*step.value)
+        else:
+            wait(ready, step.value)
+
+
+_backend = None
+
+
+def get_backend() -> InputBackend:
+    """ Input backend of the process. Default: PyautoguiBackend """
+    global _backend
+    if _backend is None:
+        _backend = PyautoguiBackend()
+    return _backend
+
+
+def set_backend(backend: InputBackend):
+    """ Replace input backend of the process. None - default backend """
+    global _backend
+    _backend = backend
@@ -0,0 +1,30 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Subcommands of sap-from-command-line tool. Modules are imported by sap.cli.LazyGroup on demand """
+
+from contextlib import contextmanager
+
+import sap
+
+
+@contextmanager
+def _sap_db(obj, read_only=False):
+    """
+    Database session of the command
+    :param read_only: command only reads: SQLite database is opened in read only mode, so concurrent commands
+        do not wait for each other
+    """
+    if obj.database is not None:
+        # Session is kept open by 'sap shell' or by outer block of the same command
+        yield
+        return
+
+    obj.database = sap.start_sap_db(obj.config.db_path, obj.config.db_type, obj.config.db_pragmas, read_only,
+                                    read_only and obj.config.db_immutable)
+    try:
+        yield
+    finally:
+        obj.database = None
+        sap.stop_sap_db()
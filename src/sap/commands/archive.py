@@ -0,0 +1,68 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Command to create backup: backup """
+
+import rich_click as click
+
+from sap import utilities
+from sap.backup import Backup
+from sap.database import SapDB
+from sap.landscape import landscape_path
+
+
+@click.command("backup", short_help="Create backup")
+@click.option("-password", help="Password for backup", prompt=True, confirmation_prompt=True, hide_input=True,
+              type=utilities.PASS_REQUIREMENT)
+@click.option('-skip_message', is_flag=True, default=False, help="Skip result message")
+@click.pass_context
+def backup(ctx, password, skip_message):
+    """
+    \b
+    Create backup for the following files:
+    1. list of saplogon systems (SAPUILandscape.xml)
+    2. database
+    3. encryption keys (private, public and data key)
+    4. sap_config.ini
+    """
+
+    # -------------------------------------------
+    # Files to archive:
+    # -------------------------------------------
+
+    saplogon_ini_path = landscape_path()
+
+    file_list = [
+        ctx.obj.config.db_path,
+        ctx.obj.config.public_key_path,
+        ctx.obj.config.private_key_path,
+        ctx.obj.crypto.data_key_path,
+        ctx.obj.config.config_file_path,
+        saplogon_ini_path,
+    ]
+    # -------------------------------------------
+
+    # Changes kept in write-ahead log are moved into database file, so backup has all of them
+    SapDB(ctx.obj.config.db_path, ctx.obj.config.db_type, ctx.obj.config.db_pragmas).checkpoint()
+
+    cofig_file_folder = ctx.obj.config.config_path
+
+    backup_obj = Backup(password, cofig_file_folder, file_list)
+    back_path = backup_obj.create()
+
+    if back_path.exists():
+        if not skip_message:
+            utilities.print_message(f'Backup successfully created: {back_path}',
+                                    message_type=utilities.message_type_message)
+            try:
+                click.launch(url=back_path, locate=True)
+            except TypeError as err:
+                click.echo(click.style(f"{err}", **utilities.color_warning))
+                raise click.Abort
+        else:
+            click.echo(backup_obj.backup_file_path)
+    else:
+        utilities.print_message('Backup creation failed', message_type=utilities.message_type_error)
+        click.echo()
+
@@ -0,0 +1,223 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to create and maintain working files: start, db, keys, migrate-crypto """
+
+import time
+from pathlib import Path
+
+import rich_click as click
+from rich.console import Console
+from rich.markdown import Markdown
+
+import sap
+from sap import utilities
+from sap.commands import _sap_db
+from sap.crypto import KeyRotation
+from sap.database import SapDB
+from sap.exceptions import ConfigExists, EncryptionKeysAlreadyExist, DatabaseExists, DatabaseDoesNotExists
+from sap.migrations import LATEST_VERSION
+
+
+@click.command("db")
+@click.option("-u", "--upgrade", "upgrade", help="Flag. Upgrade schema of existing database", is_flag=True,
+              default=False)
+@click.option("-b", "--batch", "batch", help="Number of rows processed in one transaction by upgrade",
+              type=click.IntRange(min=1), default=500, show_default=True)
+@click.pass_context
+def database(ctx, upgrade: bool, batch: int):
+    """
+    \b
+    Database creation. This command is used for technical purpose. Better run 'sap start' command.
+    \b
+    With '--upgrade' flag schema of existing database is upgraded to the version of application.
+    Long migrations are applied in batches. If upgrade is interrupted, run 'sap db --upgrade' again to finish it.
+    """
+    ctx.obj.database = SapDB(db_path=ctx.obj.config.db_path if ctx.obj.config.db_path else '',
+                             pragmas=ctx.obj.config.db_pragmas)
+
+    if upgrade:
+        upgrade_database(ctx.obj.database, batch)
+        return
+
+    try:
+        ctx.obj.database.create()
+    except DatabaseExists as err:
+        utilities.print_message(f"{err}", utilities.message_type_warning)
+        raise click.Abort
+
+
+def upgrade_database(database: SapDB, batch: int):
+    """ Apply migrations which are not applied yet and print progress """
+    if not database.database_path.exists():
+        utilities.print_message(f"{DatabaseDoesNotExists(database.database_path)}", utilities.message_type_error)
+        raise click.Abort
+
+    started = time.monotonic()
+    processed = {}
+
+    def progress(migration, rows):
+        processed[migration.version] = processed.get(migration.version, 0) + rows
+        click.echo(f"Migration {migration.version} of {LATEST_VERSION}: {migration.description}"
+                   + (f". Rows: {processed[migration.version]}" if processed[migration.version] else ""))
+
+    version = database.upgrade(batch, progress)
+    utilities.print_message(f"Database schema version: {version}. Time: {time.monotonic() - started:.1f} seconds",
+                            utilities.message_type_message)
+
+
+@click.command("keys")
+@click.option("-r", "--rotate", "rotate", help="Flag. Replace encryption keys and re-encrypt all passwords",
+              is_flag=True, default=False, show_default=True)
+@click.option("-b", "--batch", "batch", help="Number of passwords re-encrypted in one transaction",
+              type=click.IntRange(min=1), default=500, show_default=True)
+@click.pass_context
+def keys(ctx, rotate: bool, batch: int):
+    """
+    \b
+    Encryption keys creation. This command is used for technical purpose. Better run 'sap start' command.
+    \b
+    With '--rotate' flag new keys are generated and all passwords are re-encrypted in batches.
+    If rotation is interrupted, run 'sap keys --rotate' again to finish it.
+    """
+    if rotate:
+        rotate_keys(ctx, batch)
+        return
+
+    try:
+        ctx.obj.crypto.generate_keys()
+    except EncryptionKeysAlreadyExist as err:
+        utilities.print_message(f"{err}", utilities.message_type_warning)
+        raise click.Abort
+
+
+def rotate_keys(ctx, batch: int):
+    """ Generate new keys, re-encrypt passwords batch by batch and replace keys """
+    if not Path(ctx.obj.config.db_path).exists():
+        utilities.print_message(f"Database does not exist: {ctx.obj.config.db_path}", utilities.message_type_error)
+        raise click.Abort
+
+    rotation = KeyRotation(ctx.obj.crypto)
+
+    if rotation.stage is None:
+        rotation.start()
+    else:
+        utilities.print_message("Continue interrupted key rotation", utilities.message_type_message)
+
+    reencrypted = processed = 0
+    if rotation.stage == KeyRotation.STAGE_REENCRYPT:
+        started = time.monotonic()
+        with _sap_db(ctx.obj), rotation.crypto.process_pool():
+            for records in password_batches(batch):
+                passwords = rotation.reencrypt([record[4] for record in records])
+                changed = [(*record[:4], password) for record, password in zip(records, passwords) if password]
+                if changed:
+                    sap.update_passwords(changed)
+                reencrypted += len(changed)
+                processed += len(records)
+                click.echo(f"Processed: {processed}, re-encrypted: {reencrypted}, "
+                           f"{processed / max(time.monotonic() - started, 1e-6):.0f} rows/sec")
+
+    rotation.swap()
+    utilities.print_message(f"Encryption keys are replaced. Passwords re-encrypted: {reencrypted}",
+                            utilities.message_type_message)
+
+
+def password_batches(batch_size):
+    """ Read (customer, system, client, user, password) records with password from database batch by batch """
+    after = None
+    while True:
+        records = sap.query_passwords(after, batch_size)
+        if not records:
+            return
+        after = tuple(records[-1][:4])
+        yield [record for record in records if record[4]]
+
+
+@click.command("migrate-crypto", short_help="Convert stored passwords to envelope encryption")
+@click.option("-b", "--batch", "batch", help="Number of passwords converted in one transaction",
+              type=click.IntRange(min=1), default=500, show_default=True)
+@click.pass_context
+def migrate_crypto(ctx, batch: int):
+    """
+    \b
+    Convert passwords encrypted with RSA keys to envelope format:
+    passwords are encrypted with data key, data key is encrypted with RSA public key.
+    Every batch is saved in its own transaction, so conversion can be interrupted and started again.
+    """
+    crypto = ctx.obj.crypto
+
+    if not crypto.envelope():
+        crypto.generate_data_key()
+
+    converted = 0
+    with _sap_db(ctx.obj), crypto.process_pool():
+        for records in password_batches(batch):
+            records = [record for record in records if not crypto.is_envelope(record[4])]
+            passwords = crypto.decrypt_many(record[4] for record in records)
+            changed = [(*record[:4], crypto.encrypto(str.encode(password)))
+                       for record, password in zip(records, passwords)]
+            if changed:
+                sap.update_passwords(changed)
+                converted += len(changed)
+
+    utilities.print_message(f"Passwords converted to envelope encryption: {converted}",
+                            utilities.message_type_message)
+
+
+@click.command("start", short_help="Starting point for working with SAP command line tool")
+@click.option('-skip_message', '--skip_message', 'skip_message', is_flag=True, default=False,
+              help="Skip result message")
+@click.pass_context
+def start(ctx, skip_message):
+    """
+    \b
+    Starting point for working with SAP command line tool
+    1. Database creation.
+    2. ini file with config parameters creation.
+    3. Private and public encryption keys.
+    4. Useful messages.
+    """
+
+    click.clear()
+
+    try:
+        ctx.obj.config.create()
+    except ConfigExists as err:
+        utilities.print_message(f"{err}", message_type=utilities.message_type_warning)
+        raise click.Abort
+
+    try:
+        ctx.obj.crypto.generate_keys()
+    except EncryptionKeysAlreadyExist as err:
+        utilities.print_message(f"{err}", message_type=utilities.message_type_warning)
+        raise click.Abort
+
+    ctx.obj.database = SapDB(db_path=ctx.obj.config.db_path if ctx.obj.config.db_path else '',
+                             pragmas=ctx.obj.config.db_pragmas)
+
+    try:
+        ctx.obj.database.create()
+    except DatabaseExists as err:
+        utilities.print_message(f"{err}", message_type=utilities.message_type_warning)
+        raise click.Abort
+
+    if not skip_message:
+        folder = Path(__file__).parent
+        filename = 'start.md'
+        path = folder.parent / filename
+        start_markdown_text = ""
+
+        with open(path, mode='rt', encoding='utf-8') as file:
+            start_markdown_text += str(file.read())
+
+        console = Console()
+        markdown_text = Markdown(str(start_markdown_text))
+        console.print(markdown_text)
+
+        click.pause('\nPress enter to open files folder and start working. Good luck.')
+
+        click.launch(str(ctx.obj.config.config_file_path), locate=True)
+    else:
+        click.echo(ctx.obj.config.config_file_path)
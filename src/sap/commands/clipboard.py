@@ -0,0 +1,91 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Command to copy values of SAP systems into clipboard: copy """
+
+import sys
+
+import rich_click as click
+import pyperclip
+
+from sap import agent
+from sap import utilities
+from sap.api import Sap_system
+from sap.commands.systems import list_systems
+
+
+@click.command("copy")
+@click.argument("command", required=True, type=click.STRING)
+@click.argument("system", required=False, type=utilities.SYSTEM_ID)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option('--clear/--no_clear', "clear_clipboard", is_flag=True, default=True,
+              help='Clear clipboard', show_default=True)
+@click.option('-time', "--timeout", "timeout", show_default=True,
+              type=click.INT, help='Timer in seconds to clear clipboard',
+              cls=utilities.default_from_context('time_to_clear'))
+@click.pass_context
+def copy(ctx, command: str, system: str, client: int, user: str, customer: str, description: str,
+         clear_clipboard: bool,
+         timeout: int):
+    """
+    \b
+    Copy a value for the requested system into clipboard. Clipboard with password is cleared in 10 seconds
+    in background.\n
+    \b
+    Required argument:
+    1. COMMAND: What value to copy: user, password, URL
+    Optional argument:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    """
+
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description,
+                              url=False, verbose=False, enum=True)
+    # --------------------------
+    if query_result:
+        selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+        selected_system = utilities.choose_system(selected_sap_systems)
+
+        if command == 'user':
+            pyperclip.copy(selected_system.user)
+        elif command == 'pw' or command == 'password':
+            pyperclip.copy(str(selected_system.password))
+        elif command == 'url':
+            pyperclip.copy(selected_system.url)
+        elif command == 'desc' or command == 'description':
+            pyperclip.copy(selected_system.description)
+        elif command == 'customer':
+            pyperclip.copy(selected_system.customer)
+        else:
+            utilities.print_message(f"'{command}' is not a valid command", message_type=utilities.message_type_error)
+            sys.exit()
+
+        utilities.print_message(f"{command} is copied into clipboard.", message_type=utilities.message_type_message)
+
+        if (command == 'pw' or command == 'password') and clear_clipboard:
+            utilities.print_message(
+                "If you use Clipboard managers, you should add PY.EXE, CMD.EXE applications to the exclusion list,\nin order to keep sensitive information safe from copying to clipboard manager.",
+                message_type=utilities.message_type_sensitive)
+
+            utilities.print_message(f"Clipboard will be cleared in {timeout} seconds.",
+                                    message_type=utilities.message_type_message)
+
+            if utilities.clear_later('clipboard', timeout):
+                return
+
+            try:
+                utilities.countdown(timeout, 'Clearing in ...')
+            except KeyboardInterrupt:
+                click.echo("\n")
+                utilities.print_message("Aborted",
+                                        message_type=utilities.message_type_error)
+            agent.clear_clipboard()
+
+            click.echo("\n")
+            utilities.print_message("Clipboard is cleared.", message_type=utilities.message_type_message)
@@ -0,0 +1,97 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to manage background daemon: daemon start, daemon stop, daemon status """
+
+import subprocess
+import sys
+import time
+
+import rich_click as click
+
+from sap import utilities
+from sap.daemon import SapDaemon, connect
+
+DAEMON_START_TIMEOUT = 10  # seconds
+
+
+@click.group("daemon")
+def daemon():
+    """
+    \b
+    Background daemon keeps config, database connection and encryption keys in memory.
+    While daemon is running, commands run, list, copy, stat, debug, login and shut are served by daemon.
+    """
+
+
+@daemon.command("start")
+@click.option("-f", "--foreground", "foreground", help="Flag. Run daemon in the current console", is_flag=True,
+              default=False, show_default=True)
+@click.pass_context
+def daemon_start(ctx, foreground: bool):
+    """ Start daemon for the current config folder """
+
+    config_path = ctx.obj.config.config_path
+
+    if connect(config_path):
+        utilities.print_message(f"Daemon is already running for {config_path}", utilities.message_type_warning)
+        raise click.Abort
+
+    if foreground:
+        utilities.print_message(f"Daemon is running for {config_path}. Run 'sap daemon stop' to stop it",
+                                utilities.message_type_message)
+        SapDaemon(config_path).serve()
+        return
+
+    if sys.platform == 'win32':
+        detached = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        detached = {'start_new_session': True}
+
+    subprocess.Popen([sys.executable, '-m', 'sap.daemon', str(config_path)], stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True, **detached)
+
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while time.monotonic() < deadline:
+        client = connect(config_path)
+        if client:
+            utilities.print_message(f"Daemon is started. PID: {client.ping()['pid']}", utilities.message_type_message)
+            return
+        time.sleep(0.1)
+
+    utilities.print_message(f"Failed to start daemon in {DAEMON_START_TIMEOUT} seconds. "
+                            f"Run 'sap daemon start -f' to see errors", utilities.message_type_error)
+    raise click.Abort
+
+
+@daemon.command("stop")
+@click.pass_context
+def daemon_stop(ctx):
+    """ Stop daemon for the current config folder """
+
+    client = connect(ctx.obj.config.config_path)
+    if not client:
+        utilities.print_message("Daemon is not running", utilities.message_type_warning)
+        return
+
+    client.stop()
+    utilities.print_message("Daemon is stopped", utilities.message_type_message)
+
+
+@daemon.command("status")
+@click.pass_context
+def daemon_status(ctx):
+    """ Display daemon status for the current config folder """
+
+    client = connect(ctx.obj.config.config_path)
+    if not client:
+        utilities.print_message("Daemon is not running", utilities.message_type_message)
+        return
+
+    info = client.ping()
+    message = f"Daemon is running for {info['config_path']}"
+    message += f"\nPID: {info['pid']}"
+    message += f"\nUptime: {int(time.time() - info['started'])} seconds"
+    message += f"\nRequests served: {info['requests']}"
+    utilities.print_message(message, utilities.message_type_message)
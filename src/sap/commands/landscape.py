@@ -0,0 +1,86 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Command to synchronize systems with SAP Logon: landscape-sync """
+
+import time
+from pathlib import Path
+from xml.etree.ElementTree import ParseError
+
+import rich_click as click
+
+import sap
+from sap import utilities
+from sap import landscape
+from sap.commands import _sap_db
+
+
+@click.command("landscape-sync", short_help="Synchronize systems with SAP Logon landscape file")
+@click.option("-client", help="Client of added systems. Prompted if landscape file has to be synchronized",
+              type=utilities.client, default=None)
+@click.option("-user", help="User of added systems. Prompted if landscape file has to be synchronized", default=None)
+@click.option("-language", help="Language of added systems. Default: language from config",
+              type=utilities.DEFAULT_LANG, default=None)
+@click.option("-f", "--file", "file", help="Path to SAPUILandscape.xml. Default: %APPDATA%\\SAP\\Common",
+              type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--force", "force", help="Flag. Synchronize even if landscape file is not changed since last sync",
+              is_flag=True, default=False)
+@click.pass_context
+def landscape_sync(ctx, client: str, user: str, language: str, file: Path, force: bool):
+    """
+    \b
+    Add systems of SAP Logon (SAPUILandscape.xml) to database. The name of SAP Logon folder is used as customer.
+    Next runs apply only changes: new systems are added, renamed ones are updated,
+    systems removed from SAP Logon are deleted. Passwords and systems added by other commands are not changed.
+    Unchanged landscape file is skipped without prompts if client, user and language are the same as of the last sync.
+    """
+
+    path = file if file else landscape.landscape_path()
+    if not path.is_file():
+        utilities.print_message(f"Landscape file does not exist: {path}", utilities.message_type_error)
+        raise click.Abort
+
+    language = (language if language else ctx.obj.config.language).upper()
+    if user:
+        user = user.upper() if '@' not in user else user
+
+    started = time.monotonic()
+    with _sap_db(ctx.obj):
+        stored = sap.landscape_file()
+        state = landscape.file_state(path)
+
+        # Client and user which are not entered are the same as of the last sync
+        same_values = stored is not None and client in (None, stored.client) and user in (None, stored.user) and \
+            language == stored.language
+        if not force and same_values and tuple(stored[:3]) == state[:3]:
+            utilities.print_message(f"Landscape file is not changed since last sync: {path}",
+                                    utilities.message_type_message)
+            return
+
+        if client is None:
+            client = click.prompt("Client", type=utilities.client, default=stored.client if stored else None)
+        if user is None:
+            user = click.prompt("User", default=stored.user if stored else None)
+            user = user.upper() if '@' not in user else user
+
+        state = state._replace(digest=landscape.file_digest(path), client=client, user=user, language=language)
+        if not force and stored is not None and stored.path == state.path and tuple(stored[3:]) == state[3:]:
+            # File is saved again without changes
+            sap.save_landscape_file(state)
+            utilities.print_message(f"Landscape file is not changed since last sync: {path}",
+                                    utilities.message_type_message)
+            return
+
+        try:
+            entries = landscape.read_landscape(path)
+        except ParseError as err:
+            utilities.print_message(f"Landscape file is not valid XML: {path}\n{err}", utilities.message_type_error)
+            raise click.Abort
+
+        result = sap.sync_landscape(entries, client, user, language, state)
+
+    message = f"Landscape file: {path}\nSystems in landscape file: {len(entries)}\n"
+    message += "\n".join(f"{name.capitalize()}: {count}" for name, count in result.items())
+    message += f"\nTime: {time.monotonic() - started:.2f} seconds"
+    utilities.print_message(message, utilities.message_type_message)
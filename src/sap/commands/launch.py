@@ -0,0 +1,411 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to launch SAP systems: run, shut, login, debug, stat """
+
+import time
+from itertools import chain
+from pathlib import Path
+
+import rich_click as click
+
+from sap import autotype
+from sap import launcher
+from sap import utilities
+from sap.api import Sap_system, DEBUG_FILE_NAME
+from sap.cli import logger
+from sap.commands import _sap_db
+from sap.commands.systems import list_systems
+from sap.exceptions import WrongPath
+
+
+@click.command("shut")
+@click.argument("system", required=False, type=click.STRING)
+@click.argument("client", required=False, type=utilities.client)
+@click.pass_context
+def shut(ctx, system: str, client: str):
+    """
+    \b
+    Shut down the selected system\n
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    """
+    # SAP RUN SYS_ID -s /nex
+
+    ctx.invoke(run, system=system, client=client, system_command='/nex')
+
+
+@click.command("run")
+@click.argument("system", required=False, type=utilities.SYSTEM_ID)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user", type=click.STRING)
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option("-eu", "--external_user", "external_user", default=False, is_flag=True,
+              help="Flag. Launch sap system with external user (outside database)")
+@click.option("-l", "--language", "language", help="Logon language", type=click.STRING)
+@click.option("-g", "--guiparm", "guiparm", help="Parameter of sapgui.exe", type=click.STRING)
+@click.option("-sname", "--snc_name", "snc_name",
+              help="SNC name of the SAP system; required for the logon via Secure Network Communication (SNC)",
+              type=click.STRING)
+@click.option("-sqop", "--snc_qop", "snc_qop", help="Activation of the logon via Secure Network Communication (SNC)",
+              type=click.STRING)
+@click.option("-t", "--transaction", "transaction", help="Run transaction ", type=click.STRING)
+@click.option("-s", "--system_cmd", "system_command",
+              help="Run system command: /n, /o, /i, /nend, /nex, /*<transaction_code>, /n<transaction_code>, /o<transaction_code>, /h")
+@click.option("-r", "--report", "report", help="Run report (report name for SE38 transaction)", type=click.STRING)
+@click.option("-p", "--parameter", "parameter", help="Transaction's parameters")
+@click.option("-w", "--web", "web", help="Flag. Launch system's web site", default=False, is_flag=True)
+@click.option('-time', "--timeout", "timeout", show_default=True,
+              type=click.INT, help='Timer in seconds to wait web site to load',
+              cls=utilities.default_from_context('wait_site_to_load'))
+@click.option("-ready", "--ready", "ready", type=utilities.READY,
+              help="Stop waiting for web site when it is ready: 'title:<regex>' of browser window or "
+                   "'pixel:<x>,<y>,<RRGGBB>'")
+@click.option("-n", "--new", "reuse", help="Flag. Defines whether a new connection to an SAP is reused",
+              default=False, is_flag=True, show_default=True)
+@click.option("-li", "--login", "signin", help="Login to the just opened web system",
+              default=False, is_flag=True, show_default=True)
+@click.option("-b", "--browser", "browser",
+              help=f"Choose a browser to open selected SAP system: {utilities.list_of_browsers()}",
+              type=utilities.BROWSER)
+@click.option("-a", "--all", "launch_all", help="Flag. Launch all found systems", default=False, is_flag=True)
+@click.option("-sel", "--select", "selection", help="Launch several found systems by numbers and ranges: '1-3,5'",
+              type=click.STRING)
+@click.option("-j", "--jobs", "jobs", help="Number of systems launched at the same time",
+              type=click.IntRange(min=1, max=32), default=4, show_default=True)
+@click.option("--retry", "retry", help="Number of retries of failed launch", type=click.IntRange(min=0, max=5),
+              default=1, show_default=True)
+@click.pass_context
+def run(ctx, system: str, client: int, user: str, customer: str, description: str, external_user: bool,
+        language: str, guiparm: str, snc_name: str, snc_qop: str, transaction: str, system_command: str, report: str,
+        parameter: str, web: bool, timeout: int, reuse: bool, signin: bool, browser: str, launch_all: bool = False,
+        selection: str = None, jobs: int = 4, retry: int = 1, ready: str = None):
+    """
+    \b
+    Launch SAP system \n
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    \b
+    Several systems are launched with '--all' (all found systems, e.g. all systems of customer '-c')
+    or '--select' (numbers of the printed list). They are launched at the same time by '--jobs' workers,
+    failed launches are retried.
+    """
+
+    if (launch_all or selection) and (web or external_user):
+        utilities.print_message("\nSeveral systems are launched only in SAP GUI with users from database",
+                                utilities.message_type_warning)
+        raise click.Abort
+
+    if snc_name is not None and snc_qop is None or snc_name is None and snc_qop is not None:
+        utilities.print_message("\nBoth parameters must be used: -sname/--snc_name and -sqop/--snc_qop",
+                                utilities.message_type_warning)
+        raise click.Abort
+
+    if transaction and parameter and not ctx.obj.daemon:
+        # One session for system query and transaction parameters query
+        ctx.with_resource(_sap_db(ctx.obj, read_only=True))
+
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description,
+                              url=web, verbose=False, enum=True)
+    if not query_result:
+        return
+    # --------------------------
+    selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+    if launch_all or selection:
+        try:
+            selected = selected_sap_systems if launch_all else utilities.choose_systems(selected_sap_systems,
+                                                                                        selection)
+        except click.BadParameter as err:
+            utilities.print_message(err.format_message(), utilities.message_type_error)
+            raise click.Abort
+        launch_systems(ctx, [item for item in selected if item.only_web != 'yes'], jobs, retry,
+                       guiparm=guiparm, snc_name=snc_name, snc_qop=snc_qop, transaction=transaction,
+                       parameter=parameter, report=report, system_command=system_command, reuse=reuse,
+                       language=language)
+        return
+
+    selected_system = utilities.choose_system(selected_sap_systems)
+
+    if web or selected_system.only_web == 'yes':
+        if selected_system.url != " ":
+            utilities.print_message(
+                f"Launching web site: {selected_system.url} ({selected_system.description} of {selected_system.customer})",
+                message_type=utilities.message_type_message)
+
+            if browser:  # Selected browser
+                ctx.obj.config.browsers_params[browser].append(selected_system.url)
+
+                try:
+                    utilities.launch_command_line_with_params(ctx.obj.config.browsers_path[browser],
+                                                              ctx.obj.config.browsers_params[browser])
+                except WrongPath as err:
+                    utilities.print_message(f"{err}", utilities.message_type_error)
+                    exit()
+            else:  # Default browser
+                utilities.open_url(f"{selected_system.url}")
+
+            if signin:
+                ctx.invoke(login, system=selected_system.system, client=selected_system.client,
+                           user=selected_system.user, customer=selected_system.customer,
+                           description=selected_system.description,
+                           language=language if language else selected_system.language, timeout=timeout,
+                           minimize=False, ready=ready)
+
+        else:
+            no_system_found = Sap_system(system.upper() if system else None,
+                                         str(client).zfill(3) if client else None,
+                                         user.upper() if user else None,
+                                         None,
+                                         None,
+                                         customer.upper() if customer else None,
+                                         description.upper() if description else None,
+                                         None,
+                                         None,
+                                         None)
+
+            utilities.print_system_list(no_system_found, title="NO URL FOUND according to search criteria",
+                                        color=utilities.color_warning, url=True)
+            raise click.Abort
+    else:
+
+        argument, selected_system, command, command_type = utilities.prepare_parameters_to_launch_system(
+            selected_system,
+            external_user,
+            guiparm,
+            snc_name,
+            snc_qop,
+            transaction,
+            parameter,
+            report,
+            system_command,
+            reuse,
+            ctx.obj.config.command_line_path,
+            language)
+
+        if external_user:
+            message = "Trying to LAUNCH the following system with EXTERNAL USER"
+        else:
+            message = "Trying to LAUNCH the following system "
+
+        utilities.print_system_list(selected_system, title=message,
+                                    command=command, command_type=command_type)
+
+        logger.info(f"{argument}")
+
+        # SAP Launching
+        utilities.open_sap(argument)
+
+
+def launch_systems(ctx, sap_systems: list, jobs: int, retry: int, **parameters):
+    """ Launch SAP GUI of several systems by pool of workers and print status of every launch """
+    if not sap_systems:
+        utilities.print_message("There are no systems to launch in SAP GUI", utilities.message_type_warning)
+        return
+
+    launches = []
+    # Systems whose command line can not be prepared are reported with failed launches
+    not_prepared = []
+    command = command_type = None
+    for sap_system in sap_systems:
+        title = f"{sap_system.system} {sap_system.client} {sap_system.user}"
+        try:
+            argument, _, command, command_type = utilities.prepare_parameters_to_launch_system(
+                sap_system, sapshcut_exe_path=ctx.obj.config.command_line_path, abort_on_wrong_path=False,
+                **parameters)
+        except WrongPath as err:
+            not_prepared.append(launcher.LaunchResult(title, None, 0, 0.0, ' '.join(f"{err}".split())))
+            continue
+        launches.append((title, argument))
+
+    utilities.print_system_list(*sap_systems, title="Trying to LAUNCH the following systems", command=command,
+                                command_type=command_type)
+    logger.info(f"Launch of {len(launches)} systems: {', '.join(title for title, _ in launches)}")
+
+    started = time.monotonic()
+    failed = []
+    results = launcher.launch_many(launches, workers=jobs, retries=retry,
+                                   launcher=launcher.get_launcher(ctx.obj.config.config_path))
+    for result in chain(not_prepared, results):
+        status = "OK" if result.returncode == 0 else \
+            f"FAILED ({result.error if result.error else f'exit code {result.returncode}'})"
+        click.echo(f"{result.title}: {status}, attempts: {result.attempts}, {result.seconds:.1f} seconds")
+        if result.returncode != 0:
+            failed.append(result.title)
+
+    message = f"Launched: {len(sap_systems) - len(failed)} of {len(sap_systems)} in " \
+              f"{time.monotonic() - started:.1f} seconds"
+    if failed:
+        utilities.print_message(f"{message}\nFailed: {', '.join(failed)}", utilities.message_type_warning)
+        ctx.exit(1)
+    utilities.print_message(message, utilities.message_type_message)
+
+
+@click.command("login")
+@click.argument("system", required=False, type=click.STRING)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option("-l", "--language", "language", help="Logon language", type=click.STRING)
+@click.option('-time', "--timeout", "timeout", show_default=True, type=click.INT,
+              help='Timer in seconds to wait web site to load')
+@click.option("-ready", "--ready", "ready", type=utilities.READY,
+              help="Stop waiting for web site when it is ready: 'title:<regex>' of browser window or "
+                   "'pixel:<x>,<y>,<RRGGBB>'")
+@click.option("-m", "--minimize", "minimize", show_default=True, default=True, is_flag=True)
+@click.pass_context
+def login(ctx, system: str, client: int, user: str, customer: str, description: str, language: str, timeout: int,
+          minimize: bool, ready: str = None):
+    """
+    Login to web system: enter user and password. The website has to be opened.
+    With '--ready' waits ('--timeout' and {DELAY n} of autotype sequence) end as soon as web site is ready.
+    """
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description, url="", verbose=False, enum=True)
+    if not query_result:
+        return
+    # --------------------------
+    selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+    selected_system = utilities.choose_system(selected_sap_systems)
+
+    if timeout:
+        utilities.wait_for_site(autotype.readiness(ready), timeout)
+    utilities.launch_autotype_sequence(selected_system, language, minimize=minimize, ready=ready)
+
+
+@click.command("debug", short_help="System debug: either create debug file or start system debugging")
+@click.argument("system", required=False, type=utilities.SYSTEM_ID)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option("-g", "--guiparm", "guiparm", help="Parameter of sapgui.exe", type=click.STRING)
+@click.option("-sname", "--snc_name", "snc_name",
+              help="SNC name of the SAP system; required for the logon via Secure Network Communication (SNC)",
+              type=click.STRING)
+@click.option("-sqop", "--snc_qop", "snc_qop", help="Activation of the logon via Secure Network Communication (SNC)",
+              type=click.STRING)
+@click.option("-f", "--file", "file", help="Flag. Create debug file", is_flag=True, type=click.BOOL)
+@click.option('-open/-not_open', "open_file", help="Open/Not Open: file with debug file", is_flag=True,
+              default=True, show_default=True)
+@click.pass_context
+def debug(ctx, system: str, client: str, user: str, customer: str, description: str, guiparm: str,
+          snc_name: str, snc_qop: str, file: bool, open_file: bool):
+    """
+    \b
+    System debug
+    You can:
+    1. Creat debug file - to debug modal dialog box: run 'sap debug -f'
+    2. Start debugging of the opened system (the last used windows will be used): run 'sap debug <system> <client>'
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system
+    2. CLIENT: Request a SAP system by client/client
+    """
+
+    if file:
+        debug_folder = ctx.obj.config.config_path if ctx.obj.config.config_path else utilities.path()
+        debug_file_path = Path(debug_folder / DEBUG_FILE_NAME)
+
+        debug_markdown = f"""
+        # DEBUG
+
+        {debug_file_path} file will be created.
+        After creation, a folder with {DEBUG_FILE_NAME} file will be opened
+        Drag the file to the SAP system to start debug mode
+        """
+
+        utilities.print_markdown(debug_markdown)
+
+        with open(debug_file_path, "w", encoding='utf-8') as writer:
+            writer.write("[FUNCTION]\n")
+            writer.write("Command =/H\n")
+            writer.write("Title=Debugger\n")
+            writer.write("Type=SystemCommand")
+
+        if open_file:
+            utilities.open_url(url=str(debug_file_path), locate=True)
+
+    else:
+        query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                                  description=description,
+                                  url=False, verbose=False, enum=True)
+        if not query_result:
+            return
+
+        # --------------------------
+        selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+        # As soon as debugger stops working - revert all the changes to "prepare_parameters_to_launch_system"
+        #  as it influence whether to open new windows, or to debug the latest opened. All arguments
+        #  value must be entered
+        selected_system = utilities.choose_system(selected_sap_systems)
+        try:
+            argument, selected_system, command, command_type = utilities.prepare_parameters_to_launch_system(
+                selected_system, guiparm=guiparm, snc_name=snc_name, snc_qop=snc_qop,
+                sapshcut_exe_path=ctx.obj.config.command_line_path)
+
+        except WrongPath as err:
+            click.echo(f"{err}")
+            raise click.Abort
+
+        argument = argument + " -command=/H" + " -type=SystemCommand"
+
+        utilities.print_system_list(selected_system, title="Trying to DEBUG the following system")
+
+        logger.info(f"{argument}")
+
+        utilities.open_sap(argument)
+
+
+@click.command("stat")
+@click.argument("system", required=False, type=utilities.SYSTEM_ID)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.pass_context
+def stat(ctx, system: str, client: str, user: str, customer: str, description: str):
+    """
+    \b
+    Displays 'System: status' window \n
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    """
+
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description,
+                              url=False, verbose=False, enum=True)
+    # --------------------------
+    if query_result:
+        selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+        selected_system = utilities.choose_system(selected_sap_systems)
+        try:
+            argument, selected_system, command, command_type = utilities.prepare_parameters_to_launch_system(
+                selected_system, sapshcut_exe_path=ctx.obj.config.command_line_path
+            )
+
+        except WrongPath as err:
+            click.echo(f"{err}")
+            raise click.Abort
+
+        argument = argument + " -command=?STAT" + " -type=SystemCommand"
+
+        utilities.print_system_list(selected_system, title="Opening STATUS of the following system")
+
+        logger.info(f"{argument}")
+
+        utilities.open_sap(argument)
+
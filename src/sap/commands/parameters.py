@@ -0,0 +1,160 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to maintain transactions' parameters: parlist, pardel, paradd, parupdate """
+
+import rich_click as click
+
+import sap
+from sap import utilities
+from sap.api import Parameter
+from sap.commands import _sap_db
+
+
+@click.command("parlist")
+@click.argument("transaction", required=False, type=click.STRING)
+@click.option("-e", "--enum", "enum", help="Flag. Enumerate systems", is_flag=True, type=click.BOOL, default=False)
+@click.pass_context
+def parameter_list(ctx, transaction, enum):
+    """
+    \b
+    List transaction's parameters (Dynpro Fields) from database 'Parameters'
+    \b
+    Optional arguments:
+    1. TRANSACTION: Request parameters for specified transaction
+    """
+
+    param = Parameter(str(transaction).upper() if transaction else None, None)
+
+    with _sap_db(ctx.obj, read_only=True):
+        result = sap.query_param(param)
+
+        if not result:
+            param = Parameter(str(transaction).upper() if transaction else None, None)
+            utilities.print_parameters_list(param, title="NOTHING FOUND according to search criteria",
+                                            color=utilities.color_warning)
+        else:
+            parameters = [Parameter(item[0], item[1]) for item in result]
+            utilities.print_parameters_list(*parameters, title="Available transactions and parameters", enum=enum)
+
+        return result if result else None
+
+
+@click.command("pardel")
+@click.argument("transaction", required=False, type=click.STRING)
+@click.option("-confirm", "--confirm", "confirm", help="Confirm delete command", is_flag=True, default=False,
+              show_default=True)
+@click.pass_context
+def parameter_delete(ctx, transaction, confirm):
+    """
+    \b
+    Delete transaction's parameter (Dynpro Field) from database 'Parameters'
+    \b
+    Optional arguments:
+    1. TRANSACTION: Delete parameters for specified transaction
+    """
+
+    param = Parameter(str(transaction).upper() if transaction else None, None)
+
+    query_result = ctx.invoke(parameter_list, transaction=param.transaction, enum=True)
+    # --------------------------
+    if query_result:
+        selected_parameters = [Parameter(item[0], item[1]) for item in query_result]
+
+        selected_params = utilities.choose_parameter(selected_parameters)
+
+        message = "Trying to DELETE the following transaction and its parameters"
+        utilities.print_parameters_list(selected_params, title=message)
+
+        if not confirm:
+            click.confirm(click.style('\nDo you really want to delete the system?', **utilities.color_sensitive),
+                          abort=True, default=confirm)
+
+        parameter_to_delete = Parameter(selected_params.transaction,
+                                        selected_params.parameter)
+
+        with _sap_db(ctx.obj):
+            sap.delete_param(parameter_to_delete)
+
+            result = sap.query_param(parameter_to_delete)
+
+            if result is not None:
+
+                utilities.print_parameters_list(parameter_to_delete,
+                                                title="The following parameter is DELETED from database")
+            else:
+                no_parameter_found = Parameter(parameter_to_delete.transaction, parameter_to_delete.parameter)
+
+                utilities.print_parameters_list(no_parameter_found, title="FAILED TO UPDATE the following system",
+                                                color=utilities.color_warning)
+
+
+@click.command("paradd")
+@click.argument("transaction", required=False, type=click.STRING)
+@click.argument("parameter", required=False, type=click.STRING)
+@click.pass_context
+def parameter_add(ctx, transaction, parameter):
+    """
+    \b
+    Add transaction's parameter (Dynpro Field) to database 'Parameters'
+    \b
+    Optional arguments:
+    1. TRANSACTION: transaction
+    2. PARAMETER: parameter for transaction
+    """
+
+    param = Parameter(str(transaction).upper(), str(parameter).upper())
+
+    with _sap_db(ctx.obj):
+        result = sap.add_param(param)
+
+        if result is not None:
+            utilities.print_message("Failed to add system to database ... \n", utilities.message_type_error)
+            click.echo(result)
+        else:
+            ctx.invoke(parameter_list, transaction=param.transaction)
+
+
+@click.command("parupdate", short_help="Update record from database")
+@click.argument("transaction", required=False, type=click.STRING)
+@click.argument("parameter", required=False, type=click.STRING)
+@click.pass_context
+def parameter_update(ctx, transaction: str, parameter: str):
+    """
+    \b
+    Update transaction's parameters for selected transaction
+    \b
+    Optional arguments:
+    1. TRANSACTION: transaction
+    2. PARAMETER: parameter for transaction
+    """
+
+    param = Parameter(str(transaction).upper() if transaction else None, None)
+
+    query_result = ctx.invoke(parameter_list, transaction=param.transaction, enum=True)
+    # --------------------------
+    if query_result:
+        selected_parameters = [Parameter(item[0], item[1]) for item in query_result]
+
+        selected_params = utilities.choose_parameter(selected_parameters)
+
+        parameter_new = parameter if parameter else click.prompt(
+            f"\nEnter new parameters for transaction {selected_params.transaction}",
+            default=selected_params.parameter)
+
+        parameter_updated = Parameter(selected_params.transaction, str(parameter_new).upper())
+
+        with _sap_db(ctx.obj):
+            result = sap.update_param(parameter_updated)
+
+            if result is None:
+
+                utilities.print_parameters_list(parameter_updated,
+                                                title="The following system is UPDATED")
+            else:
+                no_parameter_found = Parameter(parameter_updated.transaction, parameter_updated.parameter)
+
+                utilities.print_parameters_list(no_parameter_found, title="FAILED TO UPDATE the following system",
+                                                color=utilities.color_warning)
+
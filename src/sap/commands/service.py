@@ -0,0 +1,69 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Technical commands: logon, config, about, shortcut """
+
+from pathlib import Path
+
+import rich_click as click
+
+from sap import utilities
+from sap.cli import logger
+from sap.config import create_config, open_config, open_folder
+from sap.exceptions import WrongPath
+
+
+@click.command("logon")
+@click.option("-s", "--saplogon", "saplogon_path", help="Path to saplogon.exe file")
+@click.pass_context
+def logon(ctx, saplogon_path):
+    """Launch SAPLogon application"""
+
+    utilities.launch_saplogon_with_params(Path(saplogon_path) if saplogon_path else ctx.obj.config.saplogon_path)
+
+
+@click.command("config")
+@click.option('-create', is_flag=True, callback=create_config, expose_value=False, is_eager=True,
+              help='Create config file. For technical purpose. Use "sap start" to create config')
+@click.option('-open', is_flag=True, callback=open_config, expose_value=False, is_eager=True,
+              help='Open config file')
+@click.option('-folder', is_flag=True, callback=open_folder, expose_value=False, is_eager=True,
+              help='Open config folder')
+@click.pass_context
+def config(ctx):
+    """ Config file creation or editing """
+
+    config_markdown = """
+    Enter one of subcommands:
+
+    \t -create       Create config file. For technical purpose. Use "sap start" to create config
+    \t -open         Open config file
+    \t -folder       Open config folder
+    """
+
+    utilities.print_markdown(config_markdown)
+
+
+@click.command("about", help="Display 'About SAP logon' window")
+@click.pass_context
+def about(ctx):
+    """ Displays a dialog box with version information about SAP shortcut """
+    parameter = ["-version"]
+    logger.info(f"{[ctx.obj.config.command_line_path, parameter]}")
+    try:
+        utilities.launch_command_line_with_params(ctx.obj.config.command_line_path, parameter)
+    except WrongPath as err:
+        utilities.print_message(f"{err}", utilities.message_type_error)
+
+
+@click.command("shortcut", help="Display 'SAP GUI Shortcut' window")
+@click.pass_context
+def shortcut(ctx):
+    """ Displays a brief help text about the parameterization of SAP shortcut """
+    parameter = ["-help"]
+    logger.info(f"{[ctx.obj.config.command_line_path, parameter]}")
+    try:
+        utilities.launch_command_line_with_params(ctx.obj.config.command_line_path, parameter)
+    except WrongPath as err:
+        utilities.print_message(f"{err}", utilities.message_type_error)
@@ -0,0 +1,119 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Command 'shell': interactive session, that keeps config, crypto and database session between commands """
+
+import cmd
+import shlex
+
+import rich_click as click
+
+import sap
+from sap import utilities
+from sap.api import Sap_system
+
+try:
+    import readline  # noqa: F401 pylint: disable=unused-import
+except ImportError:  # Windows without pyreadline3: shell works, but without TAB completion
+    readline = None
+
+SHELL_PROMPT = 'sap> '
+SHELL_INTRO = "Interactive sap shell. Type 'help' for commands, 'exit' or Ctrl+D to quit"
+
+
+class SapShell(cmd.Cmd):
+    """ Every line is executed as 'sap <line>' with the same context object """
+
+    prompt = SHELL_PROMPT
+    intro = SHELL_INTRO
+
+    def __init__(self, obj, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.obj = obj
+        self.database = obj.database
+        self._systems = None
+
+    def default(self, line):
+        """ Run sap command """
+        from sap.cli import sap_cli
+
+        try:
+            args = shlex.split(line)
+        except ValueError as err:
+            utilities.print_message(f"{err}", utilities.message_type_error)
+            return False
+
+        if args[0] == 'shell':
+            utilities.print_message("Shell is already running", utilities.message_type_warning)
+            return False
+
+        try:
+            sap_cli.main(args=args, obj=self.obj, prog_name='sap', standalone_mode=False)
+        except click.exceptions.Abort:
+            click.echo('Aborted!')
+        except click.ClickException as err:
+            err.show()
+        except (SystemExit, KeyboardInterrupt, EOFError):
+            pass
+        finally:
+            # Do not keep transaction between commands, so changes made by other processes are visible
+            self.obj.database = self.database
+            self.database.session.rollback()
+            self._systems = None
+        return False
+
+    def emptyline(self):
+        return False
+
+    def do_help(self, arg):
+        """ Help of sap or its command """
+        self.default(f"{arg} -h" if arg else "-h")
+
+    def do_exit(self, arg):
+        """ Quit shell """
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg):  # pylint: disable=invalid-name
+        """ Quit shell by Ctrl+D """
+        click.echo()
+        return True
+
+    def completenames(self, text, *ignored):
+        from sap.cli import sap_cli
+
+        names = sap_cli.list_commands(None) + ['exit', 'quit', 'help']
+        return [name for name in names if name.startswith(text)]
+
+    def completedefault(self, text, line, begidx, endidx):
+        """ Arguments of commands are completed with systems IDs """
+        return [system for system in self.systems() if system.startswith(text.upper())]
+
+    def systems(self):
+        """ System IDs from database. Cached until next command """
+        if self._systems is None:
+            try:
+                self._systems = sorted({item[0] for item in sap.query_system(Sap_system(None))})
+            finally:
+                self.database.session.rollback()
+        return self._systems
+
+
+@click.command("shell")
+@click.pass_context
+def shell(ctx):
+    """
+    \b
+    Interactive shell: config, encryption keys and database connection are loaded once
+    and reused by every command. TAB completes commands and systems.
+    """
+
+    cfg = ctx.obj.config
+    ctx.obj.database = sap.start_sap_db(cfg.db_path, cfg.db_type, cfg.db_pragmas)
+    try:
+        SapShell(ctx.obj).cmdloop()
+    finally:
+        ctx.obj.database = None
+        sap.stop_sap_db()
@@ -0,0 +1,345 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to maintain SAP systems in database: list, add, update, delete """
+
+import rich_click as click
+
+import sap
+from sap import utilities
+from sap.api import Sap_system, LazyPassword
+from sap.commands import _sap_db
+
+
+def system_key(ctx, param, value):
+    """ Key of the system: 'CUSTOMER,SYSTEM,CLIENT,USER'. Customer can contain commas """
+    if value is None:
+        return None
+    key = value.rsplit(',', 3)
+    if len(key) != 4:
+        raise click.BadParameter(f"{value!r} is not a system key 'CUSTOMER,SYSTEM,CLIENT,USER'")
+    return tuple(key)
+
+
+@click.command("list", short_help="Print information about SAP systems")
+@click.argument("system", required=False, type=click.STRING, default=None)
+@click.argument("client", required=False, type=utilities.client, default=None)
+@click.option("-u", "--user", "user", help="Request a SAP system by user", type=click.STRING, default=None)
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING, default=None)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING,
+              default=None)
+@click.option("-u", "--url", "url", help="Flag. Display url of the requested SAP system", is_flag=True,
+              default=False, show_default=True)
+@click.option("-ow", "--only_web", "only_web", help="Is SAP system used as only web", type=click.Choice(['yes', 'no']),
+              default=None, show_default=True)
+@click.option("-v", "--verbose", "verbose", help="Flag. Display passwords of the requested SAP system", is_flag=True,
+              default=False, show_default=True)
+@click.option("-time", "--timeout", "timeout", help="Timeout to clear passwords from screen if '-v' option is used",
+              type=click.INT, default=0)
+@click.option("-e", "--enum", "enum", help="Flag. Enumerate systems", is_flag=True, default=False, show_default=True)
+@click.option("-l", "--limit", "limit", help="Maximum number of systems to print (page size)",
+              type=click.IntRange(min=1), default=None)
+@click.option("-a", "--after", "after", help="Print systems after the given one: 'CUSTOMER,SYSTEM,CLIENT,USER'",
+              callback=system_key, default=None)
+@click.option("--count", "count", help="Flag. Print only the number of found systems", is_flag=True, default=False)
+@click.pass_context
+def list_systems(ctx, system: str, client: int, user: str, customer: str, description: str, url: bool, only_web: str,
+                 verbose: bool, timeout: int, enum: bool, limit: int = None, after: tuple = None,
+                 count: bool = False) -> list:
+    """
+    \b
+    Print information about SAP systems \b
+    \b
+    Optional arguments:
+    1. System: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client\n
+    \b
+    If no arguments - print information about all SAP systems from database
+    \b
+    Systems are ordered by customer, system, client and user. Use '--limit' to print one page
+    and '--after' with the key printed under the page to print the next one.
+    """
+
+    sap_system_sql = Sap_system(str(system).upper() if system else None,
+                                str(client) if client else None,
+                                user if user else None,
+                                None,
+                                None,
+                                customer if customer else None,
+                                description if description else None,
+                                None,
+                                None,
+                                only_web if only_web else None)
+
+    if count:
+        if ctx.obj.daemon:
+            found = sap.count_system(sap_system_sql)
+        else:
+            with _sap_db(ctx.obj, read_only=True):
+                found = sap.count_system(sap_system_sql)
+        click.echo(f"Systems found: {found}")
+        return []
+
+    # One more system is queried to know if there is the next page
+    page_size = limit + 1 if limit is not None else None
+    if ctx.obj.daemon:
+        result = sap.query_system(sap_system_sql, after, page_size)
+    else:
+        with _sap_db(ctx.obj, read_only=True):
+            result = sap.query_system(sap_system_sql, after, page_size)
+    next_page = limit is not None and len(result) > limit
+    result = result[:limit]
+    # Passwords are decrypted on access: by daemon if it is running
+    decrypt = ctx.obj.daemon.decrypt if ctx.obj.daemon else ctx.obj.crypto.decrypto
+    sap_system = [Sap_system(item[0], item[1], item[2], LazyPassword(item[3], decrypt), item[4], item[5], item[6],
+                             item[7], item[8], item[9]) for item in result]
+
+    if verbose:
+        # All passwords are displayed: decrypt them at once
+        LazyPassword.decrypt_all([item.password for item in sap_system],
+                                 ctx.obj.daemon.decrypt_many if ctx.obj.daemon else ctx.obj.crypto.decrypt_many)
+
+    if not sap_system:
+        no_system_found = Sap_system(str(system).upper() if system else "",
+                                     str(client).zfill(3) if client else "",
+                                     user.upper() if user else "",
+                                     "",
+                                     "",
+                                     str(customer).upper() if customer else "",
+                                     description.upper() if description else "",
+                                     "",
+                                     "",
+                                     "")
+        utilities.print_system_list(no_system_found, title="NOTHING FOUND according to search criteria",
+                                    color=utilities.color_warning)
+    else:
+        utilities.print_system_list(*sap_system, title="Available systems", verbose=verbose,
+                                    timeout=timeout if timeout else ctx.obj.config.time_to_clear, url=url,
+                                    enum=enum)
+        if next_page:
+            last = sap_system[-1]
+            click.echo(f"Next page: --after \"{last.customer},{last.system},{last.client},{last.user}\"")
+
+    return sap_system
+
+
+@click.command("add")
+@click.option("-customer", prompt=True, help="Customer name", type=click.STRING, default="")
+@click.option("-system", prompt=True, help="System Id", type=utilities.SYSTEM_ID)
+@click.option("-client", prompt=True, help="client/Client number", type=utilities.client)
+@click.option("-user", prompt=True, help="User")
+@click.option("-password", help="Password", prompt=True, confirmation_prompt=True, hide_input=True,
+              type=utilities.PASS_REQUIREMENT)
+@click.option("-language", help="Default SAP system language", prompt=True, type=utilities.DEFAULT_LANG)
+@click.option("-description", prompt=True, help="SAP system description", type=click.STRING, default="")
+@click.option("-url", prompt=True, help="SAP system Url", type=click.STRING, default="")
+@click.option("-autotype", prompt=True, help="Autotype sequence for logining to web site",
+              type=utilities.AUTOTYPE, show_default=True,
+              cls=utilities.OptionADD, required_if='url', default_name='sequence')
+@click.option("-only_web", prompt=True, help="Is SAP system used only as web", type=click.Choice(['yes', 'no']),
+              default='no', show_default=True, cls=utilities.OptionADD, required_if='url')
+@click.option("-v", "--verbose", "verbose", help="Flag. Show passwords for selected systems", is_flag=True,
+              default=False)
+@click.option("-time", "--timeout", "timeout", help="Timeout to clear passwords from screen if '-v' option is used",
+              type=click.INT, default=0)
+@click.pass_context
+def add(ctx, system: str, client: str, user: str, password: str, language: str, description: str, customer: str,
+        url: str, autotype: str, only_web: str, verbose: bool, timeout: int):
+    """
+    Add sap system with its parameters to db. Just run 'sap add' and follow instructions.
+    """
+
+    with _sap_db(ctx.obj):
+        encrypted_password = ctx.obj.crypto.encrypto(str.encode(password))
+        sap_system = Sap_system(
+            str(system).upper(),
+            str(client).zfill(3),
+            str(user).upper() if '@' not in user else str(user),
+            encrypted_password,
+            str(language).upper(),
+            str(customer),
+            str(description),
+            str(url),
+            str(autotype),
+            str(only_web),
+        )
+        result = sap.add(sap_system)
+
+        if result is not None:
+            utilities.print_message("Failed to add system to database ... \n",
+                                    message_type=utilities.message_type_sensitive)
+            click.echo(result)
+        else:
+            sap_system = Sap_system(str(system).upper() if system else None,
+                                    str(client) if client else None,
+                                    user.upper() if user else None,
+                                    None, None, None, None, None, None, None)
+            result = sap.query_system(sap_system)
+
+            added_system = [Sap_system(item[0], item[1], item[2], LazyPassword(item[3], ctx.obj.crypto.decrypto),
+                                       item[4], item[5], item[6], item[7], item[8], item[9]) for item in result]
+            utilities.print_system_list(*added_system, title="The following system is ADDED to the database: ",
+                                        verbose=verbose,
+                                        timeout=timeout if timeout else ctx.obj.config.time_to_clear)
+
+
+@click.command("update", short_help="Update record from database")
+@click.argument("system", required=False, type=click.STRING)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option("-ow", "--only_web", "only_web", help="Is SAP system used as only web", type=click.Choice(['yes', 'no']),
+              default=None, show_default=True)
+@click.option("-v", "--verbose", "verbose", help="Show passwords for selected systems", is_flag=True, default=False)
+@click.option("-time", "--timeout", "timeout", help="Timeout to clear passwords from screen if '-v' option is used",
+              type=click.INT, default=0)
+@click.pass_context
+def update(ctx, system: str, client: str, user: str, customer: str, description: str, only_web: str, verbose: bool,
+           timeout: int):
+    """
+    \b
+    Update password, customer, system description or url of the requested record from database\n
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    """
+
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description, only_web=only_web,
+                              url=False, verbose=False, enum=True)
+    # --------------------------
+    if query_result:
+        selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+        selected_system = utilities.choose_system(selected_sap_systems)
+
+        change_pass = click.prompt("\nWould you like to change the password?", default='no', show_default=True,
+                                   type=click.Choice(['yes', 'no']))
+        if change_pass == 'yes':
+            password_new = click.prompt("Enter new password", confirmation_prompt=True, hide_input=True)
+        else:
+            password_new = str(selected_system.password)
+
+        language_new = click.prompt("Enter new language", default=selected_system.language)
+        customer_new = click.prompt("Enter Customer", default=selected_system.customer)
+        description_new = click.prompt("Enter system description", default=selected_system.description)
+        url_new = click.prompt("Enter URL", default=selected_system.url)
+
+        if url_new or selected_system.url:
+            autotype_new = click.prompt("Enter Autotype sequence",
+                                        default=selected_system.autotype if selected_system.autotype else ctx.obj.config.sequence,
+                                        type=utilities.AUTOTYPE)
+            only_web_value = click.prompt("Is only web available", type=click.Choice(['yes', 'no']),
+                                          default=selected_system.only_web)
+        else:
+            autotype_new = ''
+            only_web_value = 'no'
+
+        sap_encrypted_system = Sap_system(
+            str(selected_system.system).upper(),
+            str(selected_system.client).zfill(3),
+            str(selected_system.user).upper(),
+            ctx.obj.crypto.encrypto(str.encode(password_new)),
+            str(language_new),
+            str(customer_new),
+            str(description_new),
+            str(url_new),
+            str(autotype_new),
+            str(only_web_value),
+        )
+
+        with _sap_db(ctx.obj):
+            result = sap.update(sap_encrypted_system)
+
+            if result is None:
+                result = sap.query_system(sap_encrypted_system)
+
+                updated_system = [
+                    Sap_system(item[0], item[1], item[2], LazyPassword(item[3], ctx.obj.crypto.decrypto), item[4],
+                               item[5], item[6], item[7], item[8], item[9]) for item in result]
+
+                utilities.print_system_list(*updated_system, title="The following system is UPDATED", verbose=verbose,
+                                            timeout=timeout if timeout else ctx.obj.config.time_to_clear)
+            else:
+                no_system_found = Sap_system(system.upper() if system else None,
+                                             str(client).zfill(3) if client else None,
+                                             user.upper() if user else None,
+                                             None,
+                                             None,
+                                             customer.upper() if customer else None,
+                                             description.upper() if description else None,
+                                             None, None, None)
+
+                utilities.print_system_list(no_system_found, title="FAILED TO UPDATE the following system",
+                                            color=utilities.color_warning)
+
+
+@click.command("delete")
+@click.argument("system", required=False, type=click.STRING)
+@click.argument("client", required=False, type=utilities.client)
+@click.option("-u", "--user", "user", help="Request a SAP system by user")
+@click.option("-c", "--customer", "customer", help="Request a SAP system by customer", type=click.STRING)
+@click.option("-d", "--description", "description", help="Request a SAP system by description", type=click.STRING)
+@click.option("-confirm", "--confirm", "confirm", help="Confirm delete command", is_flag=True, default=False,
+              show_default=True)
+@click.pass_context
+def delete(ctx, system: str, client: str, user: str, customer: str, description: str, confirm):
+    """
+    \b
+    Delete requested record about SAP system from database\n
+    \b
+    Optional arguments:
+    1. SYSTEM: Request a SAP system by system id
+    2. CLIENT: Request a SAP system by client/client
+    """
+
+    query_result = ctx.invoke(list_systems, system=system, client=client, user=user, customer=customer,
+                              description=description, url=False, verbose=False, enum=True)
+    # --------------------------
+    if query_result:
+        selected_sap_systems = [Sap_system(*item) for item in query_result]
+
+        selected_system = utilities.choose_system(selected_sap_systems)
+
+        message = "Trying to DELETE the following system"
+        utilities.print_system_list(selected_system, title=message)
+
+        if not confirm:
+            click.confirm(click.style('\nDo you really want to delete the system?', **utilities.color_sensitive),
+                          abort=True, default=confirm)
+
+        system_to_delete = Sap_system(selected_system.system,
+                                      selected_system.client,
+                                      selected_system.user,
+                                      selected_system.password,
+                                      selected_system.language,
+                                      selected_system.customer,
+                                      selected_system.description,
+                                      selected_system.url,
+                                      selected_system.autotype,
+                                      selected_system.only_web)
+
+        with _sap_db(ctx.obj):
+            sap.delete(system_to_delete)
+
+            result = sap.query_system(system_to_delete)
+
+            if not result:
+
+                utilities.print_system_list(system_to_delete, title="The following system is DELETED from database")
+            else:
+                no_system_found = Sap_system(system.upper() if system else None,
+                                             str(client).zfill(3) if client else None,
+                                             user.upper() if user else None,
+                                             None,
+                                             None,
+                                             customer.upper() if customer else None,
+                                             description.upper() if description else None,
+                                             None, None, None)
+
+                utilities.print_system_list(no_system_found, title="FAILED TO UPDATE the following system",
+                                            color=utilities.color_warning)
+
@@ -0,0 +1,270 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Commands to load and unload data in bulk: import, export """
+
+import base64
+import binascii
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+import rich_click as click
+
+import sap
+from sap import utilities
+from sap.api import Sap_system, Parameter
+from sap.commands import _sap_db
+from sap.exceptions import FailedRequirements
+
+FILE_FORMATS = ('csv', 'jsonl')
+SYSTEM_COLUMNS = ('customer', 'system', 'client', 'user', 'password', 'language', 'description', 'url', 'autotype',
+                  'only_web')
+PARAMETER_COLUMNS = ('transaction', 'parameter')
+# Column with password as it is stored in database (encrypted, base64 encoded)
+ENCRYPTED_PASSWORD = 'password_encrypted'
+
+
+def file_format_of(path, file_format):
+    """ File format set by user or by file extension """
+    if file_format:
+        return file_format
+    return 'jsonl' if Path(str(path)).suffix.lower() in ('.jsonl', '.json') else 'csv'
+
+
+def read_rows(file, file_format):
+    """
+    Read file row by row
+    :return: (line number, row as dict with lower case keys or None, error message)
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, {str(key).strip().lower(): value for key, value in row.items()}, ''
+        return
+
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as err:
+            yield line_number, None, f"Not valid JSON: {err}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Not valid JSON: object is expected"
+            continue
+        yield line_number, {str(key).strip().lower(): value for key, value in row.items()}, ''
+
+
+def _value(row, name) -> str:
+    value = row.get(name)
+    return '' if value is None else str(value).strip()
+
+
+def convert_system(row, ctx) -> Sap_system:
+    """ Sap_system with password as text. Values are checked by the same types as 'sap add' options """
+    system = utilities.SYSTEM_ID.convert(_value(row, 'system'), None, ctx).upper()
+
+    client = _value(row, 'client')
+    # Spreadsheets drop leading zeros of client number
+    client = utilities.client.convert(client.zfill(3) if client.isdigit() else client, None, ctx)
+
+    user = _value(row, 'user')
+    if not user:
+        raise FailedRequirements("[USER] is empty")
+
+    language = utilities.DEFAULT_LANG.convert(_value(row, 'language') or ctx.obj.config.language, None, ctx)
+
+    url = _value(row, 'url')
+    autotype = _value(row, 'autotype') or (ctx.obj.config.sequence if url else '')
+    if autotype:
+        utilities.AUTOTYPE.convert(autotype, None, ctx)
+
+    only_web = _value(row, 'only_web').lower() or 'no'
+    if only_web not in ('yes', 'no'):
+        raise FailedRequirements(f"{only_web!r} is not valid [ONLY_WEB] value. Must be 'yes' or 'no'")
+
+    password = _value(row, 'password')
+    if not password and _value(row, ENCRYPTED_PASSWORD):
+        # Exported by 'sap export' without '--passwords': stored as it is
+        try:
+            password = base64.b64decode(_value(row, ENCRYPTED_PASSWORD), validate=True)
+        except binascii.Error:
+            raise FailedRequirements(f"[{ENCRYPTED_PASSWORD.upper()}] is not valid base64 value") from None
+
+    return Sap_system(system, client, user.upper() if '@' not in user else user, password,
+                      language.upper(), _value(row, 'customer'), _value(row, 'description'), url, autotype, only_web)
+
+
+def convert_parameter(row, ctx) -> Parameter:
+    """ Parameter of transaction. Values are upper case as in 'sap paradd' """
+    transaction = _value(row, 'transaction').upper()
+    parameter = _value(row, 'parameter').upper()
+    if not transaction:
+        raise FailedRequirements("[TRANSACTION] is empty")
+    if not parameter:
+        raise FailedRequirements("[PARAMETER] is empty")
+    return Parameter(transaction, parameter)
+
+
+def encrypt_passwords(crypto, sap_systems):
+    """
+    Replace text passwords with encrypted ones. Already encrypted passwords (bytes) are kept.
+    Empty password is replaced with None: stored password is kept
+    """
+    indexes = [index for index, item in enumerate(sap_systems) if isinstance(item.password, str) and item.password]
+    encrypted = crypto.encrypt_many(str.encode(sap_systems[index].password) for index in indexes)
+    result = [item if isinstance(item.password, bytes) else item._replace(password=None) for item in sap_systems]
+    for index, password in zip(indexes, encrypted):
+        result[index] = sap_systems[index]._replace(password=password)
+    return result
+
+
+@click.command("import", short_help="Import systems or transactions' parameters from file")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-t", "--table", "table", help="Table to import to: SAP systems or transactions' parameters",
+              type=click.Choice(['sap', 'parameters']), default='sap', show_default=True)
+@click.option("-f", "--format", "file_format", help="File format. Default: by file extension ('.jsonl' or '.csv')",
+              type=click.Choice(FILE_FORMATS), default=None)
+@click.option("-b", "--batch", "batch", help="Number of rows saved in one transaction",
+              type=click.IntRange(min=1), default=500, show_default=True)
+@click.pass_context
+def import_data(ctx, file: Path, table: str, file_format: str, batch: int):
+    """
+    \b
+    Import SAP systems or transactions' parameters from CSV file with header or from JSON Lines file.
+    Existing systems (the same customer, system, client and user) and transactions are updated.
+    \b
+    Columns of 'sap' table: customer, system, client, user, password, language, description, url, autotype, only_web
+    Columns of 'parameters' table: transaction, parameter
+    Column 'password_encrypted' written by 'sap export' is used instead of empty 'password' column
+    \b
+    Rows with errors are skipped and listed at the end. Other rows are imported.
+    """
+
+    file_format = file_format_of(file, file_format)
+    convert = convert_system if table == 'sap' else convert_parameter
+
+    errors = []
+    processed = imported = 0
+    started = time.monotonic()
+
+    # One process pool encrypts passwords of all batches
+    with _sap_db(ctx.obj), ctx.obj.crypto.process_pool(), \
+            open(file, mode='rt', encoding='utf-8-sig', newline='') as stream:
+        rows = read_rows(stream, file_format)
+        while True:
+            chunk = list(islice(rows, batch))
+            if not chunk:
+                break
+
+            lines, records = [], []
+            for line_number, row, error in chunk:
+                if not error:
+                    try:
+                        records.append(convert(row, ctx))
+                        lines.append(line_number)
+                        continue
+                    except click.BadParameter as err:
+                        error = err.format_message().strip()
+                errors.append((line_number, error))
+
+            if table == 'sap':
+                failed = sap.upsert(encrypt_passwords(ctx.obj.crypto, records))
+            else:
+                failed = sap.upsert_params(records)
+            errors.extend((lines[index], message) for index, message in failed)
+
+            processed += len(chunk)
+            imported += len(records) - len(failed)
+            click.echo(f"Processed: {processed}, imported: {imported}, errors: {len(errors)}, "
+                       f"{processed / max(time.monotonic() - started, 1e-6):.0f} rows/sec")
+
+    if errors:
+        message = "\n".join(f"Line {line_number}: {error}" for line_number, error in sorted(errors))
+        utilities.print_message(f"Rows are not imported:\n{message}", utilities.message_type_warning)
+
+    utilities.print_message(f"Imported to '{table}' table: {imported} of {processed} rows "
+                            f"in {time.monotonic() - started:.1f} seconds", utilities.message_type_message)
+
+
+def row_writer(stream, file_format, columns):
+    """ Write header of the file and return function that writes one row (dict) """
+    if file_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=columns, lineterminator='\n')
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def export_systems(crypto, rows, passwords: bool):
+    """ Rows of 'sap' table as dicts. Passwords are decrypted or base64 encoded """
+    systems = [Sap_system(*row) for row in rows]
+    if passwords:
+        decrypted = iter(crypto.decrypt_many(item.password for item in systems if item.password))
+        values = [next(decrypted) if item.password else '' for item in systems]
+        column = 'password'
+    else:
+        values = [base64.b64encode(item.password).decode() if item.password else '' for item in systems]
+        column = ENCRYPTED_PASSWORD
+
+    return [{column if name == 'password' else name: value if name == 'password' else getattr(item, name) or ''
+             for name in SYSTEM_COLUMNS} for item, value in zip(systems, values)]
+
+
+@click.command("export", short_help="Export systems or transactions' parameters to file")
+@click.option("-o", "--output", "output", help="File to export to. Default: standard output",
+              type=click.Path(dir_okay=False, writable=True, allow_dash=True), default='-')
+@click.option("-t", "--table", "table", help="Table to export: SAP systems or transactions' parameters",
+              type=click.Choice(['sap', 'parameters']), default='sap', show_default=True)
+@click.option("-f", "--format", "file_format", help="File format. Default: by file extension ('.jsonl' or '.csv')",
+              type=click.Choice(FILE_FORMATS), default=None)
+@click.option("-p", "--passwords", "passwords", help="Flag. Export passwords as plain text", is_flag=True,
+              default=False)
+@click.option("-b", "--batch", "batch", help="Number of rows read from database at once",
+              type=click.IntRange(min=1), default=500, show_default=True)
+@click.pass_context
+def export_data(ctx, output: str, table: str, file_format: str, passwords: bool, batch: int):
+    """
+    \b
+    Export SAP systems or transactions' parameters to CSV file with header or to JSON Lines file.
+    Rows are read from database and written to file batch by batch.
+    \b
+    Passwords are exported encrypted (column 'password_encrypted'): they can be imported back by 'sap import'
+    with the same encryption keys. Use '--passwords' to export plain text passwords (column 'password').
+    """
+
+    file_format = file_format_of(output, file_format)
+    if table == 'sap':
+        columns = tuple(ENCRYPTED_PASSWORD if name == 'password' and not passwords else name for name in SYSTEM_COLUMNS)
+    else:
+        columns = PARAMETER_COLUMNS
+
+    exported = 0
+    started = time.monotonic()
+
+    # One process pool decrypts passwords of all batches
+    with _sap_db(ctx.obj, read_only=True), ctx.obj.crypto.process_pool(), \
+            click.open_file(output, mode='w', encoding='utf-8') as stream:
+        rows = iter(sap.stream_systems(batch) if table == 'sap' else sap.stream_params(batch))
+        write = row_writer(stream, file_format, columns)
+        while True:
+            chunk = list(islice(rows, batch))
+            if not chunk:
+                break
+            if table == 'sap':
+                records = export_systems(ctx.obj.crypto, chunk, passwords)
+            else:
+                records = [dict(zip(PARAMETER_COLUMNS, item)) for item in chunk]
+            for record in records:
+                write(record)
+            stream.flush()
+            exported += len(chunk)
+
+    # Messages are written to stderr: stdout can be the exported file
+    click.echo(f"Exported from '{table}' table: {exported} rows in {time.monotonic() - started:.1f} seconds",
+               err=True)
@@ -5,6 +5,8 @@
 """ Config file management """
 
 import ctypes
+import json
+import os
 import re
 from pathlib import Path
 from collections import namedtuple
@@ -14,12 +16,26 @@ import typing
 import click
 from sap import utilities
 
-from sap.exceptions import ConfigExists, ConfigDoesNotExists
-from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, CONFIG_NAME, DATABASE_NAME
+from sap.exceptions import ConfigExists, ConfigDoesNotExists, ConfigWrongValue
+from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, CONFIG_NAME, DATABASE_NAME, CONFIG_CACHE_NAME
+from sap.api import SQLITE_PRAGMAS, SQLITE_PROFILES, SQLITE_PROFILE, SQLITE_PROFILE_LEGACY
 
-SapConfig = namedtuple('SapConfig', ['db_path', 'db_type', 'command_line_path', 'saplogon_path', 'public_key_path',
-                                     'private_key_path', 'language', 'sequence', 'wait_site_to_load', 'time_to_clear',
-                                     'browsers_list', 'browsers_path', 'browsers_params', 'password_strength'])
+SapConfig = namedtuple('SapConfig', ['db_path', 'db_type', 'db_profile', 'db_pragmas', 'db_immutable',
+                                     'command_line_path',
+                                     'saplogon_path', 'public_key_path', 'private_key_path', 'language', 'sequence',
+                                     'wait_site_to_load', 'time_to_clear', 'browsers_list', 'browsers_path',
+                                     'browsers_params', 'password_strength'])
+
+# Change when SapConfig fields are changed, so old cache files are not used
+CONFIG_CACHE_VERSION = 4
+
+# SapConfig fields stored in JSON cache as strings and restored as Path
+CONFIG_PATH_FIELDS = ('db_path', 'command_line_path', 'saplogon_path', 'public_key_path', 'private_key_path')
+
+# Allowed values of text SQLite pragmas. Other pragmas are integers
+PRAGMA_VALUES = {'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+                 'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+                 'temp_store': ('DEFAULT', 'FILE', 'MEMORY')}
 
 
 class Config:
@@ -32,6 +48,9 @@ class Config:
             config_path: typing.Union[str, pathlib.Path] = None,
             db_path=None,
             db_type='sqlite',
+            db_profile=SQLITE_PROFILE,
+            db_pragmas=None,
+            db_immutable=False,
             command_line_path=None,
             saplogon_path=None,
             public_key_path=None,
@@ -47,11 +66,14 @@ class Config:
 
         self.ini_name = CONFIG_NAME
         self.config_path = Path(config_path) if config_path else utilities.path()
-        self.config_file_path = Path(config_path / self.ini_name) if config_path else Path(
-            utilities.path() / self.ini_name)
+        self.config_file_path = Path(self.config_path / self.ini_name)
+        self.config_cache_path = Path(self.config_path / CONFIG_CACHE_NAME)
 
         self.db_path = Path(db_path) if db_path else Path(self.config_path / DATABASE_NAME)
         self.db_type = db_type
+        self.db_profile = db_profile
+        self.db_pragmas = dict(db_pragmas) if db_pragmas else dict(SQLITE_PROFILES[db_profile])
+        self.db_immutable = db_immutable
         self.command_line_path = Path(command_line_path) if command_line_path else Path('path to sapshcut.exe file.')
         self.saplogon_path = Path(saplogon_path) if saplogon_path else Path('path to saplogon.exe file.')
         self.public_key_path = Path(public_key_path) if public_key_path else Path(self.config_path / PUBLIC_KEY_NAME)
@@ -72,49 +94,130 @@ class Config:
         self.browsers_params = browsers_params
         self.password_strength = password_strength
 
-    def read(self):
-        """Return SapConfig object after reading config file."""
-        parser = ConfigParser()
-
-        if self.exists():
-            parser.read(self.config_file_path)
-
-            self.db_path = Path(parser.get('DATABASE', 'db_path'))
-            self.db_type = parser.get('DATABASE', 'db_type')
-
-            self.command_line_path = Path(parser.get('APPLICATION', 'command_line_path'))
-            self.saplogon_path = Path(parser.get('APPLICATION', 'saplogon_path'))
-
-            self.public_key_path = Path(parser.get('KEYS', 'public_key_path'))
-            self.private_key_path = Path(parser.get('KEYS', 'private_key_path'))
-
-            self.language = parser.get('LOCALE', 'language')
+    def read(self, use_cache=True):
+        """
+        Return SapConfig object after reading config file.
+        :param use_cache: take values from config cache if config file was not changed since cache was written
+        """
+        if not self.exists():
+            raise ConfigDoesNotExists(self.config_file_path)
 
-            self.sequence = parser.get('AUTO-TYPE', 'sequence')
-            self.wait_site_to_load = int(parser.get('AUTO-TYPE', 'wait'))
+        stamp = self._config_stamp()
+        sap_config = self._read_cache(stamp) if use_cache else None
+        if sap_config is None:
+            sap_config = self._parse()
+            if use_cache:
+                self._write_cache(stamp, sap_config)
 
-            self.time_to_clear = int(parser.get('PASSWORD', 'time_to_clear'))
-            self.password_strength = int(parser.get('PASSWORD', 'password_strength'))
+        for field, value in sap_config._asdict().items():
+            setattr(self, field, value)
 
-            browsers_tuple = parser.items('BROWSER')
-            self.browsers_list = [item[0] for item in browsers_tuple]
-            self.browsers_path = {item[0]: Path(re.match(r'.+\.exe', item[1]).group(0)) for item in browsers_tuple}
-            self.browsers_params = {item[0]: item[1][re.match(r'.+\.exe', item[1]).end() + 1:].split() for item
-                                    in browsers_tuple}
+        # Check if Private key file and Database are in the same directory
+        db_path = pathlib.Path(self.db_path)
+        private_key_path = pathlib.Path(self.private_key_path)
+        if db_path.parent == private_key_path.parent:
+            message = f"Private key file ({private_key_path}) and Database file ({db_path}) have to be placed in a separate folders for security reason."
+            utilities.print_message(message, utilities.message_type_warning)
 
-            # Check if Private key file and Database are in the same directory
-            db_path = pathlib.Path(self.db_path)
-            private_key_path = pathlib.Path(self.private_key_path)
-            if db_path.parent == private_key_path.parent:
-                message = f"Private key file ({private_key_path}) and Database file ({db_path}) have to be placed in a separate folders for security reason."
-                utilities.print_message(message, utilities.message_type_warning)
+        return sap_config
 
-            return SapConfig(self.db_path, self.db_type, self.command_line_path, self.saplogon_path,
-                             self.public_key_path, self.private_key_path, self.language, self.sequence,
-                             self.wait_site_to_load, self.time_to_clear, self.browsers_list, self.browsers_path,
-                             self.browsers_params, self.password_strength)
-        else:
-            raise ConfigDoesNotExists(self.config_file_path)
+    def _parse(self):
+        """ Read values from config file """
+        parser = ConfigParser()
+        parser.read(self.config_file_path)
+
+        browsers_tuple = parser.items('BROWSER')
+        browsers_exe = {item[0]: re.match(r'.+\.exe', item[1]) for item in browsers_tuple}
+
+        db_profile = parser.get('DATABASE', 'db_profile', fallback=SQLITE_PROFILE_LEGACY).strip().lower()
+
+        return SapConfig(db_path=Path(parser.get('DATABASE', 'db_path')),
+                         db_type=parser.get('DATABASE', 'db_type'),
+                         db_profile=db_profile,
+                         db_pragmas=self._pragmas(parser, db_profile),
+                         db_immutable=self._boolean(parser, 'DATABASE', 'db_immutable'),
+                         command_line_path=Path(parser.get('APPLICATION', 'command_line_path')),
+                         saplogon_path=Path(parser.get('APPLICATION', 'saplogon_path')),
+                         public_key_path=Path(parser.get('KEYS', 'public_key_path')),
+                         private_key_path=Path(parser.get('KEYS', 'private_key_path')),
+                         language=parser.get('LOCALE', 'language'),
+                         sequence=parser.get('AUTO-TYPE', 'sequence'),
+                         wait_site_to_load=int(parser.get('AUTO-TYPE', 'wait')),
+                         time_to_clear=int(parser.get('PASSWORD', 'time_to_clear')),
+                         browsers_list=[item[0] for item in browsers_tuple],
+                         browsers_path={name: Path(match.group(0)) for name, match in browsers_exe.items()},
+                         browsers_params={item[0]: item[1][browsers_exe[item[0]].end() + 1:].split() for item in
+                                          browsers_tuple},
+                         password_strength=int(parser.get('PASSWORD', 'password_strength')))
+
+    @staticmethod
+    def _boolean(parser, section, option, fallback=False):
+        try:
+            return parser.getboolean(section, option, fallback=fallback)
+        except ValueError:
+            raise ConfigWrongValue(section, option, parser.get(section, option)) from None
+
+    @staticmethod
+    def _pragmas(parser, db_profile):
+        """ SQLite pragmas of the profile. Values set in DATABASE section replace values of the profile """
+        if db_profile not in SQLITE_PROFILES:
+            raise ConfigWrongValue('DATABASE', 'db_profile', db_profile)
+
+        pragmas = dict(SQLITE_PROFILES[db_profile])
+        for name in SQLITE_PRAGMAS:
+            value = parser.get('DATABASE', name, fallback='').strip()
+            if not value:
+                continue
+            if name in PRAGMA_VALUES:
+                if value.upper() not in PRAGMA_VALUES[name]:
+                    raise ConfigWrongValue('DATABASE', name, value)
+                pragmas[name] = value.upper()
+            else:
+                try:
+                    pragmas[name] = int(value)
+                except ValueError:
+                    raise ConfigWrongValue('DATABASE', name, value) from None
+        return pragmas
+
+    def _config_stamp(self):
+        """ Config file version: cache is valid while modification time and size are the same """
+        stat = self.config_file_path.stat()
+        return CONFIG_CACHE_VERSION, stat.st_mtime_ns, stat.st_size
+
+    def _read_cache(self, stamp):
+        """ Return SapConfig from cache file or None if there is no valid cache """
+        try:
+            with open(self.config_cache_path, encoding='utf-8') as file:
+                cache = json.load(file)
+            if tuple(cache['stamp']) != stamp:
+                return None
+            values = cache['config']
+            for field in CONFIG_PATH_FIELDS:
+                values[field] = Path(values[field])
+            values['browsers_path'] = {name: Path(value) for name, value in values['browsers_path'].items()}
+            return SapConfig(**values)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    def _write_cache(self, stamp, sap_config):
+        """ Save SapConfig next to config file. Cache is optional, so failures are ignored """
+        values = sap_config._asdict()
+        for field in CONFIG_PATH_FIELDS:
+            values[field] = str(values[field])
+        values['browsers_path'] = {name: str(value) for name, value in values['browsers_path'].items()}
+
+        temp_path = self.config_cache_path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({'stamp': stamp, 'config': values}, file)
+            os.replace(temp_path, self.config_cache_path)
+        except OSError:
+            pass
+
+    def remove_cache(self):
+        """ Remove config cache """
+        if self.config_cache_path.exists():
+            self.config_cache_path.unlink()
 
     def create(self):
         """
@@ -128,7 +231,17 @@ class Config:
                 "; DB_PATH - Path to database. Database file must be placed in secure place": None,
                 'db_path': self.db_path,
                 "; DB_TYPE - database type. Default: sqlite": None,
-                'db_type': self.db_type}
+                'db_type': self.db_type,
+                f"; DB_PROFILE - SQLite performance profile: {', '.join(SQLITE_PROFILES)}. Default: {SQLITE_PROFILE}": None,
+                "; compatible - SQLite defaults: every commit waits for disk. Use it for database on network drive": None,
+                "; balanced - write-ahead log: faster commits, database is safe after application crash": None,
+                "; fast - write-ahead log without disk sync: last changes can be lost on power failure": None,
+                'db_profile': self.db_profile,
+                "; Uncomment to replace value of the profile. See https://www.sqlite.org/pragma.html": None,
+                **{f"; {name} = {value}": None for name, value in SQLITE_PROFILES[self.db_profile].items()},
+                "; DB_IMMUTABLE - yes: database is on read only share and is never changed while commands run.": None,
+                "; Commands that only read open it without locks. Default: no": None,
+                'db_immutable': 'yes' if self.db_immutable else 'no'}
 
             parser['APPLICATION'] = {
                 "; COMMAND_LINE_PATH - Path to sapshcut.exe file": None,
@@ -187,8 +300,9 @@ class Config:
         return click.launch(url=str(self.config_file_path), locate=locate)
 
     def remove_config(self):
-        """ Remove encryption keys """
+        """ Remove config file """
         self.config_file_path.unlink()
+        self.remove_cache()
 
 
 def create_config(ctx, param, value):
@@ -4,31 +4,101 @@
 
 """ Passwords encryption with RSA for sap systems """
 
+import base64
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 import click
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from sap import utilities
-from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME
+from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATA_KEY_NAME, KEY_ROTATION_NAME
 from sap.exceptions import EncryptionKeysAlreadyExist
 
+# Stored password format: marker (format version), nonce, AES-GCM ciphertext with tag
+ENVELOPE_MARKER = b'SAP\x02'
+NONCE_SIZE = 12
+
+# Less RSA passwords are decrypted in the current process: starting a process pool costs more
+PARALLEL_MIN_PASSWORDS = 100
+
+# Keys loaded by the process: {key file path: ((mtime, size), key)}
+_loaded_keys = {}
+
+
+def load_key(key_path: Path, loader):
+    """
+    Return key object from key file. Key is parsed once per process and parsed again only if key file is changed
+    :param key_path: path to key file
+    :param loader: function to parse key file data
+    """
+    stat = key_path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    loaded = _loaded_keys.get(key_path)
+    if loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+
+    with open(key_path, "rb") as key_file:
+        key = loader(key_file.read())
+    _loaded_keys[key_path] = (stamp, key)
+    return key
+
+
+def forget_key(key_path: Path):
+    """ Remove key from the process' keys """
+    _loaded_keys.pop(key_path, None)
+
+
+# Crypto object of the pool's worker process (see Crypto.decrypt_many)
+_worker_crypto = None
+
+
+def _init_worker(public_key_path, private_key_path, data_key_path=None):
+    global _worker_crypto
+    _worker_crypto = Crypto(public_key_path, private_key_path, data_key_path)
+
+
+def _decrypt_in_worker(encrypted_password):
+    return _worker_crypto.decrypto(encrypted_password)
+
+
+def _encrypt_in_worker(password):
+    return _worker_crypto.encrypto(password)
+
 
 class Crypto:
-    """ Encryption RSA class """
+    """
+    Encryption class. Passwords are stored in one of two formats:
+    1. RSA: password is encrypted with RSA public key (old format)
+    2. Envelope: password is sealed with AES-GCM data key, data key is encrypted with RSA public key.
+       Stored value starts with ENVELOPE_MARKER.
+    New passwords are stored in envelope format if data key exists. Run 'sap migrate-crypto' to convert old passwords.
+    """
 
-    def __init__(self, public_key_path: str = '', private_key_path: str = ''):
+    def __init__(self, public_key_path: str = '', private_key_path: str = '', data_key_path: str = ''):
         self.public_key_file_name = PUBLIC_KEY_NAME
         self.private_key_file_name = PRIVATE_KEY_NAME
         self.public_key_path = Path(public_key_path) if public_key_path else Path(
             utilities.path() / self.public_key_file_name)
         self.private_key_path = Path(private_key_path) if private_key_path else Path(
             utilities.path() / self.private_key_file_name)
+        # Data key is encrypted with RSA and is kept next to private key
+        self.data_key_path = Path(data_key_path) if data_key_path else Path(
+            self.private_key_path.parent / DATA_KEY_NAME)
+        # Process pool shared by decrypt_many/encrypt_many calls inside process_pool() block
+        self._pool = None
+        self._pool_workers = None
 
     def generate_keys(self):
-        """ Generate RSA encryption keys: public, private """
+        """ Generate RSA encryption keys: public, private and data key """
 
         if not self.public_key_path.is_file() and not self.private_key_path.is_file():
             private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
@@ -37,14 +107,40 @@ class Crypto:
                 format=serialization.PrivateFormat.PKCS8,
                 encryption_algorithm=serialization.NoEncryption())
             self.save_key(private_pem, self.private_key_path)
+            forget_key(self.private_key_path)
 
             public_key = private_key.public_key()
             public_pem = public_key.public_bytes(encoding=serialization.Encoding.PEM,
                                                  format=serialization.PublicFormat.SubjectPublicKeyInfo)
             self.save_key(public_pem, self.public_key_path)
+            forget_key(self.public_key_path)
+
+            if self.data_key_path.is_file():
+                # Data key of previous keys can not be decrypted any more
+                self.data_key_path.unlink()
+            self.generate_data_key()
         else:
             raise EncryptionKeysAlreadyExist(public_path=self.public_key_path, private_path=self.private_key_path)
 
+    def generate_data_key(self):
+        """ Generate data key for envelope encryption and save it encrypted with RSA public key """
+        if self.data_key_path.is_file():
+            raise EncryptionKeysAlreadyExist(public_path=self.public_key_path, private_path=self.data_key_path,
+                                             message="Data key already exists")
+
+        data_key = AESGCM.generate_key(bit_length=256)
+        self.save_key(base64.b64encode(self._rsa_encrypt(data_key)), self.data_key_path)
+        forget_key(self.data_key_path)
+
+    def envelope(self) -> bool:
+        """ True if new passwords are stored in envelope format """
+        return self.data_key_path.is_file()
+
+    @staticmethod
+    def is_envelope(encrypted_password) -> bool:
+        """ True if stored password is in envelope format """
+        return bytes(encrypted_password[:len(ENVELOPE_MARKER)]) == ENVELOPE_MARKER
+
     def save_key(self, pem, file_name):
         """ Save RSA keys """
         with open(file_name, "w", encoding='utf-8') as file:
@@ -53,46 +149,235 @@ class Crypto:
 
     def encrypto(self, password):
         """ Encrypt sensitive info """
+        if self.envelope():
+            nonce = os.urandom(NONCE_SIZE)
+            return ENVELOPE_MARKER + nonce + self._data_key().encrypt(nonce, password, ENVELOPE_MARKER)
+        return self._rsa_encrypt(password)
+
+    def decrypto(self, encrypted_password):
+        """ Decrypt sensitive info """
+        if self.is_envelope(encrypted_password):
+            nonce = encrypted_password[len(ENVELOPE_MARKER):len(ENVELOPE_MARKER) + NONCE_SIZE]
+            try:
+                return self._data_key().decrypt(nonce, encrypted_password[len(ENVELOPE_MARKER) + NONCE_SIZE:],
+                                                ENVELOPE_MARKER).decode()
+            except InvalidTag:
+                # RSA encrypted password can start with the same bytes as marker
+                if len(encrypted_password) != self._private_key().key_size // 8:
+                    raise
+        return self._rsa_decrypt(encrypted_password)
+
+    def can_decrypt(self, encrypted_password) -> bool:
+        """ True if password is in envelope format and is sealed with this data key """
+        if not self.is_envelope(encrypted_password):
+            return False
+        nonce = encrypted_password[len(ENVELOPE_MARKER):len(ENVELOPE_MARKER) + NONCE_SIZE]
+        try:
+            self._data_key().decrypt(nonce, encrypted_password[len(ENVELOPE_MARKER) + NONCE_SIZE:], ENVELOPE_MARKER)
+        except InvalidTag:
+            return False
+        return True
+
+    @contextmanager
+    def process_pool(self, workers=None):
+        """
+        Share one process pool by decrypt_many/encrypt_many calls inside the block. Bulk commands call them batch
+        by batch: starting a pool per batch costs more than decryption of the batch.
+        Pool is started by the first batch that needs it and is stopped at the end of the block
+        :param workers: number of processes. Default: number of CPUs
+        """
+        self._pool_workers = workers or os.cpu_count() or 1
         try:
-            with open(self.public_key_path, "rb") as key_file:
-                message = key_file.read()
-                public_key = serialization.load_pem_public_key(message, backend=default_backend())
+            yield self
+        finally:
+            pool, self._pool, self._pool_workers = self._pool, None, None
+            if pool is not None:
+                pool.shutdown()
+
+    def _new_pool(self, workers):
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(str(self.public_key_path), str(self.private_key_path),
+                                             str(self.data_key_path)))
+
+    def _pool_map(self, function, items, workers) -> list:
+        """ Run function for every item by the pool of process_pool() block or by a pool of this call """
+        chunksize = max(1, len(items) // (workers * 4))
+        if self._pool_workers is None:
+            with self._new_pool(workers) as pool:
+                return list(pool.map(function, items, chunksize=chunksize))
+        if self._pool is None:
+            self._pool = self._new_pool(self._pool_workers)
+        return list(self._pool.map(function, items, chunksize=chunksize))
+
+    def decrypt_many(self, encrypted_passwords, workers=None) -> list:
+        """
+        Decrypt many passwords. Passwords encrypted with RSA are decrypted by a process pool if there are many of them
+        :param encrypted_passwords: iterable with encrypted passwords
+        :param workers: number of processes. Default: workers of process_pool() block or number of CPUs
+        :return: list of decrypted passwords in the same order
+        """
+        encrypted_passwords = list(encrypted_passwords)
+        workers = workers or self._pool_workers or os.cpu_count() or 1
+        rsa_indexes = [index for index, item in enumerate(encrypted_passwords) if not self.is_envelope(item)]
+
+        if workers < 2 or len(rsa_indexes) < PARALLEL_MIN_PASSWORDS:
+            return [self.decrypto(item) for item in encrypted_passwords]
+
+        self._private_key()  # Message about missing key is printed by current process
+
+        result = [None] * len(encrypted_passwords)
+        rsa_indexes_set = set(rsa_indexes)
+        for index, item in enumerate(encrypted_passwords):
+            if index not in rsa_indexes_set:
+                result[index] = self.decrypto(item)
+
+        decrypted = self._pool_map(_decrypt_in_worker, [encrypted_passwords[index] for index in rsa_indexes], workers)
+        for index, value in zip(rsa_indexes, decrypted):
+            result[index] = value
+
+        return result
+
+    def encrypt_many(self, passwords, workers=None) -> list:
+        """
+        Encrypt many passwords. Without data key passwords are encrypted with RSA by a process pool
+        if there are many of them. Envelope encryption is faster in the current process
+        :param passwords: iterable with passwords as bytes
+        :param workers: number of processes. Default: workers of process_pool() block or number of CPUs
+        :return: list of encrypted passwords in the same order
+        """
+        passwords = list(passwords)
+        workers = workers or self._pool_workers or os.cpu_count() or 1
+
+        if self.envelope() or workers < 2 or len(passwords) < PARALLEL_MIN_PASSWORDS:
+            return [self.encrypto(item) for item in passwords]
+
+        self._public_key()  # Message about missing key is printed by current process
+
+        return self._pool_map(_encrypt_in_worker, passwords, workers)
+
+    def _public_key(self):
+        try:
+            return load_key(self.public_key_path,
+                            lambda pem: serialization.load_pem_public_key(pem, backend=default_backend()))
         except FileNotFoundError as err:
             click.echo(
                 click.style(f"\nPublic key does not exist. \nPath: {self.public_key_path}", **utilities.color_warning))
             raise click.Abort from err
 
-        encrypted_data = public_key.encrypt(
-            password,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
-        return encrypted_data
-
-    def decrypto(self, encrypted_password):
-        """ Decrypt sensitive info """
+    def _private_key(self):
         try:
-            with open(self.private_key_path, "rb") as key_file:
-                message = key_file.read()
-                private_key = serialization.load_pem_private_key(message, password=None,
-                                                                 backend=default_backend())
+            return load_key(self.private_key_path,
+                            lambda pem: serialization.load_pem_private_key(pem, password=None,
+                                                                           backend=default_backend()))
         except FileNotFoundError as err:
             click.echo(
                 click.style(f"\nPrivate key does not exist. \nPath: {self.private_key_path}",
                             **utilities.color_warning))
             raise click.Abort from err
 
-        decrypted_data = private_key.decrypt(encrypted_password,
-                                             padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                                          algorithm=hashes.SHA256(),
-                                                          label=None)).decode()
+    def _data_key(self):
+        try:
+            return load_key(self.data_key_path, lambda data: AESGCM(self._rsa_decrypt_bytes(base64.b64decode(data))))
+        except FileNotFoundError as err:
+            click.echo(
+                click.style(f"\nData key does not exist. \nPath: {self.data_key_path}", **utilities.color_warning))
+            raise click.Abort from err
+
+    def _rsa_encrypt(self, data):
+        return self._public_key().encrypt(data, padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                                                             algorithm=hashes.SHA256(),
+                                                             label=None))
 
-        return decrypted_data
+    def _rsa_decrypt_bytes(self, data):
+        return self._private_key().decrypt(data, padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                                                              algorithm=hashes.SHA256(),
+                                                              label=None))
+
+    def _rsa_decrypt(self, encrypted_password):
+        return self._rsa_decrypt_bytes(encrypted_password).decode()
 
     def remove_keys(self):
         """ Remove encryption keys """
         self.private_key_path.unlink()
         self.public_key_path.unlink()
+        forget_key(self.private_key_path)
+        forget_key(self.public_key_path)
+        if self.data_key_path.is_file():
+            self.data_key_path.unlink()
+        forget_key(self.data_key_path)
+
+
+class KeyRotation:
+    """
+    Replacing encryption keys with new ones.
+    1. New keys are generated next to the current ones with ROTATION_SUFFIX.
+    2. Passwords are re-encrypted with new keys. Passwords already encrypted with new keys are skipped,
+       so re-encryption can be interrupted and started again.
+    3. New keys replace current ones.
+    Current step is saved in KEY_ROTATION_NAME file.
+    """
+
+    STAGE_REENCRYPT = 'reencrypt'
+    STAGE_SWAP = 'swap'
+    ROTATION_SUFFIX = '.new'
+
+    def __init__(self, crypto: Crypto):
+        self.crypto = crypto
+        self.state_path = Path(crypto.private_key_path.parent / KEY_ROTATION_NAME)
+        self.new_crypto = Crypto(self._new_path(crypto.public_key_path), self._new_path(crypto.private_key_path),
+                                 self._new_path(crypto.data_key_path))
+
+    def _new_path(self, path: Path) -> Path:
+        return path.with_name(path.name + self.ROTATION_SUFFIX)
+
+    def _key_paths(self):
+        """ Pairs of new and current key paths. Private key is replaced first """
+        return [(self.new_crypto.private_key_path, self.crypto.private_key_path),
+                (self.new_crypto.public_key_path, self.crypto.public_key_path),
+                (self.new_crypto.data_key_path, self.crypto.data_key_path)]
+
+    @property
+    def stage(self):
+        """ Current step of rotation or None if rotation is not started """
+        if not self.state_path.is_file():
+            return None
+        with open(self.state_path, encoding='utf-8') as file:
+            return json.load(file)['stage']
+
+    def _save_stage(self, stage):
+        temp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'stage': stage}, file)
+        os.replace(temp_path, self.state_path)
+
+    def start(self):
+        """ Generate new keys """
+        for new_path, _ in self._key_paths():
+            if new_path.is_file():  # Left by interrupted generation
+                new_path.unlink()
+        self.new_crypto.generate_keys()
+        self._save_stage(self.STAGE_REENCRYPT)
+
+    def reencrypt(self, encrypted_passwords) -> list:
+        """
+        Encrypt passwords with new keys
+        :param encrypted_passwords: list of passwords encrypted with current keys or already with new keys
+        :return: list of passwords encrypted with new keys. None for the passwords that are already encrypted with them
+        """
+        pending = [index for index, item in enumerate(encrypted_passwords) if not self.new_crypto.can_decrypt(item)]
+        decrypted = self.crypto.decrypt_many(encrypted_passwords[index] for index in pending)
+
+        result = [None] * len(encrypted_passwords)
+        for index, password in zip(pending, decrypted):
+            result[index] = self.new_crypto.encrypto(str.encode(password))
+        return result
+
+    def swap(self):
+        """ Replace current keys with new ones. If swap is interrupted, it is finished by next call """
+        self._save_stage(self.STAGE_SWAP)
+        for new_path, path in self._key_paths():
+            if new_path.is_file():
+                os.replace(new_path, path)
+            forget_key(new_path)
+            forget_key(path)
+        self.state_path.unlink()
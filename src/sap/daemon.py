@@ -0,0 +1,243 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Background daemon: keeps config, database engine and encryption keys in memory for read commands """
+
+import json
+import os
+import secrets
+import sys
+import time
+import hashlib
+from pathlib import Path
+from multiprocessing.connection import Listener, Client
+
+from sap.api import DAEMON_FILE_NAME, CONFIG_NAME, Sap_system, Parameter
+from sap.exceptions import DaemonError
+
+
+def daemon_address(config_path: Path) -> str:
+    """
+    Address of the daemon's listener: named pipe for Windows, unix domain socket for others.
+    One daemon per config folder.
+    """
+    if sys.platform == 'win32':
+        digest = hashlib.sha1(str(Path(config_path).resolve()).encode()).hexdigest()[:16]
+        return rf'\\.\pipe\sap-cli-{digest}'
+    return str(Path(config_path) / 'sap_daemon.sock')
+
+
+class SapDaemon:
+    """ Daemon serving requests of thin 'sap' commands """
+
+    def __init__(self, config_path: Path):
+        self.config_path = Path(config_path)
+        self.daemon_file_path = self.config_path / DAEMON_FILE_NAME
+        self.address = daemon_address(self.config_path)
+        self.authkey = secrets.token_bytes(32)
+        self.started = time.time()
+        self.requests = 0
+
+        self.config = None
+        self.crypto = None
+        self.database = None
+        self.config_stamp = None
+
+    def load(self):
+        """ (Re)read config, (re)create database engine and crypto object """
+        import sap.config
+        from sap.crypto import Crypto
+        from sap.database import SapDB
+
+        config = sap.config.Config(self.config_path)
+        self.config = config.read()
+        self.config_stamp = self._config_stamp()
+        self.crypto = Crypto(self.config.public_key_path, self.config.private_key_path)
+        if self.database is not None:
+            self.database.stop_sap_db()
+        # Daemon serves only queries
+        self.database = SapDB(self.config.db_path, self.config.db_type, self.config.db_pragmas, read_only=True,
+                              immutable=self.config.db_immutable)
+        self.database.make_session()
+
+    def _config_stamp(self):
+        stat = (self.config_path / CONFIG_NAME).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def serve(self):
+        """ Accept connections until 'stop' request """
+        self.load()
+
+        if sys.platform != 'win32' and Path(self.address).exists():
+            Path(self.address).unlink()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            self._write_daemon_file()
+            try:
+                running = True
+                while running:
+                    try:
+                        conn = listener.accept()
+                    except (OSError, EOFError):
+                        continue  # failed authentication or broken client
+                    with conn:
+                        try:
+                            request = conn.recv()
+                        except (OSError, EOFError):
+                            continue
+                        running = self._reply(conn, request)
+            finally:
+                self._remove_daemon_file()
+                if self.database is not None:
+                    self.database.stop_sap_db()
+
+    def _reply(self, conn, request) -> bool:
+        """ Send response to the request. Return False if daemon has to stop """
+        command, *args = request
+        self.requests += 1
+
+        if command == 'stop':
+            conn.send(('ok', None))
+            return False
+
+        try:
+            if self._config_stamp() != self.config_stamp:
+                self.load()
+            response = ('ok', self.dispatch(command, *args))
+        except Exception as err:  # pylint: disable=broad-except
+            response = ('error', f"{type(err).__name__}: {err}")
+        conn.send(response)
+        return True
+
+    def dispatch(self, command, *args):
+        """ Execute the command """
+        if command == 'ping':
+            return {'pid': os.getpid(), 'started': self.started, 'requests': self.requests,
+                    'config_path': str(self.config_path)}
+        if command == 'config':
+            return self.config
+        if command == 'query_system':
+            try:
+                result = self.database.query_system(Sap_system(*args[0]), *args[1:])
+            finally:
+                self.database.session.rollback()
+            return [tuple(item) for item in result]
+        if command == 'count_system':
+            try:
+                return self.database.count_system(Sap_system(*args[0]))
+            finally:
+                self.database.session.rollback()
+        if command == 'data_version':
+            return self.database.data_version()
+        if command == 'decrypt':
+            return self.crypto.decrypto(args[0])
+        if command == 'decrypt_many':
+            return self.crypto.decrypt_many(args[0])
+        if command == 'query_param':
+            try:
+                result = self.database.query_param(Parameter(*args[0]))
+            finally:
+                self.database.session.rollback()
+            return [tuple(item) for item in result]
+        if command == 'get_param':
+            try:
+                return self.database.get_param(args[0])
+            finally:
+                self.database.session.rollback()
+        raise DaemonError(f"Unknown daemon command: {command}")
+
+    def _write_daemon_file(self):
+        info = {'address': self.address, 'authkey': self.authkey.hex(), 'pid': os.getpid()}
+        fd = os.open(self.daemon_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(info, file)
+
+    def _remove_daemon_file(self):
+        if self.daemon_file_path.exists():
+            self.daemon_file_path.unlink()
+        if sys.platform != 'win32' and Path(self.address).exists():
+            Path(self.address).unlink()
+
+
+class DaemonClient:
+    """ Client side of the daemon. Every request opens its own connection """
+
+    def __init__(self, address, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+
+    def request(self, command, *args):
+        """ Send request to daemon and return its result """
+        try:
+            with Client(self.address, authkey=self.authkey) as conn:
+                conn.send((command, *args))
+                status, result = conn.recv()
+        except (OSError, EOFError) as err:
+            raise DaemonError(f"Daemon at {self.address} is not available: {err}") from err
+
+        if status == 'error':
+            raise DaemonError(result)
+        return result
+
+    def ping(self):
+        return self.request('ping')
+
+    def config(self):
+        return self.request('config')
+
+    def query_system(self, sap_system: Sap_system, after: tuple = None, limit: int = None):
+        """ Same as SapDB.query_system: passwords are encrypted. Use decrypt() to decrypt them by daemon """
+        return self.request('query_system', tuple(sap_system), after, limit)
+
+    def count_system(self, sap_system: Sap_system):
+        return self.request('count_system', tuple(sap_system))
+
+    def data_version(self):
+        return self.request('data_version')
+
+    def decrypt(self, encrypted_password):
+        return self.request('decrypt', encrypted_password)
+
+    def decrypt_many(self, encrypted_passwords):
+        return self.request('decrypt_many', list(encrypted_passwords))
+
+    def query_param(self, parameter: Parameter):
+        return self.request('query_param', tuple(parameter))
+
+    def get_param(self, transaction):
+        return self.request('get_param', transaction)
+
+    def stop(self):
+        return self.request('stop')
+
+    def make_session(self):
+        """ Compatibility with SapDB: connection is made per request """
+
+    def stop_sap_db(self):
+        """ Compatibility with SapDB: connection is closed per request """
+
+
+def connect(config_path: Path, check=True):
+    """
+    Return client of the running daemon for config folder or None if daemon is not running
+    :param config_path: config folder
+    :param check: ping daemon to be sure that it is alive
+    """
+    daemon_file_path = Path(config_path) / DAEMON_FILE_NAME
+    if not daemon_file_path.exists():
+        return None
+
+    try:
+        with open(daemon_file_path, encoding='utf-8') as file:
+            info = json.load(file)
+        client = DaemonClient(info['address'], bytes.fromhex(info['authkey']))
+        if check:
+            client.ping()
+    except (OSError, ValueError, KeyError, DaemonError):
+        return None
+    return client
+
+
+if __name__ == "__main__":
+    SapDaemon(Path(sys.argv[1])).serve()
@@ -4,19 +4,24 @@
 
 """ Database API """
 
+import itertools
+import re
+import sqlite3
 from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
-from sqlalchemy import Column, String, BLOB
-from sqlalchemy import create_engine, asc
-from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy import Column, String, BLOB, Index, BigInteger, Integer, inspect
+from sqlalchemy import create_engine, asc, tuple_, select, table, column, event, func, literal_column
+from sqlalchemy.exc import IntegrityError, NoResultFound, OperationalError, SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine.url import URL
-from sqlalchemy_utils import drop_database, database_exists
+from sqlalchemy.pool import QueuePool
 
 import sap.utilities as utilities
 from sap.api import DATABASE_NAME
-from sap.exceptions import DatabaseExists, DatabaseDoesNotExists
+from sap.exceptions import DatabaseExists, DatabaseDoesNotExists, DatabaseOutdated
 
 Base = declarative_base()
 
@@ -35,6 +40,9 @@ class Sap(Base):
     autotype = Column(String(250))
     language = Column(String(20))
 
+    # Lookup by system and client ('sap run XXX 100'), update and delete. Primary key starts with customer
+    __table_args__ = (Index('sap_system_client', 'system', 'client', 'user'),)
+
 
 class Param(Base):
     """ Table to store transactions and screen-field for them """
@@ -43,26 +51,237 @@ class Param(Base):
     parameter = Column(String(100))
 
 
+class Landscape(Base):
+    """ Systems added by 'sap landscape-sync': SAP Logon service and primary key of its record in 'sap' table """
+    __tablename__ = 'landscape'
+    uuid = Column(String(40), primary_key=True)
+    customer = Column(String(20))
+    system = Column(String(3))
+    client = Column(String(3))
+    user = Column(String(10))
+    digest = Column(String(64))
+
+
+class SchemaVersion(Base):
+    """ Applied schema migrations, see sap.migrations. Batched migration keeps its position until it is applied """
+    __tablename__ = 'schema_version'
+    version = Column(Integer, primary_key=True)
+    description = Column(String(100))
+    position = Column(String(250))
+    applied = Column(String(19))
+
+
+class LandscapeFile(Base):
+    """ Last synchronized SAPUILandscape.xml """
+    __tablename__ = 'landscape_file'
+    path = Column(String(260), primary_key=True)
+    mtime = Column(BigInteger)
+    size = Column(BigInteger)
+    digest = Column(String(64))
+    # Values of added systems: file synchronized with other values is synchronized again
+    client = Column(String(3))
+    user = Column(String(10))
+    language = Column(String(2))
+
+
+# Full text search indexes: SQLite FTS5 tables with trigram tokenizer, so substring search ('%value%')
+# uses index instead of table scan. Index is external content table: it keeps only the index, values are read
+# from the table by rowid. Tables are kept in sync by triggers. {table: (search table, searched columns)}
+SEARCH_INDEXES = {
+    'sap': ('sap_search', ('customer', 'system', 'client', 'user', 'description')),
+    'parameters': ('parameters_search', ('transaction',)),
+}
+
+sap_search = table('sap_search', column('rowid'), *[column(name) for name in SEARCH_INDEXES['sap'][1]])
+parameters_search = table('parameters_search', column('rowid'),
+                          *[column(name) for name in SEARCH_INDEXES['parameters'][1]])
+
+
+def search_index_ddl(table_name):
+    """
+    SQL statements to create empty search index of the table and triggers that keep it in sync.
+    Rows of the index are found by rowid. Update trigger fires only when searched values are changed,
+    so change of password does not touch the index
+    """
+    search_table, columns = SEARCH_INDEXES[table_name]
+    names = ', '.join(f'"{name}"' for name in columns)
+    new_values = ', '.join(f'new."{name}"' for name in columns)
+    old_values = ', '.join(f'old."{name}"' for name in columns)
+    changed = ' OR '.join(f'old."{name}" IS NOT new."{name}"' for name in columns)
+    insert_new = f"INSERT INTO {search_table} (rowid, {names}) VALUES (new.rowid, {new_values});"
+    delete_old = f"INSERT INTO {search_table} ({search_table}, rowid, {names}) VALUES ('delete', old.rowid, " \
+                 f"{old_values});"
+    return [
+        *[f"DROP TRIGGER IF EXISTS {search_table}_{action}" for action in ('insert', 'delete', 'update')],
+        f"CREATE VIRTUAL TABLE {search_table} USING fts5({names}, content='{table_name}', content_rowid='rowid', "
+        f"tokenize='trigram')",
+        f"CREATE TRIGGER {search_table}_insert AFTER INSERT ON {table_name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {search_table}_delete AFTER DELETE ON {table_name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {search_table}_update AFTER UPDATE OF {names} ON {table_name} WHEN {changed} BEGIN "
+        f"{delete_old} {insert_new} END",
+    ]
+
+
+def schema_version(connection) -> int:
+    """ Version of the last applied migration. 0 - database was created before migrations """
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return 0
+    return connection.execute(
+        select(func.max(SchemaVersion.version)).where(SchemaVersion.applied.isnot(None))).scalar() or 0
+
+
+def has_search_index(connection) -> bool:
+    """ Search indexes are available: SQLite with FTS5 trigram tokenizer (3.34 or newer) """
+    if connection.dialect.name != 'sqlite':
+        return False
+    existing = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return all(search_table in existing for search_table, _ in SEARCH_INDEXES.values())
+
+
+# Engines of the process: {database url: (engine, pragmas)}.
+# Engine and its connection pool are created once per database
+_engines = {}
+# Databases of the process with checked schema version: {database url: search index is available}
+_search_indexes = {}
+# Numbers of connections reading data version: versions read by different connections are not comparable
+_version_connection_ids = itertools.count()
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def get_engine(database_url, pragmas=None):
+    """
+    Return engine for database url. Engine is created on first call or when SQLite pragmas are changed
+    :param pragmas: SQLite PRAGMA values set on every new connection, see sap.api.SQLITE_PROFILES
+    """
+    key = str(database_url)
+    pragmas = dict(pragmas or {})
+    if key in _engines and _engines[key][1] != pragmas:
+        dispose_engine(database_url)
+    if key not in _engines:
+        if database_url.get_backend_name() == 'sqlite':
+            # Connections are reused by 'sap shell' and daemon threads
+            engine = create_engine(database_url, poolclass=QueuePool, pool_size=2, max_overflow=4,
+                                   connect_args={'check_same_thread': False})
+            if pragmas:
+                event.listen(engine, 'connect', lambda connection, record: set_pragmas(connection, pragmas))
+        else:
+            engine = create_engine(database_url, pool_size=2, max_overflow=4, pool_pre_ping=True)
+        _engines[key] = (engine, pragmas)
+    return _engines[key][0]
+
+
+def set_pragmas(connection, pragmas):
+    """ Set PRAGMA values of new SQLite connection. Values are validated by sap.config """
+    cursor = connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            try:
+                cursor.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error:
+                # Journal mode of read only database or of database used by another process can not be changed
+                pass
+    finally:
+        cursor.close()
+
+
+def dispose_engine(database_url):
+    """ Close connections of database url and forget its engine """
+    key = str(database_url)
+    _search_indexes.pop(key, None)
+    engine = _engines.pop(key, None)
+    if engine is not None:
+        engine[0].dispose()
+
+
+def dispose_engines():
+    """ Close connections of all databases of the process """
+    for key in list(_engines):
+        _search_indexes.pop(key, None)
+        _engines.pop(key)[0].dispose()
+
+
+def sqlite_path(database_url) -> Path:
+    """ Path to SQLite database file. Read only database url is 'file:' URI """
+    if database_url.query.get('uri') == 'true':
+        return Path(url2pathname(urlparse(database_url.database).path))
+    return Path(database_url.database)
+
+
+def database_exists(database_url) -> bool:
+    """
+    Check database existence. SQLite: file check without connection (empty file is a valid database).
+    Other databases: connection attempt
+    """
+    if database_url.get_backend_name() == 'sqlite':
+        database = database_url.database
+        if not database or database == ':memory:':
+            return True
+        path = sqlite_path(database_url)
+        if not path.is_file():
+            return False
+        with open(path, 'rb') as file:
+            header = file.read(len(SQLITE_HEADER))
+        return not header or header == SQLITE_HEADER
+
+    try:
+        with get_engine(database_url).connect():
+            return True
+    except OperationalError:
+        dispose_engine(database_url)
+        return False
+
+
+def is_exact_key(sap_system) -> bool:
+    """ System id and client are complete: 3 letters or digits and 3 digits """
+    return (re.fullmatch(r'[A-Za-z0-9]{3}', str(sap_system.system or '')) is not None and
+            re.fullmatch(r'\d{3}', str(sap_system.client or '')) is not None)
+
+
+def indexable(value: str) -> bool:
+    """
+    Search index is used only for values with a trigram: 3 characters in a row without wildcards.
+    Shorter values are not accelerated by trigram index (and crash some SQLite versions)
+    """
+    return re.search(r'[^%_]{3}', value) is not None
+
+
 # noinspection PyUnresolvedReferences
 class SapDB():
     """ Database processing class  """
     session = ''
+    search_index = False
+    _version_connection = None
+    _version_connection_id = None
 
-    def __init__(self, db_path: str = '', db_type: str = ''):  # type (str) -> ()
+    def __init__(self, db_path: str = '', db_type: str = '', pragmas: dict = None, read_only: bool = False,
+                 immutable: bool = False):  # type (str) -> ()
         """
         Connect to database.
 
         :param db_path: Path to database including database name
         :param db_type: Database type: sqlite, Postgresql, mysql, etc.
+        :param pragmas: SQLite PRAGMA values: journal_mode, synchronous, mmap_size, cache_size, temp_store
+        :param read_only: SQLite: open database file in read only mode. Writes fail
+        :param immutable: SQLite read only mode: database file is not changed by anybody (read only share),
+            so it is read without locks and change checks
         """
         self.database_name = DATABASE_NAME
         self.database_type = db_type if db_type else 'sqlite'
         self.database_path = Path(db_path) if db_path else Path(utilities.path() / self.database_name)
+        self.pragmas = pragmas if self.database_type == 'sqlite' else None
+        self.read_only = read_only and self.database_type == 'sqlite'
+        query = {}
+        if self.read_only:
+            # Journal mode and disk sync are properties of writing connections
+            self.pragmas = {name: value for name, value in (self.pragmas or {}).items()
+                            if name not in ('journal_mode', 'synchronous')}
+            query = {'mode': 'ro', 'uri': 'true', **({'immutable': '1'} if immutable else {})}
 
         db_credentials = {'username': None,
                           'password': None,
                           'host': None,
-                          'database': str(self.database_path),
+                          'database': self.database_path.absolute().as_uri() if query else str(self.database_path),
                           'port': None}
 
         self.database_url = URL.create(
@@ -72,30 +291,49 @@ class SapDB():
             host=db_credentials['host'],
             port=db_credentials['port'],
             database=db_credentials['database'],
+            query=query,
         )
 
     def make_session(self):
-        """ create session """
+        """ create session. Schema version is checked once per process """
         if database_exists(self.database_url):
-            # Путь по умолчанию
-            self.engine = create_engine(self.database_url)
+            self.engine = get_engine(self.database_url, self.pragmas)
+            key = str(self.database_url)
+            if key not in _search_indexes:
+                from sap.migrations import LATEST_VERSION
+
+                with self.engine.connect() as connection:
+                    version = schema_version(connection)
+                    if version < LATEST_VERSION:
+                        raise DatabaseOutdated(self.database_path, version, LATEST_VERSION)
+                    _search_indexes[key] = has_search_index(connection)
+            self.search_index = _search_indexes[key]
             session = sessionmaker(bind=self.engine)
             self.session = session()
 
         else:
             raise DatabaseDoesNotExists(self.database_path)
 
+    def upgrade(self, batch=500, progress=None):
+        """
+        Apply migrations that are not applied yet, see sap.migrations.upgrade
+        :return: schema version
+        """
+        from sap import migrations
+
+        engine = get_engine(self.database_url, self.pragmas)
+        version = migrations.upgrade(engine, batch, progress)
+        _search_indexes.pop(str(self.database_url), None)
+        return version
+
     def create(self):
         """ Database creation """
 
         if database_exists(self.database_url):
             raise DatabaseExists(self.database_path)
         else:
-            engine = create_engine(self.database_url)
-            Base.metadata.create_all(engine)
-
-            session = sessionmaker(bind=engine)
-            self.session = session()
+            self.upgrade()
+            self.make_session()
 
     def add(self, sap_system):  # type (namedtuple) -> list
         """Add a system to database """
@@ -117,9 +355,34 @@ class SapDB():
             return result
         return result
 
-    def query_system(self, sap_system):
-        """ Query system from database """
+    def query_system(self, sap_system, after=None, limit=None):
+        """
+        Query system from database. Systems are ordered by customer, system, client and user
+        :param after: key (customer, system, client, user) of the last system of previous page
+        :param limit: maximum number of systems
+        """
 
+        if is_exact_key(sap_system):
+            # Complete system id and client: exact lookup by index, fuzzy search only if nothing is found
+            if after is None:
+                result = self._query_system(sap_system, exact=True, limit=limit)
+                if result:
+                    return result
+            elif self._query_system(sap_system, exact=True, limit=1):
+                # Next pages are taken from the same kind of search as the first one
+                return self._query_system(sap_system, exact=True, after=after, limit=limit)
+        return self._query_system(sap_system, after=after, limit=limit)
+
+    def count_system(self, sap_system) -> int:
+        """ Number of systems found by query_system """
+        if is_exact_key(sap_system):
+            result = self._filter_system(self.session.query(func.count()).select_from(Sap), sap_system,
+                                         exact=True).scalar()
+            if result:
+                return result
+        return self._filter_system(self.session.query(func.count()).select_from(Sap), sap_system).scalar()
+
+    def _query_system(self, sap_system, exact=False, after=None, limit=None):
         query = self.session.query(Sap.system,
                                    Sap.client,
                                    Sap.user,
@@ -133,20 +396,33 @@ class SapDB():
                                                           asc(Sap.system),
                                                           asc(Sap.client),
                                                           asc(Sap.user))
-        if sap_system.system:
-            # noinspection PyUnresolvedReferences
-            query = query.filter(Sap.system.ilike(f"%{sap_system.system}%"))
-        if sap_system.client:
-            query = query.filter(Sap.client.ilike(f"%{sap_system.client}%"))
-        if sap_system.user:
-            query = query.filter(Sap.user.ilike(f"%{sap_system.user}%"))
-        if sap_system.customer:
-            query = query.filter(Sap.customer.ilike(f"%{sap_system.customer}%"))
-        if sap_system.description:
-            query = query.filter(Sap.description.ilike(f"%{sap_system.description}%"))
+        query = self._filter_system(query, sap_system, exact)
+        if after is not None:
+            # Keyset pagination: rows after the last row of previous page in primary key order
+            query = query.filter(tuple_(Sap.customer, Sap.system, Sap.client, Sap.user) > tuple_(*after))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def _filter_system(self, query, sap_system, exact=False):
+        searched = {name: str(getattr(sap_system, name)) for name in SEARCH_INDEXES['sap'][1] if
+                    getattr(sap_system, name)}
+        if exact:
+            query = query.filter(Sap.system == str(sap_system.system).upper(), Sap.client == str(sap_system.client))
+            del searched['system'], searched['client']
+        indexed = {name: value for name, value in searched.items() if self.search_index and indexable(value)}
+        if indexed:
+            search = select(sap_search.c.rowid)
+            for name, value in indexed.items():
+                search = search.where(sap_search.c[name].like(f"%{value}%"))
+            query = query.filter(literal_column('sap.rowid').in_(search))
+        for name, value in searched.items():
+            if name not in indexed:
+                # noinspection PyUnresolvedReferences
+                query = query.filter(getattr(Sap, name).ilike(f"%{value}%"))
         if sap_system.only_web:
             query = query.filter(Sap.only_web.ilike(f"%{sap_system.only_web}%"))
-        return query.all()
+        return query
 
     def update(self, sap_system):  # type (namedtuple) -> list
         """ Update system in database """
@@ -187,10 +463,214 @@ class SapDB():
 
         return result
 
+    def query_passwords(self, after=None, limit=500):
+        """
+        Batch of (customer, system, client, user, password) records ordered by primary key
+        :param after: primary key (customer, system, client, user) of the last record of the previous batch
+        :param limit: batch size
+        """
+        query = self.session.query(Sap.customer, Sap.system, Sap.client, Sap.user, Sap.password)
+        if after is not None:
+            query = query.filter(tuple_(Sap.customer, Sap.system, Sap.client, Sap.user) > tuple_(*after))
+        return query.order_by(asc(Sap.customer), asc(Sap.system), asc(Sap.client), asc(Sap.user)).limit(limit).all()
+
+    def stream_systems(self, batch=500):
+        """
+        All systems in Sap_system order of fields, ordered by primary key.
+        Rows are fetched from database cursor batch by batch, not loaded all at once
+        :param batch: number of rows fetched at once
+        """
+        return self.session.query(Sap.system, Sap.client, Sap.user, Sap.password, Sap.language, Sap.customer,
+                                  Sap.description, Sap.url, Sap.autotype, Sap.only_web).order_by(
+            asc(Sap.customer), asc(Sap.system), asc(Sap.client), asc(Sap.user)).yield_per(batch)
+
+    def stream_params(self, batch=500):
+        """ All transactions and their parameters. Rows are fetched from database cursor batch by batch """
+        return self.session.query(Param.transaction, Param.parameter).order_by(asc(Param.transaction)).yield_per(batch)
+
+    def update_passwords(self, records):
+        """
+        Replace passwords in one transaction
+        :param records: list of (customer, system, client, user, password)
+        """
+        for customer, system, client, user, password in records:
+            self.session.query(Sap).filter(Sap.customer == customer, Sap.system == system, Sap.client == client,
+                                           Sap.user == user).update({Sap.password: password},
+                                                                    synchronize_session=False)
+        self.session.commit()
+
+    def upsert(self, sap_systems):
+        """
+        Add systems or update existing ones with the same customer, system, client and user in one transaction.
+        System without password keeps its stored password
+        :param sap_systems: list of Sap_system with encrypted passwords
+        :return: list of (position in sap_systems, error message) of systems that were not saved
+        """
+        rows = [{'customer': item.customer, 'system': item.system, 'client': item.client, 'user': item.user,
+                 'password': item.password, 'language': item.language, 'description': item.description,
+                 'url': item.url, 'autotype': item.autotype, 'only_web': item.only_web} for item in sap_systems]
+        return self._upsert(Sap, rows)
+
+    def upsert_params(self, parameters):
+        """
+        Add transactions' parameters or replace existing ones in one transaction
+        :param parameters: list of Parameter
+        :return: list of (position in parameters, error message) of parameters that were not saved
+        """
+        rows = [{'transaction': item.transaction, 'parameter': item.parameter} for item in parameters]
+        return self._upsert(Param, rows)
+
+    def _upsert(self, model, rows):
+        """ Save rows in one transaction. If transaction fails, rows are saved one by one to find failed ones """
+        if not rows:
+            return []
+
+        keys = [key.name for key in model.__table__.primary_key]
+        if self.database_type == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+
+            statement = insert(model.__table__)
+            values = {name: statement.excluded[name] for name in rows[0] if name not in keys}
+            if 'password' in values:
+                values['password'] = func.coalesce(statement.excluded.password, model.__table__.c.password)
+            statement = statement.on_conflict_do_update(index_elements=keys, set_=values)
+
+            def save(batch):
+                self.session.execute(statement, batch)
+        else:
+            def save(batch):
+                for row in batch:
+                    self.session.merge(model(**{name: value for name, value in row.items()
+                                                if value is not None or name != 'password'}))
+
+        try:
+            save(rows)
+            self.session.commit()
+            return []
+        except SQLAlchemyError:
+            self.session.rollback()
+
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                save([row])
+                self.session.commit()
+            except SQLAlchemyError as err:
+                self.session.rollback()
+                errors.append((index, str(getattr(err, 'orig', None) or err)))
+        return errors
+
+    def landscape_file(self):
+        """
+        State of the last synchronized landscape file: (path, mtime, size, digest, client, user, language) or None
+        """
+        return self.session.query(LandscapeFile.path, LandscapeFile.mtime, LandscapeFile.size, LandscapeFile.digest,
+                                  LandscapeFile.client, LandscapeFile.user, LandscapeFile.language).first()
+
+    def save_landscape_file(self, state, commit=True):
+        """ Save state (path, mtime, size, digest, client, user, language) of synchronized landscape file """
+        self.session.query(LandscapeFile).delete(synchronize_session=False)
+        self.session.add(LandscapeFile(path=state[0], mtime=state[1], size=state[2], digest=state[3],
+                                       client=state[4], user=state[5], language=state[6]))
+        if commit:
+            self.session.commit()
+
+    def sync_landscape(self, entries, client, user, language, state):
+        """
+        Apply difference between landscape file and systems added by previous synchronization in one transaction:
+        new systems are added, changed ones are updated, systems removed from landscape file are deleted.
+        Systems added by other commands are not changed.
+        :param entries: list of LandscapeEntry, see sap.landscape
+        :param client: client of added systems
+        :param user: user of added systems
+        :param language: language of added systems. Language other than of the last synchronization is written
+            to all synchronized systems
+        :param state: state of landscape file (path, mtime, size, digest, client, user, language)
+        :return: dict with number of inserted, updated, deleted and skipped systems
+        """
+        result = {'inserted': 0, 'updated': 0, 'deleted': 0, 'skipped': 0}
+        stored = self.landscape_file()
+        language_changed = stored is not None and stored.language != language
+        links = {link.uuid: link for link in self.session.query(Landscape)}
+        keys = set()
+
+        try:
+            for entry in entries:
+                key = (entry.customer, entry.system, client, user)
+                if key in keys:
+                    # The same system in the same folder
+                    result['skipped'] += 1
+                    continue
+                keys.add(key)
+
+                link = links.pop(entry.uuid, None)
+                if link is not None and (link.customer, link.system, link.client, link.user) == key:
+                    values = {Sap.description: entry.description} if link.digest != entry.digest else {}
+                    if language_changed:
+                        values[Sap.language] = language
+                    if values:
+                        self.session.query(Sap).filter(Sap.customer == key[0], Sap.system == key[1],
+                                                       Sap.client == key[2], Sap.user == key[3]).update(
+                            values, synchronize_session=False)
+                        link.digest = entry.digest
+                        result['updated'] += 1
+                    continue
+
+                if self.session.get(Sap, key) is not None:
+                    # Added by hand: previous record of moved system is kept too
+                    result['skipped'] += 1
+                    continue
+
+                # Moved to another folder, or client or user is changed: record is replaced, password is kept
+                previous = None
+                if link is not None:
+                    previous = self.session.get(Sap, (link.customer, link.system, link.client, link.user))
+                    if previous is not None:
+                        self.session.delete(previous)
+                    self.session.delete(link)
+                    self.session.flush()
+
+                self.session.add(Sap(customer=entry.customer, system=entry.system, client=client, user=user,
+                                     password=previous.password if previous is not None else None,
+                                     language=previous.language if previous is not None and not language_changed
+                                     else language,
+                                     description=entry.description,
+                                     url=previous.url if previous is not None else '',
+                                     autotype=previous.autotype if previous is not None else '',
+                                     only_web=previous.only_web if previous is not None else 'no'))
+                self.session.add(Landscape(uuid=entry.uuid, customer=entry.customer, system=entry.system,
+                                           client=client, user=user, digest=entry.digest))
+                result['updated' if previous is not None else 'inserted'] += 1
+
+            for link in links.values():
+                self.session.query(Sap).filter(Sap.customer == link.customer, Sap.system == link.system,
+                                               Sap.client == link.client, Sap.user == link.user).delete(
+                    synchronize_session=False)
+                self.session.delete(link)
+                result['deleted'] += 1
+
+            self.save_landscape_file(state, commit=False)
+            self.session.commit()
+        except SQLAlchemyError:
+            self.session.rollback()
+            raise
+        return result
+
+    def get_param(self, transaction):
+        """
+        Parameters of the transaction: exact match by primary key, transactions are upper case.
+        None if not found
+        """
+        return self.session.query(Param.parameter).filter(Param.transaction == transaction).scalar()
+
     def query_param(self, parameter):
-        """List all transactions and it's parameters"""
+        """List all transactions and it's parameters. Transaction is searched by part of its name: 'sap parlist'"""
         query = self.session.query(Param.transaction, Param.parameter)
-        if parameter.transaction:
+        if parameter.transaction and self.search_index and indexable(parameter.transaction):
+            query = query.filter(literal_column('parameters.rowid').in_(
+                select(parameters_search.c.rowid).where(
+                    parameters_search.c.transaction.like(f"%{parameter.transaction}%"))))
+        elif parameter.transaction:
             query = query.filter(Param.transaction.ilike(f"%{parameter.transaction}%"))
         return query.all()
 
@@ -241,13 +721,52 @@ class SapDB():
 
     def drop(self):
         """ Dropping database"""
-        drop_database(self.database_url)
+        if self.database_type == 'sqlite':
+            # Read only connections to the file are closed too
+            dispose_engines()
+            self.database_path.unlink()
+        else:
+            from sqlalchemy_utils import drop_database
+            dispose_engine(self.database_url)
+            drop_database(self.database_url)
+
+    def checkpoint(self):
+        """
+        Move changes from write-ahead log (journal_mode WAL) into database file,
+        so the database file can be copied alone, for example, into backup
+        """
+        if self.database_type != 'sqlite' or not database_exists(self.database_url):
+            return
+        connection = get_engine(self.database_url, self.pragmas).raw_connection()
+        try:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass  # Database is used by another process: its changes are checkpointed when it is closed
+        finally:
+            connection.close()
+
+    def data_version(self):
+        """
+        Version of database data: changes when any connection commits changes (SQLite PRAGMA data_version).
+        Version is read by a connection that never writes, so changes of this session count too.
+        :return: (number of the connection, data version). None - version is not known (not SQLite database)
+        """
+        if self.database_type != 'sqlite':
+            return None
+        if self._version_connection is None:
+            self._version_connection = self.engine.raw_connection()
+            self._version_connection_id = next(_version_connection_ids)
+        return self._version_connection_id, self._version_connection.execute("PRAGMA data_version").fetchone()[0]
 
     def stop_sap_db(self):
-        """Disconnect from DB."""
-        self.session.close_all()
+        """Disconnect from DB. Connection is returned to the process' pool"""
+        if self.session:
+            self.session.close()
+        if self._version_connection is not None:
+            self._version_connection.close()
+            self._version_connection = None
 
 
-def start_sap_db(db_path, db_type):
+def start_sap_db(db_path, db_type, pragmas=None, read_only=False, immutable=False):
     """Connect to db."""
-    return SapDB(db_path, db_type)
+    return SapDB(db_path, db_type, pragmas, read_only, immutable)
@@ -24,6 +24,15 @@ class ConfigDoesNotExists(Exception):
         super().__init__(self.message)
 
 
+class ConfigWrongValue(Exception):
+    """ Exception. Config file has a wrong value """
+
+    def __init__(self, section, option, value, message="SAP_CONFIG.INI has a wrong value"):
+        self.message = f"\n{message}: [{section}] {option} = {value}"
+        self.message += f"\nRun command 'sap config -open' to correct the config file"
+        super().__init__(self.message)
+
+
 class WrongPath(Exception):
     """ Exception. SAP executables do not exist """
 
@@ -50,6 +59,15 @@ class DatabaseDoesNotExists(Exception):
         super().__init__(self.message)
 
 
+class DatabaseOutdated(Exception):
+    """Exception. Database schema is older than the application"""
+
+    def __init__(self, path, version, required, message="Database has to be upgraded"):
+        self.message = f"\n{message}. Schema version: {version}, required: {required}. \nDatabase: {path}"
+        self.message += f"\nCreate backup with 'sap backup' and run 'sap db --upgrade'"
+        super().__init__(self.message)
+
+
 # ========================== CRYPTO ==========================
 
 class PublicKeyAlreadyExists(Exception):
@@ -92,6 +110,16 @@ class EncryptionKeysAlreadyExist(Exception):
         super().__init__(self.message)
 
 
+# ========================== DAEMON ==========================
+
+class DaemonError(Exception):
+    """ Exception. Daemon is not available or failed to process request """
+
+    def __init__(self, message="Daemon failed to process request"):
+        self.message = f"\n{message}"
+        super().__init__(self.message)
+
+
 class FailedRequirements(click.exceptions.BadParameter):
     """ Exception. Public key already exists """
 
@@ -0,0 +1,91 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" SAP Logon landscape file (SAPUILandscape.xml) reading for 'sap landscape-sync' """
+
+import hashlib
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+from xml.etree.ElementTree import iterparse
+
+from sap.api import SAPLOGON_INI
+
+# SAP GUI system of landscape file
+# uuid - id of Service element, digest - hash of values saved to 'sap' table
+LandscapeEntry = namedtuple('LandscapeEntry', ['uuid', 'system', 'customer', 'description', 'digest'])
+
+# Synchronized landscape file: modification time (ns), size and SHA-256 of content,
+# client, user and language of added systems
+FileState = namedtuple('FileState', ['path', 'mtime', 'size', 'digest', 'client', 'user', 'language'])
+
+# Customer of systems placed outside of folders
+DEFAULT_CUSTOMER = 'SAPLOGON'
+# Length of 'sap' table columns
+CUSTOMER_LENGTH = 20
+DESCRIPTION_LENGTH = 20
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def landscape_path() -> Path:
+    """ Path to SAPUILandscape.xml: https://launchpad.support.sap.com/#/notes/2075150 """
+    return Path(os.path.expandvars(r'%APPDATA%\SAP\Common')) / SAPLOGON_INI
+
+
+def file_state(path) -> FileState:
+    """ Modification time and size of the file. Content digest and values of added systems are not set """
+    stat = Path(path).stat()
+    return FileState(str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size, None, None, None, None)
+
+
+def file_digest(path) -> str:
+    """ SHA-256 of file content. File is read by chunks """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_digest(system, customer, description) -> str:
+    return hashlib.sha256('\0'.join((system, customer, description)).encode()).hexdigest()
+
+
+def read_landscape(path) -> list:
+    """
+    SAP GUI systems of landscape file. Customer is the name of the folder (Node) or workspace the system is placed in.
+    File is parsed as a stream: every element is cleared after it is read, so big files do not stay in memory
+    :return: list of LandscapeEntry
+    """
+    services = {}  # {service uuid: (system, description)}
+    folders = {}  # {service uuid: folder name}
+    names = []  # Names of Workspace and Node elements the parser is in
+
+    for event, element in iterparse(str(path), events=('start', 'end')):
+        tag = element.tag.rsplit('}', 1)[-1]
+
+        if event == 'start':
+            if tag in ('Workspace', 'Node'):
+                names.append(element.get('name', '').strip())
+            continue
+
+        if tag in ('Workspace', 'Node'):
+            names.pop()
+        elif tag == 'Item' and element.get('serviceid'):
+            folders.setdefault(element.get('serviceid'), next((name for name in reversed(names) if name), ''))
+        elif tag == 'Service' and element.get('type', 'SAPGUI') == 'SAPGUI':
+            system = element.get('systemid', '').strip()
+            if element.get('uuid') and re.fullmatch(r'[A-Za-z0-9]{3}', system):
+                services[element.get('uuid')] = (system.upper(), element.get('name', '').strip())
+        element.clear()
+
+    entries = []
+    for uuid, (system, description) in services.items():
+        customer = (folders.get(uuid) or DEFAULT_CUSTOMER)[:CUSTOMER_LENGTH]
+        description = description[:DESCRIPTION_LENGTH]
+        entries.append(LandscapeEntry(uuid, system, customer, description,
+                                      entry_digest(system, customer, description)))
+    return entries
@@ -0,0 +1,198 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+"""
+Start of external programs (sapshcut.exe, browsers) without waiting for them.
+
+DetachedLauncher starts a small watcher process (this module run as script) and returns at once. The watcher starts
+the program, waits for it and appends failed launches to the status file. Failures are reported by the next launch.
+Command line is passed to the watcher through pipe: it contains password and is not shown in the list of processes.
+"""
+
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# Failed launch: title of launched system, program name, process id, exit code (None if program was not started),
+# error message and finish time
+LaunchStatus = namedtuple('LaunchStatus', ['title', 'program', 'pid', 'returncode', 'error', 'finished'])
+
+# Result of one launch of launch_many: exit code of the last attempt (None if program was not started or was stopped
+# by timeout), number of attempts, seconds of all attempts and error message
+LaunchResult = namedtuple('LaunchResult', ['title', 'returncode', 'attempts', 'seconds', 'error'])
+
+# sapshcut.exe passes the command to SAP GUI and exits: longer run means that it hangs
+LAUNCH_TIMEOUT = 60
+# Pause before retry of failed launch, seconds. Multiplied by number of attempt
+RETRY_DELAY = 1
+
+if sys.platform == 'win32':
+    # Watcher gets its own hidden console: closing of the terminal or Ctrl+C do not stop it
+    DETACHED_FLAGS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW}
+else:
+    DETACHED_FLAGS = {'start_new_session': True}
+
+
+def command_args(command):
+    """ Command line as Popen argument: Windows gets string as it is, other systems need list of arguments """
+    if isinstance(command, str) and sys.platform != 'win32':
+        return shlex.split(command)
+    return command
+
+
+def program_name(command) -> str:
+    args = command_args(command)
+    program = args[0] if isinstance(args, list) else shlex.split(args, posix=False)[0].strip('"')
+    return Path(str(program)).name
+
+
+class Launcher(ABC):
+    """ Launcher interface. Replace default launcher by set_launcher() """
+
+    @abstractmethod
+    def start(self, command, title=''):
+        """ Start the program and return without waiting for it """
+
+    @abstractmethod
+    def run(self, command, timeout=None) -> int:
+        """ Start the program and wait for it. :return: exit code """
+
+    def failures(self) -> list:
+        """ Failed launches which are not reported yet. They are removed after reading """
+        return []
+
+
+class DetachedLauncher(Launcher):
+    """ Program is watched by detached process, failures are saved to status file """
+
+    def __init__(self, status_path: Path, python=None):
+        self.status_path = Path(status_path)
+        self.python = python if python else sys.executable
+
+    def start(self, command, title=''):
+        """ :return: process id of the watcher """
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        # Watcher uses only standard library: module is run as script without import of sap package
+        watcher = subprocess.Popen([self.python, __file__], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, close_fds=True, **DETACHED_FLAGS)
+        with watcher.stdin as stream:
+            stream.write(json.dumps({'command': command_args(command), 'title': title,
+                                     'status_path': str(self.status_path)}).encode())
+        return watcher.pid
+
+    def run(self, command, timeout=None) -> int:
+        return subprocess.run(command_args(command), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, timeout=timeout).returncode
+
+    def failures(self) -> list:
+        if not self.status_path.exists():
+            return []
+        # Watchers can append while file is read: file is taken away by rename first
+        taken = self.status_path.with_suffix(f'.{os.getpid()}')
+        try:
+            os.replace(self.status_path, taken)
+        except OSError:
+            return []
+        try:
+            with open(taken, encoding='utf-8') as file:
+                return [LaunchStatus(**json.loads(line)) for line in file if line.strip()]
+        except (OSError, ValueError, TypeError):
+            return []
+        finally:
+            taken.unlink(missing_ok=True)
+
+
+def watch(command, title, status_path):
+    """ Start the program, wait for it and save failure to status file """
+    pid = returncode = None
+    error = ''
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        pid = process.pid
+        returncode = process.wait()
+    except OSError as err:
+        error = str(err)
+
+    if error or returncode:
+        status = LaunchStatus(title, program_name(command), pid, returncode, error,
+                              time.strftime('%Y-%m-%d %H:%M:%S'))
+        with open(status_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(status._asdict()) + '\n')
+
+
+def launch_one(launcher: Launcher, title, command, retries, timeout) -> LaunchResult:
+    """ Run the program until it exits with 0 or retries are over """
+    started = time.monotonic()
+    returncode, error = None, ''
+    attempt = 0
+    while attempt <= retries:
+        if attempt:
+            time.sleep(RETRY_DELAY * attempt)
+        attempt += 1
+        try:
+            returncode, error = launcher.run(command, timeout), ''
+        except subprocess.TimeoutExpired:
+            returncode, error = None, f"no exit in {timeout} seconds"
+        except OSError as err:
+            # Program does not exist: retry will not help
+            returncode, error = None, str(err)
+            break
+        if returncode == 0:
+            break
+    return LaunchResult(title, returncode, attempt, time.monotonic() - started, error)
+
+
+def launch_many(launches, workers=4, retries=1, timeout=LAUNCH_TIMEOUT, launcher: Launcher = None):
+    """
+    Run programs by pool of workers
+    :param launches: list of (title, command)
+    :param workers: maximum number of programs running at the same time
+    :param retries: number of retries of a program that exits with non-zero code
+    :param timeout: seconds to wait for exit of a program
+    :return: generator of LaunchResult in order of finish
+    """
+    launcher = launcher if launcher else get_launcher()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(launch_one, launcher, title, command, retries, timeout) for title, command in launches]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+_launcher = None
+
+
+def get_launcher(config_path=None) -> Launcher:
+    """
+    Launcher of the process. Default: DetachedLauncher with status file in the config folder
+    :param config_path: config folder. Default: application folder
+    """
+    if _launcher is not None:
+        return _launcher
+
+    from sap.api import LAUNCH_STATUS_NAME
+
+    if config_path is None:
+        from sap.utilities import path
+
+        config_path = path()
+    return DetachedLauncher(Path(config_path) / LAUNCH_STATUS_NAME)
+
+
+def set_launcher(launcher: Launcher):
+    """ Replace launcher of the process. None - default launcher """
+    global _launcher
+    _launcher = launcher
+
+
+if __name__ == "__main__":
+    request = json.loads(sys.stdin.read())
+    watch(request['command'], request['title'], request['status_path'])
@@ -0,0 +1,128 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Database schema migrations: list of migrations and runner used by 'sap db' and 'sap db --upgrade' """
+
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from sap.database import Base, Sap, Param, Landscape, LandscapeFile, SchemaVersion
+from sap.database import SEARCH_INDEXES, search_index_ddl, schema_version
+
+# Migration is applied step by step. Every step runs in its own transaction together with saving of its position,
+# so interrupted migration is continued from the last committed step.
+# apply(connection, position, batch) -> (position of the next step or None when migration is finished, rows processed)
+# Position is JSON serializable value, None for the first step
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+
+def create_tables(*models):
+    def apply(connection, position, batch):
+        Base.metadata.create_all(connection, tables=[model.__table__ for model in models])
+        return None, 0
+
+    return apply
+
+
+def create_indexes(model):
+    def apply(connection, position, batch):
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        return None, 0
+
+    return apply
+
+
+def search_index(table_name):
+    """
+    Full text search index of the table (SQLite only).
+    First step creates empty index and triggers, next steps copy existing rows by batches in rowid order.
+    Position is the rowid of the last copied row
+    """
+    search_table, columns = SEARCH_INDEXES[table_name]
+    names = ', '.join(f'"{name}"' for name in columns)
+
+    def apply(connection, position, batch):
+        if connection.dialect.name != 'sqlite':
+            return None, 0
+
+        if position is None:
+            existing = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                                  (search_table,)).first()
+            if existing:
+                # Index was created and filled by version without migrations
+                return None, 0
+            try:
+                for statement in search_index_ddl(table_name):
+                    connection.exec_driver_sql(statement)
+            except OperationalError:
+                # SQLite is older than 3.34: no trigram tokenizer. Search works without index
+                return None, 0
+            return 0, 0
+
+        last, rows = connection.exec_driver_sql(
+            f"SELECT max(rowid), count(*) FROM (SELECT rowid FROM {table_name} WHERE rowid > ? ORDER BY rowid "
+            f"LIMIT ?)", (position, batch)).first()
+        if not rows:
+            return None, 0
+
+        connection.exec_driver_sql(f"INSERT INTO {search_table} (rowid, {names}) SELECT rowid, {names} "
+                                   f"FROM {table_name} WHERE rowid > ? AND rowid <= ?", (position, last))
+        return last, rows
+
+    return apply
+
+
+MIGRATIONS = [
+    Migration(1, "Tables of SAP systems and transactions' parameters", create_tables(Sap, Param)),
+    Migration(2, "Index of 'sap' table by system and client", create_indexes(Sap)),
+    Migration(3, "Search index of 'sap' table", search_index('sap')),
+    Migration(4, "Search index of 'parameters' table", search_index('parameters')),
+    Migration(5, "Tables of 'sap landscape-sync'", create_tables(Landscape, LandscapeFile)),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def upgrade(engine, batch=500, progress=None):
+    """
+    Apply migrations that are not applied yet. Database created before migrations has version 0.
+    :param engine: engine of database
+    :param batch: number of rows processed in one transaction by batched migrations
+    :param progress: function called after every committed step: progress(migration, rows processed)
+    :return: schema version
+    """
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        version = schema_version(connection)
+
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+
+        while True:
+            with engine.begin() as connection:
+                stored = connection.execute(select(SchemaVersion.position).where(
+                    SchemaVersion.version == migration.version)).first()
+                if stored is None:
+                    connection.execute(insert(SchemaVersion).values(version=migration.version,
+                                                                    description=migration.description))
+                position = json.loads(stored.position) if stored is not None and stored.position else None
+
+                position, rows = migration.apply(connection, position, batch)
+
+                values = {'position': None, 'applied': datetime.now().isoformat(sep=' ', timespec='seconds')} \
+                    if position is None else {'position': json.dumps(position)}
+                connection.execute(update(SchemaVersion).where(SchemaVersion.version == migration.version)
+                                   .values(**values))
+            if progress:
+                progress(migration, rows)
+            if position is None:
+                break
+
+    return max(version, LATEST_VERSION)
@@ -5,18 +5,18 @@
 """ helpful functions """
 import click
 from pathlib import Path
-from subprocess import Popen
 import re
 import time
-import pyautogui
 import typing
 
 import sap.api
 import sap.config
 from sap.api import Sap_system, Parameter
 from sap.exceptions import WrongPath, FailedRequirements
+from sap import agent
+from sap import autotype
+from sap.launcher import get_launcher, command_args
 
-from rich.markdown import Markdown
 from rich.console import Console
 from rich.table import Table
 from rich import box
@@ -55,7 +55,8 @@ def prepare_parameters_to_launch_system(selected_system: Sap_system,
                                         system_command: str = '',
                                         reuse: bool = False,
                                         sapshcut_exe_path: Path = "",
-                                        language: str = ''):
+                                        language: str = '',
+                                        abort_on_wrong_path: bool = True):
     """
     Constructing a string to start the system
     :param selected_system:
@@ -70,6 +71,7 @@ def prepare_parameters_to_launch_system(selected_system: Sap_system,
     :param system_command:
     :param reuse:
     :param sapshcut_exe_path:
+    :param abort_on_wrong_path: print error and abort if sapshcut.exe does not exist, otherwise raise WrongPath
     :return:
     """
 
@@ -82,6 +84,8 @@ def prepare_parameters_to_launch_system(selected_system: Sap_system,
     try:
         check_if_path_exists(sapshcut_exe_path)
     except WrongPath as err:
+        if not abort_on_wrong_path:
+            raise
         print_message(f"{err}", message_type=message_type_error)
         raise click.Abort
 
@@ -129,12 +133,10 @@ def prepare_parameters_to_launch_system(selected_system: Sap_system,
         argument += " -type=transaction"
 
         if parameter:
-            param = Parameter(str(transaction).upper(), None)
-            param_data = sap.query_param(param)
+            param_list = sap.param_fields(transaction)
 
-            if param_data:
+            if param_list:
                 command += f" -> {parameter}"
-                param_list = param_data[0][1].split(',')
                 param_value = parameter.split(',')
 
                 param_list_value = zip(param_list, param_value)
@@ -184,15 +186,11 @@ def launch_command_line_with_params(command_line_path, param: typing.List):
         print_message(f"{err}", message_type_error)
         raise click.Abort
 
-    argument = [command_line_path]
+    argument = [str(command_line_path)]
     for item in param:
-        argument.append(item)
+        argument.append(str(item))
 
-    pop = Popen(argument)
-    # pop.wait()
-
-    if pop.returncode:
-        click.echo(pop.returncode)
+    start_program(argument, Path(command_line_path).name)
 
 
 def launch_saplogon_with_params(saplogon):
@@ -228,6 +226,23 @@ def choose_system(sap_systems: list) -> Sap_system:
     return selected_system
 
 
+def choose_systems(sap_systems: list, selection: str) -> list:
+    """
+    Systems chosen by numbers and ranges of numbers of printed list: '1-3,5'
+    :raise click.BadParameter: wrong selection
+    """
+    chosen = []
+    for item in selection.replace(' ', '').split(','):
+        match = re.fullmatch(r'(\d+)(?:-(\d+))?', item)
+        if not match:
+            raise click.BadParameter(f"{item!r} is not a number or range of numbers, e.g. '1-3,5'")
+        first, last = int(match.group(1)), int(match.group(2) or match.group(1))
+        if not 1 <= first <= last <= len(sap_systems):
+            raise click.BadParameter(f"{item!r} is out of range. Available values from 1 to {len(sap_systems)}")
+        chosen.extend(number for number in range(first, last + 1) if number not in chosen)
+    return [Sap_system(*sap_systems[number - 1]) for number in chosen]
+
+
 def choose_parameter(parameters: list):
     """ Choose a transaction with parameter """
     ans = 0
@@ -329,7 +344,7 @@ def print_system_list(*sap_systems: Sap_system, title, color=None, verbose=False
                     row.append('')
 
             if verbose and sap_system.password is not None:
-                row.append(sap_system.password)
+                row.append(str(sap_system.password))
 
             table.add_row(*row)
             row.clear()
@@ -370,7 +385,7 @@ def print_system_list(*sap_systems: Sap_system, title, color=None, verbose=False
 
             if verbose and sap_system.password is not None:
                 row.append("Password")
-                row.append(sap_system.password)
+                row.append(str(sap_system.password))
                 table.add_row(*row)
                 row.clear()
 
@@ -407,6 +422,8 @@ def print_system_list(*sap_systems: Sap_system, title, color=None, verbose=False
     if verbose:
         print_message(
             f"Information about passwords will be deleted from screen in {timeout} seconds", message_type_message)
+        if clear_later('screen', timeout):
+            return
         try:
             countdown(timeout, 'Clearing in ...')
         except KeyboardInterrupt:
@@ -465,6 +482,13 @@ def path():
     return Path(click.get_app_dir('sap', roaming=False))
 
 
+def config_folder() -> Path:
+    """ Config folder of the running command ('--config_path'). Default: application folder """
+    ctx = click.get_current_context(silent=True)
+    config = getattr(ctx.obj, 'config', None) if ctx else None
+    return Path(config.config_path) if config else path()
+
+
 class String_3(click.ParamType):
     """Click check class for parameters type"""
 
@@ -572,25 +596,39 @@ class Autotype_sequence(click.ParamType):
     name = "Autotype items"
 
     def convert(self, value, param, ctx):
-        autotype_list = '(USER|PASS|LANG|DELAY|ENTER|TAB|SPACE|SYSTEM|CLIENT)'
+        try:
+            autotype.compile_sequence(value)
+        except ValueError as err:
+            self.fail(
+                f"\n{err.args[0]!r}. Wrong Autotype item(s). Choose item from the allowed: ({'|'.join(autotype.ITEMS)}) "
+                f"and check parameters\n"
+            )
+        return value
 
-        # r'\{(USER|PASS|LANG|DELAY|ENTER|TAB|SYSTEM|CLIENT)(?: \d*)?\}'
-        re_str = fr'{{{autotype_list}(?: *\d*)?}}'
-        re_comp = re.compile(re_str)
-        result = re_comp.sub('', value)
+    def fail(self, message, **kwargs):
+        raise FailedRequirements(message)
 
-        if not result:
-            return value
 
-        self.fail(
-            f"\n{result!r}. Wrong Autotype item(s). Choose item from the allowed: {autotype_list} and check parameters\n"
-        )
+AUTOTYPE = Autotype_sequence()
+
+
+class Readiness_check(click.ParamType):
+    """Click check class for parameters type"""
+
+    name = "Readiness check"
+
+    def convert(self, value, param, ctx):
+        try:
+            autotype.parse_readiness(value)
+        except ValueError as err:
+            self.fail(f"\n{err}\n")
+        return value
 
     def fail(self, message, **kwargs):
         raise FailedRequirements(message)
 
 
-AUTOTYPE = Autotype_sequence()
+READY = Readiness_check()
 
 
 class Default_language(click.ParamType):
@@ -619,35 +657,50 @@ class Default_language(click.ParamType):
 DEFAULT_LANG = Default_language()
 
 
-def launch_autotype_sequence(selected_system: Sap_system, language, minimize=''):
+def wait_for_site(ready, timeout):
+    """
+    Wait for web site to load: until readiness check passes, but not longer than timeout seconds.
+    Arguments are the same as of autotype.wait_until(): function is used as 'wait' of autotype.execute()
+    :param ready: readiness check of autotype.readiness(). None - wait timeout seconds
+    """
+    if ready is None:
+        countdown(timeout, 'Waiting for web site to load')
+    elif not autotype.wait_until(ready, timeout):
+        print_message(f"Web site is not ready in {timeout} seconds", message_type_warning)
+
+
+def launch_autotype_sequence(selected_system: Sap_system, language, minimize='', ready=''):
     """
     Entering data according autotype sequence at website
 
     :param selected_system: parameters of the selected system
     :param language: language entered with command and not take from selected_system
     :param minimize: switch from current window to browser with opened url
+    :param ready: readiness check waited for by {DELAY n} items, see autotype.parse_readiness()
     :return: None
     """
+    backend = autotype.get_backend()
+    program = autotype.compile_sequence(selected_system.autotype)
 
     if minimize:
-        pyautogui.hotkey('alt', 'tab')
-
-    key_strokes = re.findall(r'{(.+?)}', selected_system.autotype)
-
-    for item in key_strokes:
-        if item == 'USER':
-            pyautogui.write(str(selected_system.user))
-        elif item == 'PASS':
-            pyautogui.write(str(selected_system.password))
-        elif item == 'CLIENT':
-            pyautogui.write(str(selected_system.client))
-        elif item == 'LANG':
-            pyautogui.write(str(language if language else selected_system.language))
-        elif 'DELAY' in item:
-            time2wait = int(re.findall(r'\d{1,10}', item)[0])
-            countdown(time2wait, 'Waiting for web site to load')
-        else:  # ENTER, TAB, SPACE and other
-            pyautogui.press(item)
+        backend.hotkey('alt', 'tab')
+
+    fields = selected_system._asdict()
+    if language:
+        fields['language'] = language
+    autotype.execute(program, fields, backend, ready=autotype.readiness(ready, backend), wait=wait_for_site)
+
+
+def clear_later(action, seconds) -> bool:
+    """
+    Hand clearing of clipboard or screen ('clipboard', 'screen') to background agent, see sap.agent.
+    :return: False if agent is not available: caller clears itself
+    """
+    try:
+        agent.schedule(config_folder(), action, seconds)
+    except OSError:
+        return False
+    return True
 
 
 def countdown(seconds, message):
@@ -656,11 +709,21 @@ def countdown(seconds, message):
         time.sleep(1)  # Simulate work being done
 
 
+# Messages are printed to stderr, see messages_to_stderr()
+_messages_to_stderr = False
+
+
+def messages_to_stderr(enabled: bool):
+    """ Print messages to stderr: stdout of the command is data stream, e.g. 'sap export' """
+    global _messages_to_stderr
+    _messages_to_stderr = enabled
+
+
 def print_message(message, message_type):
     border_style = STYLE_ERRORS_PANEL_BORDER
     title_align = ALIGN_ERRORS_PANEL
 
-    console = Console()
+    console = Console(stderr=_messages_to_stderr)
 
     if message_type == message_type_error:
         border_style = STYLE_ERRORS_PANEL_BORDER
@@ -685,6 +748,8 @@ def print_message(message, message_type):
 
 
 def print_markdown(markdown):
+    from rich.markdown import Markdown  # Heavy import (markdown_it). Only 'config' and 'debug' need it
+
     console = Console()
     md = Markdown(markdown)
     console.print(md)
@@ -722,11 +787,23 @@ def list_of_browsers():
 
 
 def open_sap(argument):
-    pop = Popen(argument)
-    pop.wait()
-
-    if pop.returncode:
-        click.echo(pop.returncode)
+    """ Start sapshcut.exe and return without waiting for it. Failure is reported by the next launch """
+    system = re.search(r' -system=(\S+) -client=(\S+)', argument)
+    start_program(argument, f"{system.group(1)} {system.group(2)}" if system else '')
+
+
+def start_program(command, title=''):
+    """ Start program by launcher of the process (see sap.launcher). Failures of previous launches are printed """
+    launcher = get_launcher(config_folder())
+    for failure in launcher.failures():
+        result = failure.error if failure.error else f"exit code {failure.returncode}"
+        print_message(f"Previous launch of {failure.title or failure.program} failed at {failure.finished}: {result}",
+                      message_type_warning)
+    try:
+        launcher.start(command, title)
+    except OSError as err:
+        print_message(f"Failed to launch {title or command_args(command)[0]}: {err}", message_type_error)
+        raise click.Abort
 
 
 def check_if_path_exists(path2file: Path):
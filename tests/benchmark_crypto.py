@@ -0,0 +1,71 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+"""
+Micro-benchmark: cost of one password decryption
+1. RSA with private key parsed on every call
+2. RSA with cached private key
+3. RSA with Crypto.decrypt_many (process pool, one process per CPU)
+4. RSA with Crypto.decrypt_many batch by batch: new process pool per batch and one pool in process_pool() block
+5. Envelope encryption (AES-GCM with cached data key)
+Run: python tests/benchmark_crypto.py [rows] [batch]
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from sap import crypto
+from sap.crypto import Crypto
+
+
+def benchmark(rows, batch):
+    with tempfile.TemporaryDirectory() as folder:
+        keys = Crypto(Path(folder) / 'public_key.txt', Path(folder) / 'private_key.txt')
+        keys.generate_keys()
+        keys.data_key_path.unlink()
+        rsa_passwords = [keys.encrypto(str.encode(f'password{index}')) for index in range(rows)]
+        keys.generate_data_key()
+        envelope_passwords = [keys.encrypto(str.encode(f'password{index}')) for index in range(rows)]
+
+        def decrypt_without_cache():
+            for password in rsa_passwords:
+                crypto.forget_key(keys.private_key_path)
+                keys.decrypto(password)
+
+        def decrypt_with_cache():
+            for password in rsa_passwords:
+                keys.decrypto(password)
+
+        def decrypt_many():
+            keys.decrypt_many(rsa_passwords)
+
+        batches = [rsa_passwords[index:index + batch] for index in range(0, rows, batch)]
+
+        def decrypt_batches_pool_per_batch():
+            for passwords in batches:
+                keys.decrypt_many(passwords, workers=2)
+
+        def decrypt_batches_shared_pool():
+            with keys.process_pool(workers=2):
+                for passwords in batches:
+                    keys.decrypt_many(passwords)
+
+        def decrypt_envelope():
+            for password in envelope_passwords:
+                keys.decrypto(password)
+
+        for name, function in (('RSA, key parsed per row', decrypt_without_cache),
+                               ('RSA, cached key', decrypt_with_cache),
+                               ('RSA, decrypt_many', decrypt_many),
+                               ('RSA, pool per batch', decrypt_batches_pool_per_batch),
+                               ('RSA, shared pool', decrypt_batches_shared_pool),
+                               ('envelope', decrypt_envelope)):
+            seconds = min(timeit.repeat(function, number=1, repeat=3))
+            print(f"{name:>24}: {seconds / rows * 1000:.3f} ms per row, {rows} rows in {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 100)
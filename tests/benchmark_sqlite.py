@@ -0,0 +1,58 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+"""
+Micro-benchmark: latency of database operations for every SQLite profile of sap_config.ini (db_profile)
+1. write: 'sap add' of one system, every add in its own transaction
+2. update: 'sap update' of one system
+3. read: 'sap list XXX' by exact system id and client
+4. search: 'sap list' with part of description
+Run: python tests/benchmark_sqlite.py [rows]
+Results depend on disk: run it on the disk where database is stored
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sap.api import Sap_system, SQLITE_PROFILES
+from sap.database import SapDB, dispose_engines
+
+
+def measure(function, items):
+    """ Median latency of function in milliseconds """
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        function(item)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def benchmark(rows):
+    systems = [Sap_system(system=f'S{index // 1000:02d}', client=str(index % 1000).zfill(3), user='USER',
+                          password=b'password', language='EN', customer='CUSTOMER', description=f'System {index}',
+                          url='', autotype='', only_web='no') for index in range(rows)]
+
+    print(f"{'profile':>12} {'write':>10} {'update':>10} {'read':>10} {'search':>10}   (median ms, {rows} rows)")
+    for profile, pragmas in SQLITE_PROFILES.items():
+        with tempfile.TemporaryDirectory() as folder:
+            database = SapDB(db_path=Path(folder) / 'database.db', pragmas=pragmas)
+            database.create()
+
+            write = measure(database.add, systems)
+            update = measure(database.update, [system._replace(description='Updated') for system in systems])
+            read = measure(database.query_system, systems)
+            search = measure(database.query_system,
+                             [Sap_system(None, description=f'{index}') for index in range(0, rows, 10)])
+
+            print(f"{profile:>12} {write:>10.3f} {update:>10.3f} {read:>10.3f} {search:>10.3f}")
+            database.stop_sap_db()
+            dispose_engines()
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -9,11 +9,12 @@ import pytest
 from click.testing import CliRunner
 
 from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, CONFIG_NAME, DATABASE_NAME, DEBUG_FILE_NAME
-from sap.api import COMMAND_LINE_NAME, SAPLOGON_NAME, TEXT_FILE_NAME
+from sap.api import COMMAND_LINE_NAME, SAPLOGON_NAME, TEXT_FILE_NAME, Sap_system, Parameter
 from sap.cli import sap_cli
 from sap.config import Config
 from sap.crypto import Crypto
 from sap.backup import Backup
+from sap.database import SapDB, dispose_engines
 
 
 @pytest.fixture(scope='session')
@@ -40,6 +41,7 @@ def temp_start_cli(tmpdir_factory, runner):
     debug_file = Path(test_path / DEBUG_FILE_NAME)
     if debug_file.exists():
         debug_file.unlink()
+    dispose_engines()  # Pooled connections keep database file opened
     Path(test_path / DATABASE_NAME).unlink()
 
 
@@ -98,7 +100,24 @@ def temp_backup_cli(runner, tmp_path):
                            args=['--config_path', tmp_path, "backup", "-password", "12345678", "-skip_message"])
     yield result
     Path(result.output.strip()).unlink()
+    dispose_engines()  # Pooled connections keep database file opened
     Path(tmp_path / DATABASE_NAME).unlink()
     Path(tmp_path / CONFIG_NAME).unlink()
     Path(tmp_path / PUBLIC_KEY_NAME).unlink()
     Path(tmp_path / PRIVATE_KEY_NAME).unlink()
+
+
+@pytest.fixture
+def temp_db_files(tmp_path):
+    """ Config, encryption keys and database with one system (password '12345678') and one parameter """
+    cfg = Config(config_path=tmp_path)
+    cfg.create()
+    crypto = Crypto(cfg.public_key_path, cfg.private_key_path)
+    crypto.generate_keys()
+    database = SapDB(db_path=cfg.db_path)
+    database.create()
+    database.add(Sap_system(system='XXX', client='100', user='USER', password=crypto.encrypto(str.encode('12345678')),
+                            language='EN', customer='Test', description='Dev', url='', autotype='', only_web='no'))
+    database.add_param(Parameter(transaction='SM30', parameter='VIEWNAME'))
+    database.stop_sap_db()
+    return tmp_path
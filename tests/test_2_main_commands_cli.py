@@ -15,6 +15,8 @@ from conftest_utilities import flat_actual, flat_expected, stub_print_system_lis
 from conftest_utilities import stub_launch
 from sap.api import DEBUG_FILE_NAME, CONFIG_NAME, PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATABASE_NAME
 from sap.cli import sap_cli
+from sap.config import Config
+from sap.database import SapDB
 from sap import Sap_system
 import sap.utilities
 
@@ -362,6 +364,38 @@ def test_list_no_existing_systems_cli(runner, temp_start_cli, mocker):
     assert flat_actual(result.output) == flat_expected(non_existing_system)
 
 
+def test_list_pages(runner, temp_db_files):
+    """ Key of the last system is printed under the page if there is the next one and is used to print it """
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', '--limit', '1'])
+    assert 'Next page' not in result.output
+
+    database = SapDB(db_path=Config(temp_db_files).read().db_path)
+    database.make_session()
+    database.add(Sap_system(system='YYY', client='100', user='USER', password=None, language='EN', customer='Test',
+                            description='Dev', url='', autotype='', only_web='no'))
+    database.stop_sap_db()
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', '--limit', '1'])
+    assert 'Next page: --after "Test,XXX,100,USER"' in result.output
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', '--limit', '1',
+                                          '--after', 'Test,XXX,100,USER'])
+    assert 'YYY' in result.output and 'Next page' not in result.output
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', '--after', 'Test,YYY,100,USER'])
+    assert 'NOTHING FOUND' in result.output
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', 'xxx', '--count'])
+    assert result.output.endswith('Systems found: 1\n')
+
+
+def test_list_does_not_decrypt_passwords(runner, temp_db_files, mocker):
+    """ Passwords are decrypted only if they are displayed """
+    decrypto = mocker.patch('sap.crypto.Crypto.decrypto', return_value='12345678')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list'])
+    assert decrypto.call_count == 0
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', '-v'])
+    assert decrypto.call_count == 1
+    assert '12345678' in result.output
+
+
 def test_pw_no_clipboard_clear_cli(runner, temp_start_cli):
     """
     Test PW command: copying password into clipboard. For this test we do not clear clipboard.
@@ -383,6 +417,7 @@ def test_pw_clipboard_clear_cli(runner, temp_start_cli, mocker):
     mocker.patch.object(sap.utilities, 'print_system_list', new=stub_print_system_list)
     mocker.patch.object(sap.utilities, 'print_message', return_value=True)
     mocker.patch.object(sap.utilities, 'countdown', return_value=True)
+    mocker.patch.object(sap.utilities, 'clear_later', return_value=False)
 
     result = runner.invoke(sap_cli,
                            args=["--config_path", temp_start_cli, "copy", "password", sap_system_3.system, "--clear",
@@ -543,6 +578,37 @@ def test_run_existing_system_with_transaction_and_parameter_show_log_cli(runner,
         f'"path to sapshcut.exe file." -system={sap_system_2.system} -client={sap_system_2.client} -user={sap_system_2.user} -pw={sap_system_2.password} -language=RU -maxgui -type=transaction -command="*{transaction_code} VIEWNAME={view_name};" -reuse=1')
 
 
+def test_run_with_parameter_starts_database_once(runner, temp_db_files, mocker):
+    """ 'run -t -p': systems and transaction parameters are queried in one session """
+    mocker.patch.object(sap.utilities, 'check_if_path_exists')
+    mocker.patch.object(sap.utilities, 'open_sap')
+    param_fields = mocker.spy(sap, 'param_fields')
+    start_sap_db = mocker.spy(sap, 'start_sap_db')
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'run', 'XXX', '100', '-t', 'SM30', '-p',
+                                          'V_T001'])
+    assert result.exit_code == 0, result.output
+    assert param_fields.call_count == 1
+    assert start_sap_db.call_count == 1
+
+
+def test_run_with_parameter_of_exact_transaction(runner, temp_db_files, mocker):
+    """ Parameters of 'VA01N' are not used for 'VA01', 'parlist' still finds transactions by part of name """
+    mocker.patch.object(sap.utilities, 'check_if_path_exists')
+    open_sap = mocker.patch.object(sap.utilities, 'open_sap')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'paradd', 'VA01N', 'VBAK-VBELN'])
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'run', 'XXX', '100', '-t', 'va01', '-p',
+                                          '1000'])
+    assert 'There is no parameter info for VA01 transaction' in result.output
+    assert open_sap.call_args.args[0].endswith('-command="VA01" -reuse=1')
+
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'run', 'XXX', '100', '-t', 'va01n', '-p', '1000'])
+    assert '-command="*VA01N VBAK-VBELN=1000;"' in open_sap.call_args.args[0]
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'parlist', 'va01'])
+    assert 'VA01N' in result.output
+
+
 def test_run_existing_system_with_system_command_cli(runner, temp_start_cli, mocker):
     """
     Test RUN command: request specific system
@@ -0,0 +1,94 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Background agent clearing clipboard and screen Tests """
+
+import sys
+import threading
+import time
+
+import pytest
+
+import sap.utilities
+from sap import agent
+from sap.agent import ClearAgent
+from sap.cli import sap_cli
+
+
+@pytest.fixture
+def running_agent(tmp_path):
+    """ Agent with fake actions served by thread """
+    done = {'clipboard': [], 'screen': []}
+    clear_agent = ClearAgent(agent.agent_file_path(tmp_path),
+                             {action: (lambda action=action: done[action].append(time.monotonic()))
+                              for action in done})
+    thread = threading.Thread(target=clear_agent.serve, args=([('clipboard', 0.5)],), daemon=True)
+    thread.start()
+    finish = time.monotonic() + 5
+    while not clear_agent.info_path.exists() and time.monotonic() < finish:
+        time.sleep(0.01)
+    yield clear_agent, done, thread
+    thread.join(5)
+
+
+def test_requests_are_coalesced(tmp_path, running_agent):
+    """ Second request of the same action moves the timer: action is done once, agent exits when it is idle """
+    clear_agent, done, thread = running_agent
+    started = time.monotonic()
+    assert agent._send(clear_agent.info_path, ('schedule', 'clipboard', 1))
+    assert agent._send(clear_agent.info_path, ('schedule', 'screen', 0.2))
+
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(done['clipboard']) == 1 and done['clipboard'][0] - started >= 1
+    assert len(done['screen']) == 1 and done['screen'][0] < done['clipboard'][0]
+    assert not clear_agent.info_path.exists()
+    assert not agent._send(clear_agent.info_path, ('schedule', 'clipboard', 1))
+
+
+def test_finishing_agent_keeps_file_of_new_agent(tmp_path):
+    """ Agent started while the old one is finishing stays reachable """
+    info_path = agent.agent_file_path(tmp_path)
+    actions = {'clipboard': lambda: None, 'screen': lambda: None}
+    old_agent, new_agent = ClearAgent(info_path, actions), ClearAgent(info_path, actions)
+    assert old_agent.address != new_agent.address
+
+    old_thread = threading.Thread(target=old_agent.serve, args=([('clipboard', 0.5)],), daemon=True)
+    old_thread.start()
+    time.sleep(0.2)
+    new_thread = threading.Thread(target=new_agent.serve, args=([('clipboard', 1.5)],), daemon=True)
+    new_thread.start()
+
+    old_thread.join(5)
+    assert info_path.exists()
+    assert agent._send(info_path, ('schedule', 'screen', 0))
+    new_thread.join(5)
+    assert not info_path.exists()
+
+
+def test_agent_is_started_once(tmp_path, mocker):
+    """ Running agent gets request, otherwise new agent is started """
+    popen = mocker.patch('sap.agent.subprocess.Popen')
+    send = mocker.patch('sap.agent._send', return_value=True)
+
+    agent.schedule(tmp_path, 'clipboard', 10)
+    popen.assert_called_once()
+    assert popen.call_args.args[0] == [sys.executable, agent.__file__]
+
+    agent.agent_file_path(tmp_path).touch()
+    agent.schedule(tmp_path, 'screen', 10)
+    send.assert_called_once_with(agent.agent_file_path(tmp_path), ('schedule', 'screen', 10))
+    popen.assert_called_once()
+
+
+def test_copy_does_not_wait(runner, temp_db_files, mocker):
+    """ Command returns at once, clipboard is cleared by agent """
+    schedule = mocker.patch('sap.agent.schedule')
+    mocker.patch('sap.commands.clipboard.pyperclip.copy')
+    countdown = mocker.patch.object(sap.utilities, 'countdown')
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'copy', 'password', 'xxx'])
+    assert result.exit_code == 0, result.output
+    assert schedule.call_args.args == (temp_db_files, 'clipboard', 10)
+    countdown.assert_not_called()
@@ -0,0 +1,113 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Autotype engine of web logins Tests """
+
+import time
+
+import pytest
+
+import sap.utilities
+from sap import autotype
+from sap.api import Sap_system
+from sap.autotype import Step, InputBackend
+from sap.cli import sap_cli
+from sap.exceptions import FailedRequirements
+
+
+class FakeBackend(InputBackend):
+    """ Records typed keys. Title of window becomes 'SAP Logon' after 'ready_after' seconds """
+
+    def __init__(self, ready_after=0.0):
+        self.typed = []
+        self.ready_at = time.monotonic() + ready_after
+
+    def write(self, text):
+        self.typed.append(text)
+
+    def press(self, key, presses=1):
+        self.typed.extend([key] * presses)
+
+    def hotkey(self, *keys):
+        self.typed.append('+'.join(keys))
+
+    def window_title(self):
+        return 'SAP Logon - Browser' if time.monotonic() >= self.ready_at else 'Loading...'
+
+    def pixel(self, x, y):
+        return (255, 255, 255) if time.monotonic() >= self.ready_at else (0, 0, 0)
+
+
+@pytest.fixture
+def fake_backend():
+    backend = FakeBackend(ready_after=0.3)
+    autotype.set_backend(backend)
+    yield backend
+    autotype.set_backend(None)
+
+
+def test_compile_sequence():
+    """ Program is compiled once and reused """
+    autotype.compile_sequence.cache_clear()
+    program = autotype.compile_sequence('{USER}{TAB 2}{PASS}{DELAY 5}{SYSTEM}{ENTER}')
+    assert program == (Step('write', 'user'), Step('press', ('tab', 2)), Step('write', 'password'),
+                       Step('wait', 5), Step('write', 'system'), Step('press', ('enter', 1)))
+    assert autotype.compile_sequence('{USER}{TAB 2}{PASS}{DELAY 5}{SYSTEM}{ENTER}') is program
+    assert autotype.compile_sequence.cache_info().hits == 1
+
+    with pytest.raises(ValueError, match='USERNAME'):
+        autotype.compile_sequence('{USER}{USERNAME}')
+    with pytest.raises(FailedRequirements):
+        sap.utilities.AUTOTYPE.convert('{USER}{TAB}x', None, None)
+
+
+def test_wait_ends_when_ready(fake_backend):
+    """ {DELAY 5} ends as soon as window is ready, without check it lasts full time """
+    program = autotype.compile_sequence('{USER}{DELAY 5}{PASS}{ENTER}')
+    started = time.monotonic()
+    autotype.execute(program, {'user': 'USER', 'password': 'secret'},
+                     ready=autotype.readiness('title:sap logon'))
+    assert 0.2 < time.monotonic() - started < 2
+    assert fake_backend.typed == ['USER', 'secret', 'enter']
+
+    assert autotype.wait_until(autotype.readiness('pixel:10,10,FFFFFF'), 5)
+    assert not autotype.wait_until(lambda: False, 0.3)
+
+
+def test_delay_of_autotype_sequence(fake_backend, mocker):
+    """ {DELAY n} waits for readiness check, without check it counts down n seconds """
+    countdown = mocker.patch.object(sap.utilities, 'countdown')
+    system = Sap_system('XXX', '100', 'USER', 'secret', 'EN', 'Test', 'Dev', 'www.sap.com',
+                        '{USER}{DELAY 2}{TAB}{PASS}{ENTER}', 'no')
+    sap.utilities.launch_autotype_sequence(system, '')
+    countdown.assert_called_once_with(2, 'Waiting for web site to load')
+    assert fake_backend.typed == ['USER', 'tab', 'secret', 'enter']
+
+    fake_backend.typed.clear()
+    started = time.monotonic()
+    sap.utilities.launch_autotype_sequence(system, '', ready='title:SAP Logon')
+    assert time.monotonic() - started < 2
+    assert countdown.call_count == 1
+    assert fake_backend.typed == ['USER', 'tab', 'secret', 'enter']
+
+
+def test_readiness_check():
+    assert autotype.parse_readiness('pixel: 1, 2, #00ff7F') == ('pixel', (1, 2, (0, 255, 127)))
+    for spec in ('title:', 'title:(', 'pixel:1,2', 'window:SAP'):
+        with pytest.raises(ValueError):
+            autotype.parse_readiness(spec)
+
+
+def test_login_with_readiness_check(runner, temp_db_files, fake_backend):
+    """ Login does not wait full timeout when web site is ready """
+    file = temp_db_files / 'systems.csv'
+    file.write_text('customer,system,client,user,password,url,autotype\n'
+                    'Test,WWW,100,USER,secret,www.sap.com,{USER}{TAB}{PASS}{ENTER}\n', encoding='utf-8')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    started = time.monotonic()
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'login', 'www', '-time', '10',
+                                          '--ready', 'title:SAP Logon'])
+    assert result.exit_code == 0, result.output
+    assert time.monotonic() - started < 5
+    assert fake_backend.typed == ['alt+tab', 'USER', 'tab', 'secret', 'enter']
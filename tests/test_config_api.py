@@ -5,10 +5,13 @@
 """ Configuration file Tests """
 
 from pathlib import Path
+import json
+import pickle
 import pytest
 
-from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATABASE_NAME
+from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATABASE_NAME, SQLITE_PROFILES
 from sap.config import Config
+from sap.exceptions import ConfigWrongValue
 
 
 def test_config_create(config_tmp_path):
@@ -48,3 +51,94 @@ def test_read_default_config(config_default_path, tmp_path):
                    info.command_line_path == Path('path to sapshcut.exe file.')) and (
                    info.saplogon_path == Path('path to saplogon.exe file.')) and (
                    info.language == 'EN')
+
+
+def test_config_cache_is_written(config_default_path):
+    """ Config cache is created after first reading and used by next one """
+    info = config_default_path.read()
+    assert config_default_path.config_cache_path.exists()
+    assert Config(config_default_path.config_path).read() == info
+
+
+def test_config_cache_is_not_parsed_again(config_default_path, mocker):
+    config_default_path.read()
+    parse = mocker.spy(Config, '_parse')
+    Config(config_default_path.config_path).read()
+    assert parse.call_count == 0
+
+
+def test_config_cache_changed_config(config_default_path):
+    """ Cache is not used after config file is changed """
+    config_default_path.read()
+    text = config_default_path.config_file_path.read_text(encoding='utf-8')
+    config_default_path.config_file_path.write_text(text.replace('db_type = sqlite', 'db_type = sqlite3'),
+                                                    encoding='utf-8')
+    assert Config(config_default_path.config_path).read().db_type == 'sqlite3'
+
+
+def test_config_without_cache(config_default_path):
+    """ Flag --no-config-cache: config file is parsed and cache is not written """
+    config_default_path.read(use_cache=False)
+    assert not config_default_path.config_cache_path.exists()
+
+
+def test_config_broken_cache(config_default_path):
+    """ Broken cache file is ignored """
+    config_default_path.config_cache_path.write_bytes(b'broken')
+    assert config_default_path.read().db_type == 'sqlite'
+
+
+def test_config_cache_is_json(config_default_path):
+    """ Cache is plain JSON: pickle cache of older version is ignored """
+    info = config_default_path.read()
+    assert json.loads(config_default_path.config_cache_path.read_text(encoding='utf-8'))['config']['db_path'] == \
+           str(info.db_path)
+
+    config_default_path.config_cache_path.write_bytes(pickle.dumps(((3, 0, 0), tuple(info))))
+    assert Config(config_default_path.config_path).read() == info
+
+
+def test_config_str_path(tmp_path):
+    """ Config path can be passed as string """
+    assert Config(str(tmp_path)).config_file_path == tmp_path / 'sap_config.ini'
+
+
+def replace_in_config(cfg, old, new):
+    text = cfg.config_file_path.read_text(encoding='utf-8')
+    cfg.config_file_path.write_text(text.replace(old, new), encoding='utf-8')
+
+
+def test_database_profile_default(config_default_path):
+    """ New config file uses 'balanced' SQLite profile """
+    info = config_default_path.read()
+    assert info.db_profile == 'balanced'
+    assert info.db_pragmas == SQLITE_PROFILES['balanced']
+
+
+def test_database_profile_with_pragma(config_default_path):
+    """ Pragma set in config file replaces value of the profile """
+    replace_in_config(config_default_path, 'db_profile = balanced', 'db_profile = fast\nsynchronous = normal')
+    info = config_default_path.read()
+    assert info.db_pragmas == {**SQLITE_PROFILES['fast'], 'synchronous': 'NORMAL'}
+
+
+def test_database_immutable(config_default_path):
+    assert config_default_path.read().db_immutable is False
+    replace_in_config(config_default_path, 'db_immutable = no', 'db_immutable = yes')
+    assert config_default_path.read().db_immutable is True
+
+
+def test_database_profile_old_config(config_default_path):
+    """ Config file created before profiles keeps SQLite defaults """
+    replace_in_config(config_default_path, 'db_profile = balanced', '')
+    assert config_default_path.read().db_pragmas == SQLITE_PROFILES['compatible']
+
+
+@pytest.mark.parametrize('old, new', [('db_profile = balanced', 'db_profile = turbo'),
+                                      ('db_profile = balanced', 'db_profile = balanced\njournal_mode = wall'),
+                                      ('db_profile = balanced', 'db_profile = balanced\nmmap_size = 1GB'),
+                                      ('db_immutable = no', 'db_immutable = maybe')])
+def test_database_profile_wrong_value(config_default_path, old, new):
+    replace_in_config(config_default_path, old, new)
+    with pytest.raises(ConfigWrongValue):
+        config_default_path.read()
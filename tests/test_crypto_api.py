@@ -4,6 +4,11 @@
 
 """ Encryption system Tests """
 
+from cryptography.hazmat.primitives import serialization
+
+import sap.crypto
+from sap.api import LazyPassword
+
 
 def test_create_crypto_files(temp_crypto):
     """ Test if encryption keys are created"""
@@ -18,3 +23,103 @@ def test_encrypt(temp_crypto):
     encrypted_password = temp_crypto.encrypto(str.encode(password))
     decrypted_password = temp_crypto.decrypto(encrypted_password)
     assert decrypted_password == password
+
+
+def test_lazy_password(temp_crypto, mocker):
+    """ Password is decrypted only on first access """
+    temp_crypto.generate_keys()
+    decrypto = mocker.spy(temp_crypto, 'decrypto')
+    password = LazyPassword(temp_crypto.encrypto(str.encode('12345')), temp_crypto.decrypto)
+    assert decrypto.call_count == 0
+    assert str(password) == '12345' and f"{password}" == '12345'
+    assert decrypto.call_count == 1
+
+
+def test_private_key_is_loaded_once(temp_crypto, mocker):
+    """ Private key file is parsed once for many RSA decryptions """
+    temp_crypto.generate_keys()
+    temp_crypto.data_key_path.unlink()
+    encrypted_password = temp_crypto.encrypto(str.encode('12345'))
+    load_pem_private_key = mocker.spy(serialization, 'load_pem_private_key')
+    for _ in range(3):
+        assert temp_crypto.decrypto(encrypted_password) == '12345'
+    assert load_pem_private_key.call_count == 1
+
+
+def test_changed_keys_are_loaded_again(temp_crypto):
+    """ New keys are used after keys are generated again """
+    temp_crypto.generate_keys()
+    temp_crypto.encrypto(str.encode('12345'))
+    temp_crypto.remove_keys()
+    temp_crypto.generate_keys()
+    assert temp_crypto.decrypto(temp_crypto.encrypto(str.encode('54321'))) == '54321'
+
+
+def test_envelope_encrypt(temp_crypto):
+    """ Passwords are stored in envelope format after keys are generated """
+    temp_crypto.generate_keys()
+    encrypted_password = temp_crypto.encrypto(str.encode('12345'))
+    assert temp_crypto.is_envelope(encrypted_password)
+    assert temp_crypto.decrypto(encrypted_password) == '12345'
+
+
+def test_rsa_password_is_decrypted_with_data_key(temp_crypto):
+    """ Passwords encrypted before data key was created are still decrypted """
+    temp_crypto.generate_keys()
+    temp_crypto.data_key_path.unlink()
+    encrypted_password = temp_crypto.encrypto(str.encode('12345'))
+    assert not temp_crypto.is_envelope(encrypted_password)
+    temp_crypto.generate_data_key()
+    assert temp_crypto.decrypto(encrypted_password) == '12345'
+
+
+def test_decrypt_many(temp_crypto, mocker):
+    """ RSA and envelope passwords are decrypted by process pool in the same order """
+    mocker.patch.object(sap.crypto, 'PARALLEL_MIN_PASSWORDS', 2)
+    temp_crypto.generate_keys()
+    temp_crypto.data_key_path.unlink()
+    encrypted_passwords = [temp_crypto.encrypto(str.encode(f'rsa{index}')) for index in range(5)]
+    temp_crypto.generate_data_key()
+    encrypted_passwords.insert(2, temp_crypto.encrypto(str.encode('envelope')))
+    assert temp_crypto.decrypt_many(iter(encrypted_passwords), workers=2) == [
+        'rsa0', 'rsa1', 'envelope', 'rsa2', 'rsa3', 'rsa4']
+
+
+
+def test_process_pool_is_shared_by_batches(temp_crypto, mocker):
+    """ Batches inside process_pool() block are decrypted by one pool, small batches - in the current process """
+    mocker.patch.object(sap.crypto, 'PARALLEL_MIN_PASSWORDS', 2)
+    pool = mocker.patch('sap.crypto.ProcessPoolExecutor', wraps=sap.crypto.ProcessPoolExecutor)
+    temp_crypto.generate_keys()
+    temp_crypto.data_key_path.unlink()
+    encrypted_passwords = [temp_crypto.encrypto(str.encode(f'rsa{index}')) for index in range(5)]
+    with temp_crypto.process_pool(workers=2):
+        assert temp_crypto.decrypt_many(encrypted_passwords[:2]) == ['rsa0', 'rsa1']
+        assert temp_crypto.decrypt_many(encrypted_passwords[2:4]) == ['rsa2', 'rsa3']
+        assert temp_crypto.decrypt_many(encrypted_passwords[4:]) == ['rsa4']
+    assert pool.call_count == 1
+    # Outside the block every call starts its own pool
+    assert temp_crypto.decrypt_many(encrypted_passwords[:2], workers=2) == ['rsa0', 'rsa1']
+    assert pool.call_count == 2
+
+def test_lazy_passwords_decrypt_all(temp_crypto, mocker):
+    """ Passwords are decrypted by one call, already decrypted passwords are skipped """
+    temp_crypto.generate_keys()
+    passwords = [LazyPassword(temp_crypto.encrypto(str.encode(f'{index}')), temp_crypto.decrypto) for index in
+                 range(3)]
+    str(passwords[0])
+    decrypt_many = mocker.spy(temp_crypto, 'decrypt_many')
+    LazyPassword.decrypt_all(passwords, temp_crypto.decrypt_many)
+    assert decrypt_many.call_count == 1
+    assert len(decrypt_many.call_args.args[0]) == 2
+    assert [str(item) for item in passwords] == ['0', '1', '2']
+
+
+def test_lazy_password_hash_matches_equality(temp_crypto):
+    """ Passwords equal as text have equal hashes """
+    temp_crypto.generate_keys()
+    first, second = (LazyPassword(temp_crypto.encrypto(str.encode('12345')), temp_crypto.decrypto) for _ in range(2))
+    assert first.encrypted != second.encrypted
+    assert first == second == '12345'
+    assert hash(first) == hash(second) == hash('12345')
+    assert len({first, second, '12345'}) == 1
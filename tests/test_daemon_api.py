@@ -0,0 +1,92 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Daemon Tests """
+
+import threading
+import time
+
+import pytest
+
+import sap
+from sap.api import Sap_system, Parameter, DAEMON_FILE_NAME
+from sap.config import Config
+from sap.daemon import SapDaemon, connect
+from sap.exceptions import DaemonError
+
+PASSWORD = '12345678'
+
+
+@pytest.fixture
+def daemon_client(temp_db_files):
+    """ Daemon running in a thread """
+    thread = threading.Thread(target=SapDaemon(temp_db_files).serve, daemon=True)
+    thread.start()
+
+    client = None
+    for _ in range(100):
+        client = connect(temp_db_files)
+        if client:
+            break
+        time.sleep(0.05)
+    yield client
+    if connect(temp_db_files):
+        client.stop()
+    thread.join(timeout=5)
+
+
+def test_no_daemon(tmp_path):
+    """ Without daemon commands work as usual """
+    assert connect(tmp_path) is None
+
+
+def test_daemon_query_system(daemon_client):
+    """ Passwords are returned encrypted and are decrypted by daemon """
+    result = daemon_client.query_system(Sap_system(system='XXX'))
+    assert isinstance(result[0][3], bytes)
+    assert [daemon_client.decrypt(Sap_system(*item).password) for item in result] == [PASSWORD]
+
+
+def test_daemon_query_results_are_cached_encrypted(daemon_client):
+    """ Query results cache keeps passwords encrypted. Results are cached while database data is not changed """
+    sap.start_sap_daemon(daemon_client)
+    try:
+        before = sap.cache_info()
+        first = sap.query_system(Sap_system(system='XXX'))
+        assert sap.query_system(Sap_system(system='XXX')) == first
+        assert sap.cache_info().hits - before.hits == 1
+        assert isinstance(first[0][3], bytes)
+    finally:
+        sap.cache_clear()
+
+
+def test_daemon_count_system(daemon_client):
+    assert daemon_client.count_system(Sap_system(system='XXX')) == 1
+    assert daemon_client.query_system(Sap_system(system='XXX'), after=('Test', 'XXX', '100', 'USER'), limit=1) == []
+
+
+def test_daemon_query_param(daemon_client):
+    result = daemon_client.query_param(Parameter(transaction='SM30'))
+    assert result == [('SM30', 'VIEWNAME')]
+    assert daemon_client.get_param('SM30') == 'VIEWNAME'
+    assert daemon_client.get_param('SM3') is None
+
+
+def test_daemon_config(daemon_client, temp_db_files):
+    assert daemon_client.config().db_path == Config(config_path=temp_db_files).db_path
+
+
+def test_daemon_unknown_command(daemon_client):
+    with pytest.raises(DaemonError):
+        daemon_client.request('unknown')
+
+
+def test_daemon_stop(daemon_client, temp_db_files):
+    """ Daemon file is removed after stop """
+    daemon_client.stop()
+    for _ in range(100):
+        if not (temp_db_files / DAEMON_FILE_NAME).exists():
+            break
+        time.sleep(0.05)
+    assert connect(temp_db_files) is None
@@ -6,10 +6,17 @@
 
 import pytest
 from pathlib import Path
-from sap.database import SapDB
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
+import sap
+from sap.database import SapDB, Base, dispose_engine, database_exists
+from sap.exceptions import DatabaseOutdated
+from sap.migrations import LATEST_VERSION
 from sap.api import Sap_system
+from sap.cli import sap_cli
+from sap.config import Config
 from sap.crypto import Crypto
-from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATABASE_NAME
+from sap.api import PUBLIC_KEY_NAME, PRIVATE_KEY_NAME, DATABASE_NAME, SQLITE_PROFILES
 
 
 @pytest.fixture
@@ -77,3 +84,231 @@ def test_drop_database(database):
     database.create()
     database.drop()
     assert database.database_path.is_file() is False
+
+
+def test_search_index_is_created(db):
+    """ Search index is created with database """
+    assert db.search_index is True
+
+
+def test_search_by_index(db, added_record):
+    """ Substring search of system, customer and description uses search index """
+    assert [item[0] for item in db.query_system(Sap_system(system='XXX', customer='tes', description='dev'))] == [
+        'XXX']
+    assert db.query_system(Sap_system(system='XXX', description='prod')) == []
+
+
+def test_search_short_values(db, added_record):
+    """ Values shorter than 3 characters and wildcards are searched without index """
+    assert len(db.query_system(Sap_system(system='X', client='1_1', user='%'))) == 1
+
+
+def test_search_index_after_update_and_delete(db, added_record, crypto):
+    """ Search index is kept in sync by triggers """
+    db.update(Sap_system(system='XXX', client='111', user='rygor', password=crypto.encrypto(str.encode('123')),
+                         customer='Other', description='Production', url=''))
+    assert db.query_system(Sap_system(system='XXX', description='Dev')) == []
+    assert len(db.query_system(Sap_system(system='XXX', description='Product'))) == 1
+
+    db.delete(Sap_system(system='XXX', client='111', user='rygor'))
+    assert db.query_system(Sap_system(system='XXX', description='Product')) == []
+    check_search_index(db)
+
+
+def check_search_index(database):
+    """ Search index matches rows of its table, otherwise check fails with 'database disk image is malformed' """
+    for search_table in ('sap_search', 'parameters_search'):
+        database.session.execute(
+            text(f"INSERT INTO {search_table} ({search_table}, rank) VALUES ('integrity-check', 1)"))
+
+
+def test_search_index_is_not_updated_for_password(db, added_record, crypto):
+    """ Update trigger of search index fires only when searched values are changed """
+    trigger = db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'sap_search_update'")).scalar()
+    assert 'AFTER UPDATE OF "customer", "system", "client", "user", "description"' in trigger
+    assert 'password' not in trigger
+    db.update_passwords([('Test', 'XXX', '111', 'rygor', crypto.encrypto(str.encode('456')))])
+    assert len(db.query_system(Sap_system(system='XXX', customer='Tes', description='Dev'))) == 1
+    check_search_index(db)
+
+
+def legacy_database(database):
+    """ Database created before migrations: no schema version and search index """
+    database.session.execute(text("DROP TABLE sap_search"))
+    database.session.execute(text("DROP TABLE schema_version"))
+    database.session.commit()
+    database.stop_sap_db()
+    dispose_engine(database.database_url)  # New process
+
+
+def test_outdated_database(database, added_record):
+    """ Outdated database is not opened until it is upgraded """
+    legacy_database(database)
+    with pytest.raises(DatabaseOutdated):
+        database.make_session()
+
+    assert database.upgrade(batch=1) == LATEST_VERSION
+    database.make_session()
+    assert database.search_index is True
+    assert len(database.query_system(Sap_system(system='XXX', customer='Test'))) == 1
+
+
+def test_upgrade_is_resumed(database, added_record, crypto, mocker):
+    """ Interrupted migration is continued from the last committed batch """
+    for system in ('YY1', 'YY2'):
+        database.add(Sap_system(system=system, client='111', user='rygor', password=crypto.encrypto(b'123'),
+                                customer='Test', description='Dev', url=''))
+    legacy_database(database)
+
+    progress = mocker.Mock(side_effect=[None, None, None, KeyboardInterrupt])
+    with pytest.raises(KeyboardInterrupt):
+        database.upgrade(batch=2, progress=progress)
+    # Migrations 1, 2, empty search index and the first batch are committed
+    assert progress.call_args.args[1] == 2
+
+    progress = mocker.Mock()
+    database.upgrade(batch=2, progress=progress)
+    # Search index of 'parameters' table exists: migration 4 has nothing to do
+    assert [(call.args[0].version, call.args[1]) for call in progress.call_args_list] == [(3, 1), (3, 0), (4, 0),
+                                                                                        (5, 0)]
+    database.make_session()
+    assert len(database.query_system(Sap_system(system=None, customer='Test', description='Dev'))) == 3
+    check_search_index(database)
+    assert database.session.execute(text("SELECT count(*) FROM schema_version WHERE applied IS NOT NULL")).scalar() \
+        == LATEST_VERSION
+
+
+def test_migrations_create_all_tables(db):
+    assert set(Base.metadata.tables) <= set(inspect(db.engine).get_table_names())
+
+
+def test_exact_key_lookup(db, added_record, mocker):
+    """ Complete system id and client are found by exact lookup """
+    query = mocker.spy(db, '_query_system')
+    assert len(db.query_system(Sap_system(system='xxx', client='111'))) == 1
+    assert query.call_count == 1
+    plan = db.session.execute(text("EXPLAIN QUERY PLAN SELECT * FROM sap WHERE system = 'XXX' AND client = '111'"))
+    assert 'sap_system_client' in str(plan.all())
+
+
+def test_exact_key_lookup_fallback(db, crypto):
+    """ Fuzzy search is used if exact lookup finds nothing """
+    db.add(Sap_system(system='Xx1', client='111', user='rygor', password=crypto.encrypto(str.encode('123')),
+                      customer='Test', description='Dev', url=''))
+    assert [item[0] for item in db.query_system(Sap_system(system='XX1', client='111'))] == ['Xx1']
+
+
+def test_keyset_pagination(db, crypto):
+    """ Pages follow each other without gaps and overlaps, count is the number of all found systems """
+    for customer in ('A', 'B', 'C'):
+        for client in ('100', '200'):
+            db.add(Sap_system(system='XXX', client=client, user='rygor', password=crypto.encrypto(b'123'),
+                              customer=customer, description='Dev', url=''))
+    first = db.query_system(Sap_system(system='XXX'), limit=4)
+    assert [(item[5], item[1]) for item in first] == [('A', '100'), ('A', '200'), ('B', '100'), ('B', '200')]
+    last = first[-1]
+    second = db.query_system(Sap_system(system='XXX'), after=(last[5], last[0], last[1], last[2]), limit=4)
+    assert [(item[5], item[1]) for item in second] == [('C', '100'), ('C', '200')]
+    assert db.count_system(Sap_system(system='XXX')) == 6
+    assert db.count_system(Sap_system(system='XXX', client='200')) == 3
+    assert len(db.query_system(Sap_system(system='XXX', client='200'), after=('A', 'XXX', '200', 'rygor'))) == 2
+
+
+@pytest.mark.parametrize('immutable', [False, True])
+def test_read_only_database(db, added_record, immutable):
+    """ Read only connection reads the database and can not change it """
+    database = SapDB(db_path=db.database_path, pragmas=SQLITE_PROFILES['balanced'], read_only=True,
+                     immutable=immutable)
+    database.make_session()
+    try:
+        assert len(database.query_system(Sap_system(system='XXX'))) == 1
+        with pytest.raises(OperationalError):
+            database.delete(Sap_system(system='XXX', client='111', user='rygor'))
+    finally:
+        database.session.rollback()
+        database.stop_sap_db()
+    assert len(db.query_system(Sap_system(system='XXX'))) == 1
+
+
+def test_read_commands_open_database_read_only(runner, temp_db_files, mocker):
+    start_sap_db = mocker.spy(sap, 'start_sap_db')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list'])
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'parlist'])
+    assert [call.args[3] for call in start_sap_db.call_args_list] == [True, True]
+
+    # Parameters are listed after adding in the same session
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'paradd', 'SE16', 'X'])
+    assert [call.args[3] for call in start_sap_db.call_args_list[2:]] == [False]
+
+
+def test_engine_is_reused(db, added_record):
+    """ One engine per database for the process """
+    database = SapDB(db_path=db.database_path)
+    database.make_session()
+    other = SapDB(db_path=db.database_path)
+    other.make_session()
+    assert database.engine is other.engine
+    database.stop_sap_db()
+    other.stop_sap_db()
+
+
+def test_database_exists(tmp_path, db):
+    """ Existence check without connection """
+    assert database_exists(db.database_url)
+    assert not database_exists(SapDB(db_path=tmp_path / 'missing.db').database_url)
+    (tmp_path / 'text.db').write_text('not a database')
+    assert not database_exists(SapDB(db_path=tmp_path / 'text.db').database_url)
+
+
+def pragma(database, name):
+    with database.engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@pytest.mark.parametrize('profile', SQLITE_PROFILES)
+def test_sqlite_profile(tmp_path, profile):
+    """ Pragmas of the profile are set on connect """
+    pragmas = SQLITE_PROFILES[profile]
+    database = SapDB(db_path=tmp_path / DATABASE_NAME, pragmas=pragmas)
+    database.create()
+    database.make_session()
+    assert pragma(database, 'journal_mode').upper() == pragmas['journal_mode']
+    assert pragma(database, 'synchronous') == ['OFF', 'NORMAL', 'FULL'].index(pragmas['synchronous'])
+    assert pragma(database, 'cache_size') == pragmas['cache_size']
+    assert pragma(database, 'temp_store') == ['DEFAULT', 'FILE', 'MEMORY'].index(pragmas['temp_store'])
+    database.stop_sap_db()
+    database.drop()
+
+
+def test_checkpoint(tmp_path, crypto):
+    """ After checkpoint database file has all changes and write-ahead log is empty """
+    database = SapDB(db_path=tmp_path / DATABASE_NAME, pragmas=SQLITE_PROFILES['balanced'])
+    database.create()
+    database.add(Sap_system(system='XXX', client='111', user='rygor', password=crypto.encrypto(str.encode('123')),
+                            customer='Test'))
+    wal_path = tmp_path / f'{DATABASE_NAME}-wal'
+    assert wal_path.stat().st_size > 0
+    database.checkpoint()
+    assert wal_path.stat().st_size == 0
+    database.stop_sap_db()
+    database.drop()
+
+
+def test_upgrade_cli(runner, temp_db_files):
+    """ Commands fail fast on outdated database until 'sap db --upgrade' """
+    cfg = Config(temp_db_files).read()
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    legacy_database(database)
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'list', 'xxx'])
+    assert result.exit_code != 0
+    assert "sap db --upgrade" in result.output
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'db', '--upgrade'])
+    assert result.exit_code == 0, result.output
+    assert f"Database schema version: {LATEST_VERSION}" in result.output
+    dispose_engine(database.database_url)
+    database.make_session()
+    assert database.search_index is True
+    database.stop_sap_db()
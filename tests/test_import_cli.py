@@ -0,0 +1,126 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Bulk import Tests """
+
+import json
+
+from sap.api import Sap_system, Parameter
+from sap.cli import sap_cli
+from sap.config import Config
+from sap.crypto import Crypto
+from sap.database import SapDB
+
+# '/' is a prefix of options ('/?' is help option), so absolute paths are passed after '--'
+HEADER = 'customer,system,client,user,password,language,description,url,autotype,only_web\n'
+
+
+def stored(path):
+    """ {(system, client, user): (password, description, ...)} and parameters from test database """
+    cfg = Config(path).read()
+    crypto = Crypto(cfg.public_key_path, cfg.private_key_path)
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    systems = {(item[0], item[1], item[2]): Sap_system(*item)._replace(
+        password=crypto.decrypto(item[3]) if item[3] else None) for item in database.query_system(Sap_system(None))}
+    parameters = dict(database.query_param(Parameter(None)))
+    database.stop_sap_db()
+    return systems, parameters
+
+
+def test_import_csv(runner, temp_db_files):
+    """ New systems are added, existing system is updated, rows with errors are reported """
+    file = temp_db_files / 'systems.csv'
+    file.write_text(HEADER +
+                    'Test,XXX,100,USER,new password,EN,Updated,,,\n'
+                    'Test,YYY,1,user,secret,de,Added,https://example.com,,\n'
+                    'Test,TOO_LONG,100,USER,secret,EN,,,,\n'
+                    'Test,ZZZ,100,USER,secret,XX,,,,\n', encoding='utf-8')
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    assert result.exit_code == 0, result.output
+    assert 'Imported to \'sap\' table: 2 of 4 rows' in result.output
+    assert 'Line 4:' in result.output and 'Line 5:' in result.output
+
+    systems, _ = stored(temp_db_files)
+    assert systems[('XXX', '100', 'USER')].password == 'new password'
+    assert systems[('XXX', '100', 'USER')].description == 'Updated'
+    added = systems[('YYY', '001', 'USER')]
+    assert (added.password, added.language, added.autotype) == ('secret', 'DE', '{USER}{TAB}{PASS}{ENTER}')
+    assert ('ZZZ', '100', 'USER') not in systems
+
+
+def test_import_without_password_keeps_password(runner, temp_db_files):
+    file = temp_db_files / 'systems.csv'
+    file.write_text(HEADER + 'Test,XXX,100,USER,,EN,Updated,,,\n', encoding='utf-8')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    systems, _ = stored(temp_db_files)
+    assert systems[('XXX', '100', 'USER')].password == '12345678'
+    assert systems[('XXX', '100', 'USER')].description == 'Updated'
+
+
+def test_import_jsonl_parameters(runner, temp_db_files):
+    """ Parameters are imported in batches, broken lines are skipped """
+    lines = [json.dumps({'transaction': f'ZT{index:02d}', 'parameter': 'field'}) for index in range(5)]
+    lines.insert(2, '{broken')
+    lines.append(json.dumps({'transaction': 'sm30', 'parameter': 'viewname,field'}))
+    file = temp_db_files / 'parameters.jsonl'
+    file.write_text('\n'.join(lines), encoding='utf-8')
+
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '-t', 'parameters', '--batch', '2',
+                                          '--', str(file)])
+    assert result.exit_code == 0, result.output
+    assert 'Processed: 2,' in result.output
+    assert 'Line 3: Not valid JSON' in result.output
+
+    _, parameters = stored(temp_db_files)
+    assert parameters['ZT04'] == 'FIELD'
+    assert parameters['SM30'] == 'VIEWNAME,FIELD'
+    assert len(parameters) == 6
+
+
+def test_encrypt_many(temp_db_files, mocker):
+    """ Passwords encrypted by process pool are decrypted as usual """
+    mocker.patch('sap.crypto.PARALLEL_MIN_PASSWORDS', 1)
+    cfg = Config(temp_db_files).read()
+    crypto = Crypto(cfg.public_key_path, cfg.private_key_path)
+    crypto.data_key_path.unlink()
+    passwords = [f'password{index}' for index in range(3)]
+    encrypted = crypto.encrypt_many((str.encode(item) for item in passwords), workers=2)
+    assert [crypto.decrypto(item) for item in encrypted] == passwords
+
+
+def test_export_csv(runner, temp_db_files):
+    """ Passwords are exported encrypted and are imported back unchanged """
+    file = temp_db_files / 'systems.csv'
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'export', f'--output={file}'])
+    assert result.exit_code == 0, result.output
+    text = file.read_text(encoding='utf-8')
+    assert text.startswith(HEADER.replace('password', 'password_encrypted'))
+    assert '12345678' not in text
+
+    file.write_text(text.replace('Dev', 'Imported'), encoding='utf-8')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    systems, _ = stored(temp_db_files)
+    assert systems[('XXX', '100', 'USER')].password == '12345678'
+    assert systems[('XXX', '100', 'USER')].description == 'Imported'
+
+
+def test_export_jsonl_to_stdout(runner, temp_db_files, mocker):
+    """ Plain text passwords only by flag. Rows are read from database batch by batch """
+    stream_systems = mocker.spy(SapDB, 'stream_systems')
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'export', '-f', 'jsonl', '--passwords',
+                                          '--batch', '1'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout.splitlines()[0]) == {
+        'customer': 'Test', 'system': 'XXX', 'client': '100', 'user': 'USER', 'password': '12345678',
+        'language': 'EN', 'description': 'Dev', 'url': '', 'autotype': '', 'only_web': 'no'}
+    assert stream_systems.call_args.args[1] == 1
+
+
+def test_export_parameters(runner, temp_db_files):
+    """ Database and private key are in the same folder: config warning goes to stderr with other messages """
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'export', '-t', 'parameters'])
+    assert result.stdout == 'transaction,parameter\nSM30,VIEWNAME\n'
+    assert 'Warning' in result.stderr and 'Warning' not in result.stdout
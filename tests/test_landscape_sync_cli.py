@@ -0,0 +1,156 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" SAP Logon landscape synchronization Tests """
+
+import pytest
+
+from sap import landscape
+from sap.api import Sap_system
+from sap.cli import sap_cli
+from sap.config import Config
+from sap.database import SapDB
+
+LANDSCAPE = """<?xml version="1.0" encoding="UTF-8"?>
+<Landscape updated="2025-01-01T00:00:00Z" version="1" generator="SAP GUI for Windows v7700.1.0.1102">
+  <Workspaces>
+    <Workspace uuid="w1" name="Local">
+      <Node uuid="n1" name="Customer A">
+        <Item uuid="i1" serviceid="s1"/>
+        <Item uuid="i2" serviceid="s2"/>
+      </Node>
+      <Item uuid="i3" serviceid="s3"/>
+    </Workspace>
+  </Workspaces>
+  <Services>
+    <Service type="SAPGUI" uuid="s1" name="Development" systemid="DEV" mode="1" server="dev:3200"/>
+    <Service type="SAPGUI" uuid="s2" name="Quality" systemid="QAS" mode="1" server="qas:3200"/>
+    <Service type="SAPGUI" uuid="s3" name="Sandbox" systemid="SBX" mode="1" server="sbx:3200"/>
+    <Service type="FIORI" uuid="s4" name="Launchpad" url="https://example.com"/>
+  </Services>
+</Landscape>
+"""
+
+
+def database(path):
+    cfg = Config(path).read()
+    result = SapDB(db_path=cfg.db_path)
+    result.make_session()
+    return result
+
+
+def systems(path):
+    """ {(customer, system): description} of test database """
+    sap_db = database(path)
+    result = {(item[5], item[0]): item[6] for item in sap_db.query_system(Sap_system(None))}
+    sap_db.stop_sap_db()
+    return result
+
+
+@pytest.fixture
+def landscape_file(temp_db_files):
+    path = temp_db_files / 'SAPUILandscape.xml'
+    path.write_text(LANDSCAPE, encoding='utf-8')
+    return path
+
+
+def sync(runner, temp_db_files, landscape_file, *args):
+    # '/' is a prefix of options ('/?' is help option), so absolute path is passed with '='
+    return runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'landscape-sync', '-client', '100',
+                                        '-user', 'user', f'--file={landscape_file}', *args])
+
+
+def test_read_landscape(landscape_file):
+    entries = landscape.read_landscape(landscape_file)
+    assert [(item.system, item.customer, item.description) for item in entries] == [
+        ('DEV', 'Customer A', 'Development'), ('QAS', 'Customer A', 'Quality'), ('SBX', 'Local', 'Sandbox')]
+
+
+def test_landscape_sync(runner, temp_db_files, landscape_file):
+    """ First sync adds systems, next one applies only changes """
+    result = sync(runner, temp_db_files, landscape_file)
+    assert result.exit_code == 0, result.output
+    assert 'Inserted: 3' in result.output
+    assert systems(temp_db_files) == {('Test', 'XXX'): 'Dev', ('Customer A', 'DEV'): 'Development',
+                                      ('Customer A', 'QAS'): 'Quality', ('Local', 'SBX'): 'Sandbox'}
+
+    sap_db = database(temp_db_files)
+    sap_db.update_passwords([('Local', 'SBX', '100', 'USER', b'encrypted')])
+    sap_db.stop_sap_db()
+
+    landscape_file.write_text(LANDSCAPE.replace('name="Quality"', 'name="Quality 2"')
+                              .replace('<Item uuid="i3" serviceid="s3"/>', ''), encoding='utf-8')
+    result = sync(runner, temp_db_files, landscape_file)
+    assert 'Inserted: 0' in result.output
+    assert 'Updated: 2' in result.output
+    assert 'Deleted: 0' in result.output
+    # Renamed system and system moved out of folder
+    assert systems(temp_db_files)[('Customer A', 'QAS')] == 'Quality 2'
+    sap_db = database(temp_db_files)
+    assert ('SAPLOGON', 'SBX', '100', 'USER', b'encrypted') in sap_db.query_passwords()
+    sap_db.stop_sap_db()
+
+    landscape_file.write_text(LANDSCAPE.replace('systemid="DEV"', 'systemid="D"'), encoding='utf-8')
+    result = sync(runner, temp_db_files, landscape_file)
+    assert 'Deleted: 1' in result.output
+    assert ('Customer A', 'DEV') not in systems(temp_db_files)
+    assert ('Test', 'XXX') in systems(temp_db_files)
+
+
+def test_landscape_sync_unchanged_file(runner, temp_db_files, landscape_file, mocker):
+    """ Unchanged file is not read again """
+    sync(runner, temp_db_files, landscape_file)
+    read_landscape = mocker.spy(landscape, 'read_landscape')
+    file_digest = mocker.spy(landscape, 'file_digest')
+
+    result = sync(runner, temp_db_files, landscape_file)
+    assert 'not changed since last sync' in result.output
+    assert file_digest.call_count == 0
+
+    landscape_file.write_text(LANDSCAPE, encoding='utf-8')  # The same content, new modification time
+    sync(runner, temp_db_files, landscape_file)
+    assert file_digest.call_count == 1
+    assert read_landscape.call_count == 0
+
+    sync(runner, temp_db_files, landscape_file, '--force')
+    assert read_landscape.call_count == 1
+
+
+def test_landscape_sync_values_of_systems(runner, temp_db_files, landscape_file):
+    """ Unchanged file is skipped without prompts, other user of added systems is synchronized """
+    sync(runner, temp_db_files, landscape_file)
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'landscape-sync', f'--file={landscape_file}'])
+    assert result.exit_code == 0, result.output
+    assert 'not changed since last sync' in result.output
+    assert 'Client' not in result.output
+
+    result = sync(runner, temp_db_files, landscape_file, '-user', 'other')
+    assert 'Updated: 3' in result.output
+
+    # Prompted values are offered from the last sync
+    landscape_file.write_text(LANDSCAPE.replace('name="Quality"', 'name="Quality 2"'), encoding='utf-8')
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'landscape-sync', f'--file={landscape_file}'],
+                           input='\n\n')
+    assert 'Client [100]' in result.output and 'User [OTHER]' in result.output
+    assert 'Updated: 1' in result.output
+
+
+def test_landscape_sync_language(runner, temp_db_files, landscape_file):
+    """ Another language is written to synchronized systems of unchanged file, systems added by hand keep theirs """
+    sync(runner, temp_db_files, landscape_file, '-language', 'EN')
+    result = sync(runner, temp_db_files, landscape_file, '-language', 'DE')
+    assert 'Updated: 3' in result.output
+    sap_db = database(temp_db_files)
+    assert {(item[5], item[0]): item[4] for item in sap_db.query_system(Sap_system(None))} == {
+        ('Test', 'XXX'): 'EN', ('Customer A', 'DEV'): 'DE', ('Customer A', 'QAS'): 'DE', ('Local', 'SBX'): 'DE'}
+    sap_db.stop_sap_db()
+
+
+def test_landscape_sync_keeps_manual_systems(runner, temp_db_files, landscape_file):
+    """ System added by hand with the same key is not changed """
+    landscape_file.write_text(LANDSCAPE.replace('name="Customer A"', 'name="Test"').replace('"DEV"', '"XXX"'),
+                              encoding='utf-8')
+    result = sync(runner, temp_db_files, landscape_file)
+    assert 'Skipped: 1' in result.output
+    assert systems(temp_db_files)[('Test', 'XXX')] == 'Dev'
@@ -0,0 +1,167 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Launcher of external programs Tests """
+
+import re
+import sys
+import time
+from pathlib import Path
+
+import click
+import pytest
+
+import sap
+import sap.utilities
+from sap import launcher
+from sap.api import Sap_system, LAUNCH_STATUS_NAME
+from sap.config import Config
+from sap.exceptions import WrongPath
+from sap.cli import sap_cli
+from sap.launcher import DetachedLauncher, Launcher
+
+
+@pytest.fixture
+def fake_sapshcut(tmp_path):
+    """ Program that works for a while and exits with the code passed as the last argument """
+    script = tmp_path / 'sapshcut.py'
+    script.write_text('import sys, time\ntime.sleep(0.5)\nsys.exit(int(sys.argv[-1]))\n', encoding='utf-8')
+    return script
+
+
+def wait_for(path, timeout=10):
+    finish = time.monotonic() + timeout
+    while not path.exists() and time.monotonic() < finish:
+        time.sleep(0.05)
+    return path.exists()
+
+
+def test_launch_does_not_wait(tmp_path, fake_sapshcut):
+    """ Control is returned before program finishes, failed exit code is saved to status file """
+    detached = DetachedLauncher(tmp_path / 'status.jsonl')
+    started = time.monotonic()
+    detached.start([sys.executable, str(fake_sapshcut), '-system=XXX', '3'], title='XXX 100')
+    assert time.monotonic() - started < 0.5
+    assert detached.failures() == []
+
+    assert wait_for(detached.status_path)
+    failures = detached.failures()
+    assert [(item.title, item.program, item.returncode) for item in failures] == [
+        ('XXX 100', Path(sys.executable).name, 3)]
+    assert detached.failures() == []
+
+
+def test_launch_success_is_not_saved(tmp_path, fake_sapshcut):
+    detached = DetachedLauncher(tmp_path / 'status.jsonl')
+    detached.start([sys.executable, str(fake_sapshcut), '0'])
+    time.sleep(1.5)
+    assert not detached.status_path.exists()
+
+
+def test_launch_of_missing_program(tmp_path):
+    detached = DetachedLauncher(tmp_path / 'status.jsonl')
+    detached.start(f'"{tmp_path / "missing.exe"}" -system=XXX -pw=secret')
+    assert wait_for(detached.status_path)
+    assert 'secret' not in detached.status_path.read_text(encoding='utf-8')
+    failure, = detached.failures()
+    assert failure.program == 'missing.exe' and failure.returncode is None and failure.error
+
+
+def test_failure_is_reported_by_next_launch(mocker, capsys):
+    """ Launcher is replaced by fake one """
+    fake = mocker.Mock(spec=Launcher)
+    fake.failures.return_value = [launcher.LaunchStatus('XXX 100', 'sapshcut.exe', 1, 2, '', '2025-01-01 10:00:00')]
+    launcher.set_launcher(fake)
+    try:
+        sap.utilities.open_sap('"sapshcut.exe" -system=YYY -client=200 -user=USER -pw=secret')
+    finally:
+        launcher.set_launcher(None)
+
+    assert fake.start.call_args.args[1] == 'YYY 200'
+    assert 'Previous launch of XXX 100 failed' in capsys.readouterr().out
+
+
+def test_status_file_is_in_config_folder(tmp_path):
+    assert launcher.get_launcher(tmp_path).status_path == tmp_path / LAUNCH_STATUS_NAME
+    with click.Context(click.Command('run'), obj=sap.Obj_structure()) as ctx:
+        ctx.obj.config = Config(tmp_path)
+        assert sap.utilities.config_folder() == tmp_path
+
+
+class FakeLauncher(Launcher):
+    """ Exit codes of runs by system id: the first run of 'YYY' fails """
+
+    def __init__(self):
+        self.runs = []
+
+    def start(self, command, title=''):
+        raise AssertionError("Several systems are launched by run()")
+
+    def run(self, command, timeout=None):
+        self.runs.append(command)
+        system = re.search(r'-system=(\w+)', command).group(1)
+        return 2 if system == 'ZZZ' or (system == 'YYY' and self.runs.count(command) == 1) else 0
+
+
+def test_launch_many(mocker):
+    """ Failed launch is retried, results are returned as launches finish """
+    mocker.patch('sap.launcher.RETRY_DELAY', 0)
+    fake = FakeLauncher()
+    launches = [(system, f'sapshcut.exe -system={system}') for system in ('XXX', 'YYY', 'ZZZ')]
+    results = {item.title: item for item in launcher.launch_many(launches, workers=2, retries=1, launcher=fake)}
+    assert {title: (item.returncode, item.attempts) for title, item in results.items()} == {
+        'XXX': (0, 1), 'YYY': (0, 2), 'ZZZ': (2, 2)}
+    assert len(fake.runs) == 5
+
+
+def test_choose_systems():
+    systems = [Sap_system(str(number)) for number in range(1, 6)]
+    assert [item.system for item in sap.utilities.choose_systems(systems, '4-5, 1,2-2,1')] == ['4', '5', '1', '2']
+    with pytest.raises(click.BadParameter):
+        sap.utilities.choose_systems(systems, '3-6')
+
+
+def test_run_all_systems(runner, temp_db_files, mocker):
+    """ All systems of customer are launched by one command """
+    file = temp_db_files / 'systems.csv'
+    file.write_text('customer,system,client,user,password\n'
+                    'Test,YYY,100,USER,secret\nTest,ZZZ,100,USER,secret\nOther,AAA,100,USER,secret\n',
+                    encoding='utf-8')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    mocker.patch.object(sap.utilities, 'check_if_path_exists')
+    mocker.patch('sap.launcher.RETRY_DELAY', 0)
+    fake = FakeLauncher()
+    launcher.set_launcher(fake)
+    try:
+        result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'run', '-c', 'test', '--all',
+                                              '-t', 'SU01'])
+    finally:
+        launcher.set_launcher(None)
+
+    assert result.exit_code == 1, result.output
+    assert sorted(re.search(r'-system=(\w+)', item).group(1) for item in fake.runs) == [
+        'XXX', 'YYY', 'YYY', 'ZZZ', 'ZZZ']
+    assert all('-command=SU01' in item for item in fake.runs)
+    assert 'YYY 100 USER: OK, attempts: 2' in result.output
+    assert 'Launched: 2 of 3' in result.output
+
+
+def test_run_all_systems_with_wrong_path(runner, temp_db_files, mocker):
+    """ System which command line can not be prepared is reported as failed launch, other systems are launched """
+    file = temp_db_files / 'systems.csv'
+    file.write_text('customer,system,client,user,password\nTest,AAA,100,USER,secret\n', encoding='utf-8')
+    runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'import', '--', str(file)])
+    mocker.patch.object(sap.utilities, 'check_if_path_exists',
+                        side_effect=[None, WrongPath('sapshcut.exe', 'C:\\SAP\\sapshcut.exe')])
+    fake = FakeLauncher()
+    launcher.set_launcher(fake)
+    try:
+        result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'run', '-c', 'test', '--all'])
+    finally:
+        launcher.set_launcher(None)
+
+    assert result.exit_code == 1, result.output
+    assert len(fake.runs) == 1
+    assert 'XXX 100 USER: FAILED (Executable does not exist: sapshcut.exe' in result.output
+    assert 'Launched: 1 of 2' in result.output
@@ -0,0 +1,58 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Envelope encryption migration Tests """
+
+import pytest
+
+from sap.api import Sap_system
+from sap.cli import sap_cli
+from sap.config import Config
+from sap.crypto import Crypto
+from sap.database import SapDB
+
+
+@pytest.fixture
+def rsa_db_files(temp_db_files):
+    """ Database with passwords encrypted with RSA keys only """
+    cfg = Config(temp_db_files).read()
+    crypto = Crypto(cfg.public_key_path, cfg.private_key_path)
+    crypto.data_key_path.unlink()
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    database.delete(Sap_system(system='XXX', client='100', user='USER'))
+    for system in ('AAA', 'BBB', 'CCC'):
+        database.add(Sap_system(system=system, client='100', user='USER', password=crypto.encrypto(str.encode(system)),
+                                language='EN', customer='Test', description='', url='', autotype='', only_web='no'))
+    database.stop_sap_db()
+    return temp_db_files, cfg, crypto
+
+
+def stored_passwords(cfg):
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    result = {item[1]: item[4] for item in database.query_passwords()}
+    database.stop_sap_db()
+    return result
+
+
+def test_migrate_crypto(runner, rsa_db_files):
+    """ All passwords are converted in batches and are decrypted as before """
+    path, cfg, crypto = rsa_db_files
+    result = runner.invoke(sap_cli, args=['--config_path', path, 'migrate-crypto', '--batch', '2'])
+    assert result.exit_code == 0
+    assert 'converted to envelope encryption: 3' in result.output
+
+    passwords = stored_passwords(cfg)
+    assert all(crypto.is_envelope(password) for password in passwords.values())
+    assert {system: crypto.decrypto(password) for system, password in passwords.items()} == {
+        'AAA': 'AAA', 'BBB': 'BBB', 'CCC': 'CCC'}
+
+
+def test_migrate_crypto_again(runner, rsa_db_files):
+    """ Converted passwords are skipped """
+    path, _, _ = rsa_db_files
+    runner.invoke(sap_cli, args=['--config_path', path, 'migrate-crypto'])
+    result = runner.invoke(sap_cli, args=['--config_path', path, 'migrate-crypto'])
+    assert 'converted to envelope encryption: 0' in result.output
@@ -0,0 +1,84 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Query results cache of API functions Tests """
+
+import pytest
+
+import sap
+import sap.api
+from sap.api import Sap_system, Parameter, QueryCache
+from sap.config import Config
+from sap.database import SapDB
+
+
+@pytest.fixture
+def api_db(temp_db_files):
+    cfg = Config(temp_db_files).read()
+    sap.start_sap_db(cfg.db_path, cfg.db_type, cfg.db_pragmas)
+    yield
+    sap.stop_sap_db()
+
+
+def test_repeated_query_is_cached(api_db, mocker):
+    query_system = mocker.spy(SapDB, 'query_system')
+    before = sap.cache_info()
+    assert sap.query_system(Sap_system(system='XXX')) == sap.query_system(Sap_system(system='XXX'))
+    assert query_system.call_count == 1
+    assert (sap.cache_info().hits - before.hits, sap.cache_info().misses - before.misses) == (1, 1)
+
+
+def test_param_fields_are_cached(api_db, mocker):
+    """ Transaction is found by exact name, parsed fields are cached until parameters are changed """
+    get_param = mocker.spy(SapDB, 'get_param')
+    assert sap.param_fields('sm30') == sap.param_fields('SM30') == ['VIEWNAME']
+    assert get_param.call_count == 1
+    assert sap.param_fields('SM3') == []
+
+    sap.update_param(Parameter('SM30', 'VIEWNAME, FIELD'))
+    assert sap.param_fields('SM30') == ['VIEWNAME', 'FIELD']
+
+
+def test_cache_is_cleared_by_writes(api_db):
+    assert [item[1] for item in sap.query_param(Parameter('SM30'))] == ['VIEWNAME']
+    sap.update_param(Parameter('SM30', 'FIELD'))
+    assert [item[1] for item in sap.query_param(Parameter('SM30'))] == ['FIELD']
+
+    assert len(sap.query_system(Sap_system(system='XXX'))) == 1
+    sap.delete(Sap_system(system='XXX', client='100', user='USER'))
+    assert sap.query_system(Sap_system(system='XXX')) == []
+
+
+def test_changes_of_other_connections_are_seen(api_db, temp_db_files):
+    """ Result is queried again after data is changed by another connection, e.g. by another process """
+    assert len(sap.query_system(Sap_system(system='XXX'))) == 1
+    cfg = Config(temp_db_files).read()
+    database = SapDB(cfg.db_path, cfg.db_type, cfg.db_pragmas)
+    database.make_session()
+    database.delete(Sap_system(system='XXX', client='100', user='USER'))
+    database.stop_sap_db()
+    assert sap.query_system(Sap_system(system='XXX')) == []
+
+
+def test_cache_limits(mocker):
+    """ Least recently used result is removed, result of other data version is queried again """
+    version = mocker.Mock(return_value=1)
+    cache = QueryCache(maxsize=2, version=version)
+    query = mocker.Mock(side_effect=lambda: [query.call_count])
+
+    cache.get('a', query)
+    cache.get('b', query)
+    cache.get('a', query)
+    cache.get('c', query)  # 'b' is removed
+    assert cache.get('b', query) == [4]  # 'a' is removed
+    assert cache.get('c', query) == [3]
+    assert cache.info().size == 2
+
+    version.return_value = 2
+    assert cache.get('c', query) == [5]
+    assert cache.info() == (2, 5, 2, 2)
+
+    version.return_value = None  # Version is not known: nothing is cached
+    assert cache.get('c', query) == [6]
+    assert cache.get('c', query) == [7]
@@ -0,0 +1,85 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Encryption keys rotation Tests """
+
+import pytest
+
+import sap
+from sap.api import Sap_system, KEY_ROTATION_NAME
+from sap.cli import sap_cli
+from sap.config import Config
+from sap.crypto import Crypto
+from sap.database import SapDB
+
+
+@pytest.fixture
+def rotation_db_files(temp_db_files):
+    """ Database with passwords encrypted with RSA keys and with data key """
+    cfg = Config(temp_db_files).read()
+    crypto = Crypto(cfg.public_key_path, cfg.private_key_path)
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    database.add(Sap_system(system='AAA', client='100', user='USER', password=crypto.encrypto(str.encode('AAA')),
+                            language='EN', customer='Test', description='', url='', autotype='', only_web='no'))
+    crypto.data_key_path.rename(crypto.data_key_path.with_suffix('.bak'))
+    for system in ('BBB', 'CCC'):
+        database.add(Sap_system(system=system, client='100', user='USER', password=crypto.encrypto(str.encode(system)),
+                                language='EN', customer='Test', description='', url='', autotype='', only_web='no'))
+    crypto.data_key_path.with_suffix('.bak').rename(crypto.data_key_path)
+    database.stop_sap_db()
+    return temp_db_files, cfg, crypto
+
+
+def decrypted_passwords(cfg, crypto):
+    database = SapDB(db_path=cfg.db_path)
+    database.make_session()
+    result = {item[1]: crypto.decrypto(item[4]) for item in database.query_passwords()}
+    database.stop_sap_db()
+    return result
+
+
+PASSWORDS = {'AAA': 'AAA', 'BBB': 'BBB', 'CCC': 'CCC', 'XXX': '12345678'}
+
+
+def test_rotate_keys(runner, rotation_db_files):
+    """ Keys are replaced and all passwords are decrypted with new keys """
+    path, cfg, crypto = rotation_db_files
+    private_key = cfg.private_key_path.read_bytes()
+
+    result = runner.invoke(sap_cli, args=['--config_path', path, 'keys', '--rotate', '--batch', '2'])
+
+    assert result.exit_code == 0
+    assert 'rows/sec' in result.output
+    assert 'Passwords re-encrypted: 4' in result.output
+    assert cfg.private_key_path.read_bytes() != private_key
+    assert sorted(item.name for item in path.iterdir() if item.name.endswith('.new')) == []
+    assert not (path / KEY_ROTATION_NAME).exists()
+    assert decrypted_passwords(cfg, crypto) == PASSWORDS
+
+
+def test_rotate_keys_interrupted(runner, rotation_db_files, mocker):
+    """ Interrupted rotation is continued by next run """
+    path, cfg, crypto = rotation_db_files
+    update_passwords = sap.update_passwords
+    batches = []
+
+    def interrupted_update_passwords(records):
+        if batches:
+            raise RuntimeError("Interrupted")
+        batches.append(records)
+        update_passwords(records)
+
+    mocker.patch.object(sap, 'update_passwords', new=interrupted_update_passwords)
+    result = runner.invoke(sap_cli, args=['--config_path', path, 'keys', '--rotate', '--batch', '2'])
+    assert isinstance(result.exception, RuntimeError)
+    assert (path / KEY_ROTATION_NAME).exists()
+    mocker.stopall()
+
+    result = runner.invoke(sap_cli, args=['--config_path', path, 'keys', '--rotate', '--batch', '2'])
+
+    assert result.exit_code == 0
+    assert 'Continue interrupted key rotation' in result.output
+    assert 'Passwords re-encrypted: 2' in result.output
+    assert decrypted_passwords(cfg, crypto) == PASSWORDS
@@ -0,0 +1,43 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Shell Tests """
+
+import sap
+from sap.cli import sap_cli
+from sap.commands.shell import SapShell
+from sap.config import Config
+
+
+def test_shell_reuses_database_session(runner, temp_db_files, mocker):
+    """ Database is started once for all commands of the shell """
+    start_sap_db = mocker.spy(sap, 'start_sap_db')
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'shell'],
+                           input="list XXX\nparlist SM30\nexit\n")
+    assert result.exit_code == 0
+    assert 'XXX' in result.output
+    assert 'VIEWNAME' in result.output
+    assert start_sap_db.call_count == 1
+
+
+def test_shell_keeps_running_after_error(runner, temp_db_files):
+    """ Unknown command and aborted command do not close the shell """
+    result = runner.invoke(sap_cli, args=['--config_path', temp_db_files, 'shell'],
+                           input="unknown\nlist YYY\nlist XXX\nexit\n")
+    assert result.exit_code == 0
+    assert "No such command" in result.output
+    assert 'XXX' in result.output
+
+
+def test_shell_completion(temp_db_files):
+    cfg = Config(temp_db_files).read()
+    obj = sap.Obj_structure()
+    obj.config = cfg
+    obj.database = sap.start_sap_db(cfg.db_path, cfg.db_type)
+    try:
+        shell = SapShell(obj)
+        assert 'list' in shell.completenames('li')
+        assert shell.completedefault('x', 'run x', 4, 5) == ['XXX']
+    finally:
+        sap.stop_sap_db()
@@ -0,0 +1,69 @@
+#  ------------------------------------------
+#   Copyright (c) Rygor. 2025.
+#  ------------------------------------------
+
+""" Startup Tests: heavy dependencies are imported only by the subcommand that needs them """
+
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ['sqlalchemy', 'sqlalchemy_utils', 'cryptography', 'pyzipper', 'pyautogui', 'pyperclip']
+IMPORT_TIME_BUDGET = 0.5  # seconds for 'import sap.cli'
+
+
+def run_python(*args):
+    """ Run code in a clean interpreter, so modules imported by other tests do not count """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+    return result
+
+
+def imported_heavy_modules(code):
+    """ List of heavy modules imported after running code """
+    code += f"\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    return json.loads(run_python("-c", code).stdout.strip().splitlines()[-1])
+
+
+def test_import_cli_without_heavy_modules():
+    """ 'import sap.cli' must not load any heavy dependency """
+    assert imported_heavy_modules("import sap.cli") == []
+
+
+def test_run_command_loads_only_its_dependencies():
+    """ Resolving 'run' must not load backup, clipboard and autotype dependencies """
+    code = "import sap.cli\nsap.cli.sap_cli.get_command(None, 'run')"
+    assert not {'pyzipper', 'pyperclip', 'pyautogui'} & set(imported_heavy_modules(code))
+
+
+def test_backup_command_loads_pyzipper():
+    """ Resolving 'backup' loads its own dependency """
+    code = "import sap.cli\nsap.cli.sap_cli.get_command(None, 'backup')"
+    assert 'pyzipper' in imported_heavy_modules(code)
+
+
+def test_light_commands_do_not_load_crypto(temp_db_files):
+    """ Commands that do not touch passwords do not import cryptography """
+    code = ("from click.testing import CliRunner\n"
+            "import sap.cli\n"
+            "for args in (['config', '-h'], ['parlist']):\n"
+            f"    result = CliRunner().invoke(sap.cli.sap_cli, ['--config_path', {str(temp_db_files)!r}, *args])\n"
+            "    assert result.exit_code == 0, result.output\n")
+    assert 'cryptography' not in imported_heavy_modules(code)
+
+
+def test_all_commands_are_resolved():
+    """ Every lazy subcommand points to an existing click command """
+    code = ("import sap.cli\n"
+            "for name in sap.cli.sap_cli.list_commands(None):\n"
+            "    assert sap.cli.sap_cli.get_command(None, name).name == name, name\n")
+    run_python("-c", code)
+
+
+def test_import_time_budget():
+    """ Cumulative import time of sap.cli (python -X importtime) """
+    result = run_python("-X", "importtime", "-c", "import sap.cli")
+    line = [item for item in result.stderr.splitlines() if item.endswith("| sap.cli")][-1]
+    cumulative = int(line.split('|')[1]) / 1_000_000
+    assert cumulative < IMPORT_TIME_BUDGET